@@ -0,0 +1,262 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CATALOG_DB_PATH = os.getenv('EXERCISE_CATALOG_PATH', 'exercise_catalog.db')
+
+
+class ExerciseCatalog:
+    """Local SQLite mirror of the ExerciseDB catalog with full-text search"""
+    
+    def __init__(self, db_path=CATALOG_DB_PATH, max_age_days=30):
+        self.db_path = db_path
+        self.max_age_seconds = max_age_days * 24 * 3600
+        
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+    
+    def _create_schema(self):
+        """Create the catalog tables, indexes and full-text index"""
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS exercises (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                body_part TEXT,
+                target TEXT,
+                equipment TEXT,
+                data TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_exercises_body_part ON exercises (body_part COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_exercises_target ON exercises (target COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_exercises_equipment ON exercises (equipment COLLATE NOCASE);
+            
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        
+        # Fall back to LIKE queries if this SQLite build lacks FTS5
+        try:
+            self._conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS exercises_fts
+                    USING fts5(name, content='exercises', content_rowid='rowid');
+                CREATE TRIGGER IF NOT EXISTS exercises_ai AFTER INSERT ON exercises BEGIN
+                    INSERT INTO exercises_fts (rowid, name) VALUES (new.rowid, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS exercises_ad AFTER DELETE ON exercises BEGIN
+                    INSERT INTO exercises_fts (exercises_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS exercises_au AFTER UPDATE OF name ON exercises BEGIN
+                    INSERT INTO exercises_fts (exercises_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+                    INSERT INTO exercises_fts (rowid, name) VALUES (new.rowid, new.name);
+                END;
+            """)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+    
+    def _get_state(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+    
+    def _set_state(self, key, value):
+        self._conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, str(value)))
+    
+    def is_populated(self):
+        """Return True once at least one full sync has completed"""
+        with self._lock:
+            return self._get_state('last_full_sync') is not None
+    
+    def needs_refresh(self):
+        """Return True if the catalog is incomplete or older than max_age_days"""
+        with self._lock:
+            last_sync = self._get_state('last_full_sync')
+            in_progress = int(self._get_state('next_offset', 0)) > 0
+        if last_sync is None or in_progress:
+            return True
+        return time.time() - float(last_sync) > self.max_age_seconds
+    
+    def count(self):
+        """Return the number of exercises stored locally"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM exercises").fetchone()[0]
+    
+    def upsert_exercises(self, exercises, seen_at=None):
+        """Insert or update a batch of exercises in ExerciseDB format"""
+        seen_at = seen_at or time.time()
+        rows = [
+            (
+                str(ex.get('id', '')),
+                ex.get('name', 'Unknown'),
+                ex.get('bodyPart'),
+                ex.get('target'),
+                ex.get('equipment'),
+                json.dumps(ex, sort_keys=True),
+                seen_at
+            )
+            for ex in exercises if ex.get('id')
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # Only rewrite rows whose data changed so the FTS index isn't churned
+                self._conn.executemany(
+                    "INSERT INTO exercises (id, name, body_part, target, equipment, data, seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET "
+                    "name = excluded.name, body_part = excluded.body_part, target = excluded.target, "
+                    "equipment = excluded.equipment, data = excluded.data, seen_at = excluded.seen_at "
+                    "WHERE exercises.data != excluded.data",
+                    rows
+                )
+                self._conn.executemany(
+                    "UPDATE exercises SET seen_at = ? WHERE id = ?",
+                    [(seen_at, row[0]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+    
+    def sync(self, api, page_size=100, max_pages=None):
+        """Page through get_all_exercises and mirror the results locally.
+        
+        An interrupted sync resumes from the last stored offset. Once a full
+        pass completes, exercises that were not seen in it are removed.
+        """
+        with self._lock:
+            offset = int(self._get_state('next_offset', 0))
+            pass_started = float(self._get_state('pass_started', 0)) if offset else time.time()
+            self._set_state('pass_started', pass_started)
+        
+        synced = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            page = api.get_all_exercises(limit=page_size, offset=offset)
+            pages += 1
+            if not page and getattr(api, 'last_error', None):
+                # Request failed, keep the offset so the next sync resumes here
+                break
+            if page:
+                synced += self.upsert_exercises(page)
+                offset += len(page)
+            
+            with self._lock:
+                if len(page) < page_size:
+                    # Short page means we reached the end of the catalog
+                    self._conn.execute("DELETE FROM exercises WHERE seen_at < ?", (pass_started,))
+                    self._set_state('next_offset', 0)
+                    self._set_state('last_full_sync', time.time())
+                    break
+                self._set_state('next_offset', offset)
+        
+        return synced
+    
+    def refresh(self, api, page_size=100):
+        """Run a sync only if the catalog is incomplete or stale"""
+        if not self.needs_refresh():
+            return 0
+        return self.sync(api, page_size=page_size)
+    
+    def start_background_refresh(self, api, page_size=100):
+        """Refresh the catalog on a daemon thread without blocking the caller"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return self._refresh_thread
+        
+        def run():
+            try:
+                self.refresh(api, page_size=page_size)
+            except Exception as e:
+                print(f"Error refreshing exercise catalog: {e}")
+        
+        self._refresh_thread = threading.Thread(target=run, name="exercise-catalog-refresh", daemon=True)
+        self._refresh_thread.start()
+        return self._refresh_thread
+    
+    def _fetch(self, sql, params):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def search_by_name(self, name, limit=50):
+        """Full-text search on exercise names (prefix match on each word)"""
+        words = [word.replace('"', '') for word in name.split()]
+        words = [word for word in words if word]
+        if not words:
+            return []
+        
+        if self.has_fts:
+            match = ' '.join(f'"{word}"*' for word in words)
+            return self._fetch(
+                "SELECT e.data FROM exercises_fts f JOIN exercises e ON e.rowid = f.rowid "
+                "WHERE exercises_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                (match, limit)
+            )
+        
+        clauses = ' AND '.join("name LIKE ?" for _ in words)
+        params = [f"%{word}%" for word in words] + [limit]
+        return self._fetch(f"SELECT data FROM exercises WHERE {clauses} ORDER BY name LIMIT ?", params)
+    
+    def get_by_body_part(self, body_part, limit=200):
+        """Get exercises for a specific body part"""
+        return self._fetch(
+            "SELECT data FROM exercises WHERE body_part = ? COLLATE NOCASE ORDER BY name LIMIT ?",
+            (body_part.strip(), limit)
+        )
+    
+    def get_by_target(self, target_muscle, limit=200):
+        """Get exercises for a specific target muscle"""
+        return self._fetch(
+            "SELECT data FROM exercises WHERE target = ? COLLATE NOCASE ORDER BY name LIMIT ?",
+            (target_muscle.strip(), limit)
+        )
+    
+    def get_by_equipment(self, equipment, limit=200):
+        """Get exercises for specific equipment"""
+        return self._fetch(
+            "SELECT data FROM exercises WHERE equipment = ? COLLATE NOCASE ORDER BY name LIMIT ?",
+            (equipment.strip(), limit)
+        )
+    
+    
+    def distinct_values(self, column):
+        """List the distinct body parts, targets or equipment in the catalog"""
+        if column not in ('body_part', 'target', 'equipment'):
+            raise ValueError(f"Unknown catalog column: {column}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT {column} FROM exercises WHERE {column} IS NOT NULL ORDER BY {column}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+_default_catalog = None
+
+
+def get_default_catalog():
+    """Return the catalog shared by every ExerciseDBAPI instance"""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = ExerciseCatalog()
+    return _default_catalog
+
+
+# Sync the catalog from the command line
+if __name__ == "__main__":
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from api.exercisedb import ExerciseDBAPI
+    
+    catalog = get_default_catalog()
+    print("Syncing exercise catalog...")
+    synced = catalog.sync(ExerciseDBAPI(catalog=catalog))
+    print(f"✓ {synced} exercises synced, {catalog.count()} in catalog")
@@ -1,19 +1,46 @@
-import requests
 import os
+import sys
 from dotenv import load_dotenv
 
+# Allow running this file directly from the api/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.exercise_catalog import get_default_catalog
+from api.quota import QuotaExceeded, get_quota_manager
+from api.transport import get_transport
+from utils.lazy import lazy_import
+
+requests = lazy_import('requests')
+
+QUOTA_NAME = 'exercisedb'
+
 load_dotenv()
 
 class ExerciseDBAPI:
     """Wrapper for ExerciseDB API via RapidAPI"""
     
-    def __init__(self):
+    def __init__(self, catalog=None, transport=None, quota=None, base_url=None, timeout=None):
         self.api_key = os.getenv('RAPIDAPI_KEY')
-        self.base_url = "https://exercisedb.p.rapidapi.com"
+        self.base_url = base_url or "https://exercisedb.p.rapidapi.com"
         self.headers = {
             "X-RapidAPI-Key": self.api_key,
             "X-RapidAPI-Host": "exercisedb.p.rapidapi.com"
         }
+        self.timeout = timeout  # seconds; None uses the transport's timeout (HTTP_TIMEOUT)
+        self.transport = transport or get_transport()
+        self.quota = quota or get_quota_manager()
+        self.last_error = None
+        
+        # Searches are answered from the local catalog once it has been synced
+        self.catalog = catalog if catalog is not None else get_default_catalog()
+    
+    def _get(self, url, params=None, wait=0):
+        """Send a GET request within the daily quota and return the JSON body"""
+        self.quota.acquire(QUOTA_NAME, wait=wait)
+        response = self.transport.get(url, headers=self.headers, params=params, timeout=self.timeout)
+        self.quota.record_response(QUOTA_NAME, response, 'X-RateLimit-Requests-Remaining')
+        response.raise_for_status()
+        return response.json()
     
     def get_all_exercises(self, limit=10, offset=0):
         """Get a list of exercises with pagination"""
@@ -23,58 +50,83 @@ class ExerciseDBAPI:
             'offset': offset
         }
         
+        self.last_error = None
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            # Background syncs can wait for the rate limiter to refill
+            return self._get(url, params=params, wait=30)
+        except (requests.exceptions.RequestException, QuotaExceeded) as e:
+            self.last_error = e
             print(f"Error fetching exercises: {e}")
             return []
     
     def search_exercises_by_name(self, name):
         """Search for exercises by name"""
+        if self.catalog.is_populated():
+            return self.catalog.search_by_name(name)
+        
         url = f"{self.base_url}/exercises/name/{name}"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url)
+        except QuotaExceeded:
+            # Out of budget, answer from whatever the local catalog has
+            if self.catalog.count():
+                return self.catalog.search_by_name(name)
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error searching exercises: {e}")
             return []
     
     def get_exercises_by_body_part(self, body_part):
         """Get exercises for a specific body part"""
+        if self.catalog.is_populated():
+            return self.catalog.get_by_body_part(body_part)
+        
         url = f"{self.base_url}/exercises/bodyPart/{body_part}"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url)
+        except QuotaExceeded:
+            # Out of budget, answer from whatever the local catalog has
+            if self.catalog.count():
+                return self.catalog.get_by_body_part(body_part)
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error fetching exercises by body part: {e}")
             return []
     
     def get_exercises_by_target(self, target_muscle):
         """Get exercises for a specific target muscle"""
+        if self.catalog.is_populated():
+            return self.catalog.get_by_target(target_muscle)
+        
         url = f"{self.base_url}/exercises/target/{target_muscle}"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url)
+        except QuotaExceeded:
+            # Out of budget, answer from whatever the local catalog has
+            if self.catalog.count():
+                return self.catalog.get_by_target(target_muscle)
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error fetching exercises by target: {e}")
             return []
     
     def get_exercises_by_equipment(self, equipment):
         """Get exercises for specific equipment"""
+        if self.catalog.is_populated():
+            return self.catalog.get_by_equipment(equipment)
+        
         url = f"{self.base_url}/exercises/equipment/{equipment}"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url)
+        except QuotaExceeded:
+            # Out of budget, answer from whatever the local catalog has
+            if self.catalog.count():
+                return self.catalog.get_by_equipment(equipment)
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error fetching exercises by equipment: {e}")
             return []
@@ -84,9 +136,12 @@ class ExerciseDBAPI:
         url = f"{self.base_url}/exercises/bodyPartList"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url)
+        except QuotaExceeded:
+            # Out of budget, answer from whatever the local catalog has
+            if self.catalog.count():
+                return self.catalog.distinct_values('body_part')
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error fetching body part list: {e}")
             return []
@@ -96,9 +151,12 @@ class ExerciseDBAPI:
         url = f"{self.base_url}/exercises/targetList"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url)
+        except QuotaExceeded:
+            # Out of budget, answer from whatever the local catalog has
+            if self.catalog.count():
+                return self.catalog.distinct_values('target')
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error fetching target list: {e}")
             return []
@@ -108,14 +166,28 @@ class ExerciseDBAPI:
         url = f"{self.base_url}/exercises/equipmentList"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(url)
+        except QuotaExceeded:
+            # Out of budget, answer from whatever the local catalog has
+            if self.catalog.count():
+                return self.catalog.distinct_values('equipment')
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error fetching equipment list: {e}")
             return []
 
 
+_shared_api = None
+
+
+def get_exercise_api():
+    """Return the ExerciseDBAPI instance shared across the app"""
+    global _shared_api
+    if _shared_api is None:
+        _shared_api = ExerciseDBAPI()
+    return _shared_api
+
+
 # Example usage and testing
 if __name__ == "__main__":
     api = ExerciseDBAPI()
@@ -0,0 +1,367 @@
+import csv
+import importlib.util
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Allow running this file directly from the api/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.nutrients import MACRO_FIELDS, NUTRIENT_MAP, from_amounts, ids_for_fields
+
+FDC_DB_PATH = os.getenv('FDC_LOCAL_PATH', 'fdc_local.db')
+
+# Rows per executemany batch, which bounds memory during import
+CHUNK_SIZE = 50000
+
+# Top-level keys used by the FDC JSON bulk downloads
+JSON_FOOD_KEYS = ('FoundationFoods', 'SRLegacyFoods', 'BrandedFoods', 'SurveyFoods', 'FoodData')
+
+
+class FoodIndex:
+    """Local SQLite copy of FoodData Central with full-text search"""
+    
+    def __init__(self, db_path=FDC_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+    
+    def _create_schema(self):
+        """Create the food, nutrient and food_nutrient tables"""
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS food (
+                fdc_id INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                brand TEXT,
+                data_type TEXT,
+                serving_size REAL,
+                serving_unit TEXT
+            );
+            CREATE TABLE IF NOT EXISTS nutrient (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                unit_name TEXT,
+                nutrient_nbr TEXT
+            );
+            CREATE TABLE IF NOT EXISTS food_nutrient (
+                fdc_id INTEGER NOT NULL,
+                nutrient_id INTEGER NOT NULL,
+                amount REAL NOT NULL,
+                PRIMARY KEY (fdc_id, nutrient_id)
+            ) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE IF NOT EXISTS food_fts
+                USING fts5(description, brand, content='food', content_rowid='fdc_id');
+        """)
+    
+    def food_count(self):
+        """Return the number of foods in the index"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM food").fetchone()[0]
+    
+    # ---- Import ----
+    
+    def _bulk_insert(self, sql, rows):
+        """Insert rows in fixed-size transactions; returns the number inserted"""
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= CHUNK_SIZE:
+                total += self._write_batch(sql, batch)
+                batch = []
+        if batch:
+            total += self._write_batch(sql, batch)
+        return total
+    
+    def _write_batch(self, sql, batch):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, batch)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(batch)
+    
+    def _begin_import(self):
+        # Durability doesn't matter mid-import, a failed import is just re-run
+        with self._lock:
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("PRAGMA cache_size=-65536")
+    
+    def _finish_import(self):
+        """Rebuild the full-text index once all foods are in"""
+        with self._lock:
+            self._conn.execute("INSERT INTO food_fts (food_fts) VALUES ('rebuild')")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("ANALYZE")
+    
+    def import_csv_dir(self, path, nutrient_ids=None):
+        """Import an extracted FDC CSV download (food.csv, nutrient.csv, ...)"""
+        self._begin_import()
+        counts = {}
+        
+        nutrient_csv = os.path.join(path, 'nutrient.csv')
+        if os.path.exists(nutrient_csv):
+            counts['nutrients'] = self._bulk_insert(
+                "INSERT OR REPLACE INTO nutrient (id, name, unit_name, nutrient_nbr) VALUES (?, ?, ?, ?)",
+                (
+                    (int(row['id']), row['name'], row.get('unit_name'), row.get('nutrient_nbr'))
+                    for row in _read_csv(nutrient_csv)
+                )
+            )
+        
+        counts['foods'] = self._bulk_insert(
+            "INSERT OR REPLACE INTO food (fdc_id, description, data_type) VALUES (?, ?, ?)",
+            (
+                (int(row['fdc_id']), row['description'], row.get('data_type'))
+                for row in _read_csv(os.path.join(path, 'food.csv'))
+            )
+        )
+        
+        # Brand and serving size only exist for branded foods
+        branded_csv = os.path.join(path, 'branded_food.csv')
+        if os.path.exists(branded_csv):
+            self._bulk_insert(
+                "UPDATE food SET brand = ?, serving_size = ?, serving_unit = ? WHERE fdc_id = ?",
+                (
+                    (
+                        row.get('brand_owner') or row.get('brand_name') or None,
+                        _to_float(row.get('serving_size')),
+                        row.get('serving_size_unit') or None,
+                        int(row['fdc_id'])
+                    )
+                    for row in _read_csv(branded_csv)
+                )
+            )
+        
+        wanted = set(nutrient_ids) if nutrient_ids else None
+        counts['food_nutrients'] = self._bulk_insert(
+            "INSERT OR REPLACE INTO food_nutrient (fdc_id, nutrient_id, amount) VALUES (?, ?, ?)",
+            (
+                (int(row['fdc_id']), int(row['nutrient_id']), float(row['amount']))
+                for row in _read_csv(os.path.join(path, 'food_nutrient.csv'))
+                if row.get('amount') and (wanted is None or int(row['nutrient_id']) in wanted)
+            )
+        )
+        
+        self._finish_import()
+        return counts
+    
+    def import_json(self, path, nutrient_ids=None):
+        """Import an FDC JSON download, streamed a food at a time with ijson.
+        
+        The downloads are several GB, so they are never loaded whole.
+        """
+        if importlib.util.find_spec('ijson') is None:
+            raise ImportError("Importing FDC JSON downloads needs ijson: pip install ijson")
+        key = _json_food_key(path)
+        self._begin_import()
+        wanted = set(nutrient_ids) if nutrient_ids else None
+        counts = {'foods': 0, 'food_nutrients': 0}
+        nutrients = {}
+        
+        foods = []
+        food_nutrients = []
+        for food in _iter_json_foods(path, key):
+            fdc_id = int(food['fdcId'])
+            foods.append((
+                fdc_id,
+                food.get('description', 'Unknown'),
+                food.get('brandOwner') or food.get('brandName'),
+                food.get('dataType'),
+                _to_float(food.get('servingSize')),
+                food.get('servingSizeUnit')
+            ))
+            for item in food.get('foodNutrients', []):
+                nutrient = item.get('nutrient', {})
+                nutrient_id = nutrient.get('id')
+                amount = item.get('amount')
+                if nutrient_id is None or amount is None:
+                    continue
+                if wanted is not None and nutrient_id not in wanted:
+                    continue
+                nutrients[nutrient_id] = (nutrient_id, nutrient.get('name', ''), nutrient.get('unitName'), nutrient.get('number'))
+                food_nutrients.append((fdc_id, nutrient_id, float(amount)))
+            
+            # Either list can fill first; foods with few nutrients only grow the food list
+            if len(food_nutrients) >= CHUNK_SIZE or len(foods) >= CHUNK_SIZE:
+                counts['foods'] += self._flush_json(foods, food_nutrients)
+                counts['food_nutrients'] += len(food_nutrients)
+                foods, food_nutrients = [], []
+        
+        counts['foods'] += self._flush_json(foods, food_nutrients)
+        counts['food_nutrients'] += len(food_nutrients)
+        
+        self._write_batch(
+            "INSERT OR REPLACE INTO nutrient (id, name, unit_name, nutrient_nbr) VALUES (?, ?, ?, ?)",
+            list(nutrients.values())
+        )
+        counts['nutrients'] = len(nutrients)
+        
+        self._finish_import()
+        return counts
+    
+    def _flush_json(self, foods, food_nutrients):
+        if foods:
+            self._write_batch(
+                "INSERT OR REPLACE INTO food (fdc_id, description, brand, data_type, serving_size, serving_unit) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                foods
+            )
+        if food_nutrients:
+            self._write_batch(
+                "INSERT OR REPLACE INTO food_nutrient (fdc_id, nutrient_id, amount) VALUES (?, ?, ?)",
+                food_nutrients
+            )
+        return len(foods)
+    
+    # ---- Lookup ----
+    
+    def _amounts_for(self, fdc_ids):
+        """Return {fdc_id: {nutrient_id: amount}} for the tracked nutrients of some foods"""
+        tracked_ids = sorted(NUTRIENT_MAP)
+        id_marks = ','.join('?' * len(fdc_ids))
+        nutrient_marks = ','.join('?' * len(tracked_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT fdc_id, nutrient_id, amount FROM food_nutrient "
+                f"WHERE fdc_id IN ({id_marks}) AND nutrient_id IN ({nutrient_marks})",
+                list(fdc_ids) + tracked_ids
+            ).fetchall()
+        
+        amounts = {}
+        for fdc_id, nutrient_id, amount in rows:
+            amounts.setdefault(fdc_id, {})[nutrient_id] = amount
+        return amounts
+    
+    def _to_food_info(self, row, amounts):
+        """Build a food dict in the same format as USDAFoodAPI results"""
+        fdc_id, description, brand, serving_size, serving_unit = row
+        food_info = {
+            'fdc_id': fdc_id,
+            'description': description,
+            'brand': brand or 'Generic',
+            'serving_size': serving_size or 100,
+            'serving_unit': serving_unit or 'g',
+        }
+        food_info.update(from_amounts(amounts))
+        return food_info
+    
+    def search(self, query, limit=10):
+        """Full-text search on description and brand (prefix match on each word)"""
+        words = [word.replace('"', '') for word in query.split()]
+        words = [word for word in words if word]
+        if not words:
+            return []
+        
+        match = ' '.join(f'"{word}"*' for word in words)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT f.fdc_id, f.description, f.brand, f.serving_size, f.serving_unit "
+                "FROM food_fts JOIN food f ON f.fdc_id = food_fts.rowid "
+                "WHERE food_fts MATCH ? ORDER BY food_fts.rank LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        if not rows:
+            return []
+        
+        amounts = self._amounts_for([row[0] for row in rows])
+        return [self._to_food_info(row, amounts.get(row[0], {})) for row in rows]
+    
+    def get_food(self, fdc_id):
+        """Return one food in USDAFoodAPI format, or None if it isn't indexed"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fdc_id, description, brand, serving_size, serving_unit FROM food WHERE fdc_id = ?",
+                (int(fdc_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        food_info = self._to_food_info(row, self._amounts_for([row[0]]).get(row[0], {}))
+        for field in MACRO_FIELDS:
+            food_info.setdefault(field, 0)
+        return food_info
+
+
+def _read_csv(path):
+    """Stream rows from a CSV file as dicts"""
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+def _json_food_key(path):
+    """Return the top-level key an FDC JSON download keeps its foods under"""
+    # The key opens the file, so the first few KB are enough to find it
+    with open(path, encoding='utf-8') as f:
+        head = f.read(4096)
+    key = next((k for k in JSON_FOOD_KEYS if f'"{k}"' in head), None)
+    if key is None:
+        raise ValueError(
+            f"{os.path.basename(path)} doesn't look like an FDC JSON download; "
+            f"expected one of {', '.join(JSON_FOOD_KEYS)} at the start of the file"
+        )
+    return key
+
+
+def _iter_json_foods(path, key):
+    """Yield foods from an FDC JSON download one at a time"""
+    import ijson
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, f'{key}.item', use_float=True)
+
+
+_local_index = None
+_local_checked = False
+
+
+def get_local_index():
+    """Return the shared FoodIndex if a populated local database exists, else None"""
+    global _local_index, _local_checked
+    if not _local_checked:
+        _local_checked = True
+        if os.path.exists(FDC_DB_PATH):
+            index = FoodIndex(FDC_DB_PATH)
+            if index.food_count():
+                _local_index = index
+    return _local_index
+
+
+# Import a bulk download from the command line
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python api/fdc_local.py <FDC csv folder or .json file> [--macros-only]")
+        sys.exit(1)
+    
+    source = sys.argv[1]
+    # --macros-only keeps the database small by skipping micronutrients
+    nutrient_ids = None
+    if '--macros-only' in sys.argv:
+        nutrient_ids = ids_for_fields(MACRO_FIELDS)
+    
+    index = FoodIndex()
+    start = time.perf_counter()
+    print(f"Importing {source}...")
+    try:
+        if os.path.isdir(source):
+            counts = index.import_csv_dir(source, nutrient_ids=nutrient_ids)
+        else:
+            counts = index.import_json(source, nutrient_ids=nutrient_ids)
+    except (ImportError, ValueError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    print(f"✓ Imported {counts} in {time.perf_counter() - start:.1f}s")
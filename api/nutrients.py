@@ -0,0 +1,122 @@
+# FoodData Central nutrient ids mapped to the fields the app uses.
+# Each id maps to (field, rank); when a food reports several ids for the
+# same field, the lowest rank wins. Dispatch is a single dict lookup, so
+# "fatty acids, saturated" can never overwrite total fat the way a
+# substring match on the name could.
+NUTRIENT_MAP = {
+    # Macros
+    1003: ('protein_g', 0),
+    1004: ('fats_g', 0),            # Total lipid (fat)
+    1085: ('fats_g', 1),            # Total fat (NLEA)
+    1005: ('carbs_g', 0),           # Carbohydrate, by difference
+    1050: ('carbs_g', 1),           # Carbohydrate, by summation
+    1008: ('calories', 0),          # Energy (kcal)
+    2047: ('calories', 1),          # Energy (Atwater General Factors)
+    2048: ('calories', 2),          # Energy (Atwater Specific Factors)
+    
+    # Fat breakdown
+    1258: ('saturated_fat_g', 0),
+    1292: ('monounsaturated_fat_g', 0),
+    1293: ('polyunsaturated_fat_g', 0),
+    1257: ('trans_fat_g', 0),
+    1253: ('cholesterol_mg', 0),
+    
+    # Carb breakdown
+    1079: ('fiber_g', 0),
+    2000: ('sugars_g', 0),          # Total sugars
+    1063: ('sugars_g', 1),          # Sugars, Total NLEA
+    
+    # Minerals
+    1087: ('calcium_mg', 0),
+    1089: ('iron_mg', 0),
+    1090: ('magnesium_mg', 0),
+    1091: ('phosphorus_mg', 0),
+    1092: ('potassium_mg', 0),
+    1093: ('sodium_mg', 0),
+    1095: ('zinc_mg', 0),
+    
+    # Vitamins
+    1106: ('vitamin_a_ug', 0),      # RAE
+    1162: ('vitamin_c_mg', 0),
+    1114: ('vitamin_d_ug', 0),
+    1109: ('vitamin_e_mg', 0),
+    1185: ('vitamin_k_ug', 0),
+    1165: ('thiamin_mg', 0),
+    1166: ('riboflavin_mg', 0),
+    1167: ('niacin_mg', 0),
+    1175: ('vitamin_b6_mg', 0),
+    1177: ('folate_ug', 0),
+    1178: ('vitamin_b12_ug', 0),
+    
+    # Other
+    1051: ('water_g', 0),
+    1057: ('caffeine_mg', 0),
+}
+
+# Legacy nutrient numbers, for payloads that only carry "number"
+NUTRIENT_NUMBERS = {
+    '203': 1003, '204': 1004, '205': 1005, '208': 1008, '291': 1079,
+    '269': 2000, '606': 1258, '645': 1292, '646': 1293, '605': 1257,
+    '601': 1253, '301': 1087, '303': 1089, '304': 1090, '305': 1091,
+    '306': 1092, '307': 1093, '309': 1095, '320': 1106, '401': 1162,
+    '328': 1114, '323': 1109, '430': 1185, '404': 1165, '405': 1166,
+    '406': 1167, '415': 1175, '417': 1177, '418': 1178, '255': 1051,
+    '262': 1057, '957': 2047, '958': 2048,
+}
+
+MACRO_FIELDS = ('protein_g', 'carbs_g', 'fats_g', 'calories')
+
+
+def ids_for_fields(fields):
+    """Return every nutrient id that feeds any of the given fields"""
+    fields = set(fields)
+    return {nutrient_id for nutrient_id, (field, _) in NUTRIENT_MAP.items() if field in fields}
+
+
+def _id_and_amount(item):
+    """Pull the nutrient id and amount out of any FDC foodNutrients entry.
+    
+    Search results use nutrientId/value, full details nest the id under
+    "nutrient" and use amount, and the abridged format uses number/amount.
+    """
+    nutrient = item.get('nutrient')
+    if nutrient:
+        nutrient_id = nutrient.get('id')
+        if nutrient_id is None:
+            nutrient_id = NUTRIENT_NUMBERS.get(str(nutrient.get('number')))
+    else:
+        nutrient_id = item.get('nutrientId')
+        if nutrient_id is None:
+            nutrient_id = NUTRIENT_NUMBERS.get(str(item.get('nutrientNumber') or item.get('number')))
+    
+    amount = item.get('amount')
+    if amount is None:
+        amount = item.get('value')
+    return nutrient_id, amount
+
+
+def from_amounts(amounts, fields=None):
+    """Build a {field: value} dict from {nutrient_id: amount}"""
+    values = {}
+    ranks = {}
+    for nutrient_id, amount in amounts.items():
+        spec = NUTRIENT_MAP.get(nutrient_id)
+        if spec is None or amount is None:
+            continue
+        field, rank = spec
+        if fields is not None and field not in fields:
+            continue
+        if rank < ranks.get(field, len(NUTRIENT_MAP)):
+            values[field] = amount
+            ranks[field] = rank
+    return values
+
+
+def extract_nutrients(food_nutrients, fields=None):
+    """Build a {field: value} dict from an FDC foodNutrients list"""
+    amounts = {}
+    for item in food_nutrients:
+        nutrient_id, amount = _id_and_amount(item)
+        if nutrient_id is not None and amount is not None:
+            amounts[nutrient_id] = amount
+    return from_amounts(amounts, fields)
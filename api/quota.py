@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+QUOTA_DB_PATH = os.getenv('API_QUOTA_PATH', 'api_quota.db')
+
+# Daily budgets and burst smoothing for each API we call
+DEFAULT_LIMITS = {
+    # RapidAPI free tier: 100 requests/day
+    'exercisedb': {
+        'daily_limit': int(os.getenv('EXERCISEDB_DAILY_LIMIT', 100)),
+        'rate_per_second': 1.0,
+        'burst': 5
+    },
+    # USDA DEMO_KEY: 30 requests/hour, 50/day per IP
+    'usda': {
+        'daily_limit': int(os.getenv('USDA_DAILY_LIMIT', 50)),
+        'rate_per_second': 30 / 3600,
+        'burst': 10
+    },
+}
+
+# How long a remaining count reported by the server is trusted
+REPORTED_TTL_SECONDS = 3600
+
+
+class QuotaExceeded(Exception):
+    """Raised when an API call would go over its request budget"""
+
+
+class TokenBucket:
+    """Token bucket that refills at a steady rate up to a burst capacity"""
+    
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_acquire(self, tokens=1, wait=0):
+        """Take tokens, waiting up to `wait` seconds for a refill; returns True on success"""
+        deadline = time.monotonic() + wait
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+                needed = (tokens - self.tokens) / self.rate if self.rate else float('inf')
+            if time.monotonic() + needed > deadline:
+                return False
+            time.sleep(needed)
+    
+    def available(self):
+        """Whole tokens that could be taken right now"""
+        with self._lock:
+            self._refill()
+            return int(self.tokens)
+
+
+class QuotaManager:
+    """Tracks remaining daily API calls on disk and smooths bursts"""
+    
+    def __init__(self, db_path=QUOTA_DB_PATH, limits=None):
+        self.db_path = db_path
+        self.limits = {}
+        self.buckets = {}
+        self._reported = {}  # api -> (remaining, reported_at)
+        self.version = 0  # bumped whenever a remaining count may have changed
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "api TEXT NOT NULL, "
+            "day TEXT NOT NULL, "
+            "used INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (api, day))"
+        )
+        
+        for api, config in (limits or DEFAULT_LIMITS).items():
+            self.register(api, **config)
+    
+    def register(self, api, daily_limit, rate_per_second, burst):
+        """Set the daily budget and burst smoothing for an API"""
+        self.limits[api] = daily_limit
+        self.buckets[api] = TokenBucket(rate_per_second, burst)
+    
+    @staticmethod
+    def _today():
+        # Provider quotas reset at midnight UTC
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    
+    def used_today(self, api):
+        """Return how many calls to this API were made today"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM usage WHERE api = ? AND day = ?", (api, self._today())
+            ).fetchone()
+        return row[0] if row else 0
+    
+    def remaining(self, api):
+        """Return the calls left today, trusting a recent server-reported count if lower"""
+        remaining = max(self.limits[api] - self.used_today(api), 0)
+        reported = self._fresh_report(api)
+        if reported:
+            remaining = min(remaining, reported[0])
+        return remaining
+    
+    def available(self, api):
+        """Calls that can be made right now without waiting for the burst bucket"""
+        return min(self.remaining(api), self.buckets[api].available())
+    
+    def _fresh_report(self, api):
+        reported = self._reported.get(api)
+        if reported and time.time() - reported[1] < REPORTED_TTL_SECONDS:
+            return reported
+        return None
+    
+    def _reserve(self, api):
+        """Count one call against today's budget if any is left; returns True if it was counted.
+        
+        The check and the increment are one UPDATE under the lock, so
+        concurrent callers can't all pass the check and overshoot.
+        """
+        day = self._today()
+        with self._lock:
+            reported = self._fresh_report(api)
+            if reported and reported[0] <= 0:
+                return False
+            self._conn.execute("INSERT OR IGNORE INTO usage (api, day, used) VALUES (?, ?, 0)", (api, day))
+            counted = self._conn.execute(
+                "UPDATE usage SET used = used + 1 WHERE api = ? AND day = ? AND used < ?",
+                (api, day, self.limits[api])
+            ).rowcount == 1
+            if counted:
+                self.version += 1
+                if reported:
+                    self._reported[api] = (reported[0] - 1, reported[1])
+        return counted
+    
+    def _release(self, api):
+        """Give back a call counted by _reserve that was never made"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE usage SET used = used - 1 WHERE api = ? AND day = ? AND used > 0",
+                (api, self._today())
+            )
+            reported = self._fresh_report(api)
+            if reported:
+                self._reported[api] = (reported[0] + 1, reported[1])
+            self.version += 1
+    
+    def try_acquire(self, api, wait=0):
+        """Reserve one call; returns False if the daily budget or burst bucket is empty"""
+        try:
+            self.acquire(api, wait=wait)
+        except QuotaExceeded:
+            return False
+        return True
+    
+    def acquire(self, api, wait=0):
+        """Reserve one call or raise QuotaExceeded"""
+        if not self._reserve(api):
+            raise QuotaExceeded(f"Daily {api} request limit reached ({self.limits[api]}/day)")
+        # The daily slot is taken first so waiting for the bucket never holds the lock
+        if not self.buckets[api].try_acquire(wait=wait):
+            self._release(api)
+            raise QuotaExceeded(f"Too many {api} requests at once, try again in a moment")
+    
+    def record_response(self, api, response, remaining_header):
+        """Sync with the remaining count the server reports, if any"""
+        if response.status_code == 429:
+            with self._lock:
+                self._reported[api] = (0, time.time())
+                self.version += 1
+            return
+        value = response.headers.get(remaining_header)
+        if value is not None and value.isdigit():
+            with self._lock:
+                self._reported[api] = (int(value), time.time())
+                self.version += 1
+    
+    def status(self):
+        """Return remaining and total calls for every registered API"""
+        return {
+            api: {'remaining': self.remaining(api), 'limit': limit}
+            for api, limit in self.limits.items()
+        }
+
+
+_default_manager = None
+_default_lock = threading.Lock()
+
+
+def get_quota_manager():
+    """Return the quota manager shared across the app"""
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = QuotaManager()
+        return _default_manager
@@ -0,0 +1,154 @@
+import os
+import random
+import sys
+import threading
+import time
+
+# Allow running this file directly from the api/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lazy import lazy_import
+
+# requests is loaded by the first call, usually on a worker thread
+requests = lazy_import('requests')
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HTTPTransport:
+    """Connection-pooled HTTP client shared by the API wrappers.
+    
+    Keeps TCP/TLS connections alive between calls, applies a default timeout
+    and retries 429/5xx responses and connection failures with jittered
+    exponential backoff. Point an API wrapper's base_url at a local stub
+    server to exercise it without the network.
+    """
+    
+    def __init__(self, pool_size=10, timeout=10, max_retries=3, backoff_base=0.5, backoff_max=8.0):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """The pooled requests.Session, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Retries are handled below so the backoff and Retry-After logic is in one place
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+    
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before the next attempt (full jitter)"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    def request(self, method, url, params=None, headers=None, json=None, timeout=None):
+        """Send a request, retrying transient failures; returns the final response"""
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=headers,
+                    json=json,
+                    timeout=self.timeout if timeout is None else timeout
+                )
+            except requests.exceptions.ConnectionError:
+                # Read timeouts are not retried, they would only multiply the wait
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                time.sleep(self._backoff(attempt, response))
+            attempt += 1
+    
+    def get(self, url, **kwargs):
+        """Send a GET request"""
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        """Send a POST request"""
+        return self.request('POST', url, **kwargs)
+    
+    def close(self):
+        """Close every pooled connection"""
+        if self._session is not None:
+            self._session.close()
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def get_transport():
+    """Return the transport shared across the app, configured from the environment"""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport(
+                pool_size=int(os.getenv('HTTP_POOL_SIZE', 10)),
+                timeout=float(os.getenv('HTTP_TIMEOUT', 10)),
+                max_retries=int(os.getenv('HTTP_MAX_RETRIES', 3))
+            )
+        return _default_transport
+
+
+# Exercise the retry logic against a local stub server
+if __name__ == "__main__":
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    calls = []
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        
+        def do_GET(self):
+            calls.append(self.path)
+            # Fail the first two calls to force retries
+            status = 503 if len(calls) <= 2 else 200
+            body = b'{"ok": true}'
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    transport = HTTPTransport(backoff_base=0.05)
+    response = transport.get(f"{base_url}/retry")
+    print(f"Status {response.status_code} after {len(calls)} attempts")
+    
+    start = time.perf_counter()
+    for _ in range(20):
+        transport.get(f"{base_url}/keepalive")
+    print(f"Average keep-alive request: {(time.perf_counter() - start) / 20 * 1000:.2f} ms")
+    
+    server.shutdown()
@@ -1,17 +1,182 @@
-import requests
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Allow running this file directly from the api/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.fdc_local import get_local_index
+from api.nutrients import MACRO_FIELDS, extract_nutrients
+from api.quota import QuotaExceeded, get_quota_manager
+from api.transport import get_transport
+from utils.lazy import lazy_import
+
+requests = lazy_import('requests')
+
+# Bump when the parsed result format changes so old cache entries are ignored
+CACHE_VERSION = 2
+CACHE_DB_PATH = os.getenv('USDA_CACHE_PATH', 'api_cache.db')
+QUOTA_NAME = 'usda'
+
+# The /foods endpoint accepts at most 20 ids per request
+DETAILS_BATCH_SIZE = 20
+
+
+class QuotaShortfall(QuotaExceeded):
+    """The request budget ran out before every food was fetched; results holds what was found"""
+    
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+class ResponseCache:
+    """SQLite-backed cache for API responses with TTL and LRU eviction"""
+    
+    def __init__(self, db_path=CACHE_DB_PATH, ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        # One connection shared behind a lock so cache lookups stay cheap
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+    
+    @staticmethod
+    def make_key(kind, *parts):
+        """Build a cache key from a request kind and its normalized parameters"""
+        normalized = [' '.join(str(part).lower().split()) for part in parts]
+        return f"v{CACHE_VERSION}:{kind}:" + '|'.join(normalized)
+    
+    def get(self, key, allow_expired=False):
+        """Return the cached value for key, or None if missing or expired.
+        
+        allow_expired returns entries past their TTL, for use as a fallback
+        when the API can't be reached.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None or (not allow_expired and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+    
+    def set(self, key, value):
+        """Store a value and evict the least recently used entries if over capacity"""
+        now = time.time()
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+    
+    def clear(self):
+        """Remove every cached entry and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        """Return hit/miss counters and the current number of entries"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries
+        }
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the cache shared by every USDAFoodAPI instance"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
 
 class USDAFoodAPI:
     """Wrapper for USDA FoodData Central API - completely free!"""
     
-    def __init__(self):
+    def __init__(self, cache=None, transport=None, quota=None, local_index=None, base_url=None, timeout=None):
         # USDA FoodData Central API (no key required for basic use)
-        self.base_url = "https://api.nal.usda.gov/fdc/v1"
+        self.base_url = base_url or "https://api.nal.usda.gov/fdc/v1"
         # You can get a free API key from https://fdc.nal.usda.gov/api-key-signup.html
         # For now, we'll use the DEMO_KEY which has limited requests
         self.api_key = "DEMO_KEY"
+        self.timeout = timeout  # seconds; None uses the transport's timeout (HTTP_TIMEOUT)
+        self.transport = transport or get_transport()
+        self.quota = quota or get_quota_manager()
+        
+        # Responses are cached on disk so repeat searches skip the network
+        self.cache = cache if cache is not None else get_default_cache()
+        
+        # An imported FDC bulk download (see api/fdc_local.py) replaces the API
+        self.local_index = local_index if local_index is not None else get_local_index()
+    
+    def _get(self, url, params):
+        """Send a GET request within the daily quota and return the JSON body"""
+        self.quota.acquire(QUOTA_NAME)
+        response = self.transport.get(url, params=params, timeout=self.timeout)
+        self.quota.record_response(QUOTA_NAME, response, 'X-RateLimit-Remaining')
+        response.raise_for_status()
+        return response.json()
+    
+    def _post(self, url, params, body):
+        """Send a POST request within the daily quota and return the JSON body"""
+        self.quota.acquire(QUOTA_NAME)
+        response = self.transport.post(url, params=params, json=body, timeout=self.timeout)
+        self.quota.record_response(QUOTA_NAME, response, 'X-RateLimit-Remaining')
+        response.raise_for_status()
+        return response.json()
     
     def search_foods(self, query, page_size=10):
         """Search for foods by name"""
+        if self.local_index is not None:
+            return self.local_index.search(query, limit=page_size)
+        
+        cache_key = self.cache.make_key('search', query, page_size)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         url = f"{self.base_url}/foods/search"
         params = {
             'query': query,
@@ -20,27 +185,127 @@ class USDAFoodAPI:
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return self._parse_search_results(data)
+            data = self._get(url, params)
+            results = self._parse_search_results(data)
+            self.cache.set(cache_key, results)
+            return results
+        except QuotaExceeded:
+            # Out of budget, an expired cached result beats no result
+            stale = self.cache.get(cache_key, allow_expired=True)
+            if stale is not None:
+                return stale
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error searching foods: {e}")
             return []
     
     def get_food_details(self, fdc_id):
         """Get detailed nutrition info for a specific food"""
+        if self.local_index is not None:
+            local = self.local_index.get_food(fdc_id)
+            if local is not None:
+                return local
+        
+        cache_key = self.cache.make_key('food', fdc_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         url = f"{self.base_url}/food/{fdc_id}"
         params = {'api_key': self.api_key}
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return self._parse_food_details(response.json())
+            details = self._parse_food_details(self._get(url, params))
+            self.cache.set(cache_key, details)
+            return details
+        except QuotaExceeded:
+            stale = self.cache.get(cache_key, allow_expired=True)
+            if stale is not None:
+                return stale
+            raise
         except requests.exceptions.RequestException as e:
             print(f"Error getting food details: {e}")
             return None
     
+    def get_foods_details(self, fdc_ids, max_workers=4):
+        """Get detailed nutrition info for many foods at once.
+        
+        Foods found locally or in the cache are not fetched again. The rest
+        are requested 20 at a time from the /foods endpoint, with up to
+        max_workers requests in flight, but only as many requests as the
+        quota allows right now; the USDA bucket refills far too slowly to
+        wait for. Foods left over fall back to expired cache entries.
+        Results come back in input order, with None for foods that don't
+        exist or couldn't be fetched; if any were missed because of the
+        quota, QuotaShortfall is raised with the partial results instead.
+        """
+        fdc_ids = [int(fdc_id) for fdc_id in fdc_ids]
+        results = {}
+        missing = []
+        
+        for fdc_id in dict.fromkeys(fdc_ids):
+            if self.local_index is not None:
+                local = self.local_index.get_food(fdc_id)
+                if local is not None:
+                    results[fdc_id] = local
+                    continue
+            
+            cached = self.cache.get(self.cache.make_key('food', fdc_id))
+            if cached is not None:
+                results[fdc_id] = cached
+            else:
+                missing.append(fdc_id)
+        
+        batches = [missing[i:i + DETAILS_BATCH_SIZE] for i in range(0, len(missing), DETAILS_BATCH_SIZE)]
+        allowed = self.quota.available(QUOTA_NAME) if batches else 0
+        over_budget = [fdc_id for batch in batches[allowed:] for fdc_id in batch]
+        if batches[:allowed]:
+            with ThreadPoolExecutor(max_workers=min(max_workers, allowed)) as pool:
+                for details, blocked in pool.map(self._fetch_details_batch, batches[:allowed]):
+                    results.update(details)
+                    over_budget.extend(blocked)
+        
+        # Out of budget, fall back to expired cache entries where we have them
+        unfetched = 0
+        for fdc_id in over_budget:
+            stale = self.cache.get(self.cache.make_key('food', fdc_id), allow_expired=True)
+            if stale is not None:
+                results[fdc_id] = stale
+            else:
+                unfetched += 1
+        
+        ordered = [results.get(fdc_id) for fdc_id in fdc_ids]
+        if unfetched:
+            raise QuotaShortfall(
+                f"USDA request limit reached, {unfetched} of {len(set(fdc_ids))} foods weren't fetched; "
+                "try again later",
+                ordered
+            )
+        return ordered
+    
+    def _fetch_details_batch(self, fdc_ids):
+        """Fetch up to 20 foods in one request; returns ({fdc_id: details}, ids skipped for quota)"""
+        url = f"{self.base_url}/foods"
+        params = {'api_key': self.api_key}
+        body = {'fdcIds': fdc_ids, 'format': 'full'}
+        
+        try:
+            data = self._post(url, params, body)
+        except QuotaExceeded:
+            # Another caller used the budget after it was checked
+            return {}, fdc_ids
+        except requests.exceptions.RequestException as e:
+            print(f"Error getting food details: {e}")
+            return {}, []
+        
+        details = {}
+        for food in data:
+            food_info = self._parse_food_details(food)
+            fdc_id = food_info['fdc_id']
+            self.cache.set(self.cache.make_key('food', fdc_id), food_info)
+            details[fdc_id] = food_info
+        return details, []
+    
     def _parse_search_results(self, data):
         """Parse search results into simplified format"""
         foods = []
@@ -57,23 +322,8 @@ class USDAFoodAPI:
                 'serving_unit': food.get('servingSizeUnit', 'g'),
             }
             
-            # Extract macros from foodNutrients
-            nutrients = {}
-            if 'foodNutrients' in food:
-                for nutrient in food['foodNutrients']:
-                    name = nutrient.get('nutrientName', '').lower()
-                    value = nutrient.get('value', 0)
-                    
-                    if 'protein' in name:
-                        nutrients['protein_g'] = value
-                    elif 'carbohydrate' in name:
-                        nutrients['carbs_g'] = value
-                    elif 'total lipid' in name or 'fat' in name:
-                        nutrients['fats_g'] = value
-                    elif 'energy' in name:
-                        # Convert kJ to kcal if needed
-                        if nutrient.get('unitName', '').upper() == 'KCAL':
-                            nutrients['calories'] = value
+            # Nutrients are matched by FDC id, see api/nutrients.py
+            nutrients = extract_nutrients(food.get('foodNutrients', []))
             
             food_info.update(nutrients)
             foods.append(food_info)
@@ -90,30 +340,9 @@ class USDAFoodAPI:
             'serving_unit': data.get('servingSizeUnit', 'g'),
         }
         
-        # Extract detailed nutrients
-        nutrients = {
-            'protein_g': 0,
-            'carbs_g': 0,
-            'fats_g': 0,
-            'calories': 0
-        }
-        
-        if 'foodNutrients' in data:
-            for nutrient in data['foodNutrients']:
-                nutrient_data = nutrient.get('nutrient', {})
-                name = nutrient_data.get('name', '').lower()
-                value = nutrient.get('amount', 0)
-                
-                if 'protein' in name:
-                    nutrients['protein_g'] = value
-                elif 'carbohydrate' in name and 'by difference' in name.lower():
-                    nutrients['carbs_g'] = value
-                elif 'total lipid' in name or ('fat' in name and 'total' in name):
-                    nutrients['fats_g'] = value
-                elif 'energy' in name:
-                    unit = nutrient_data.get('unitName', '').upper()
-                    if unit == 'KCAL':
-                        nutrients['calories'] = value
+        # Extract detailed nutrients, defaulting the macros to zero
+        nutrients = {field: 0 for field in MACRO_FIELDS}
+        nutrients.update(extract_nutrients(data.get('foodNutrients', [])))
         
         food_info.update(nutrients)
         return food_info
@@ -131,6 +360,17 @@ class USDAFoodAPI:
         }
 
 
+_shared_api = None
+
+
+def get_food_api():
+    """Return the USDAFoodAPI instance shared across the app"""
+    global _shared_api
+    if _shared_api is None:
+        _shared_api = USDAFoodAPI()
+    return _shared_api
+
+
 # Example usage
 if __name__ == "__main__":
     api = USDAFoodAPI()
@@ -146,3 +386,5 @@ if __name__ == "__main__":
         print(f"  Carbs: {food.get('carbs_g', 0):.1f}g")
         print(f"  Fats: {food.get('fats_g', 0):.1f}g")
         print(f"  Calories: {food.get('calories', 0):.0f}")
+    
+    print(f"\nCache: {api.cache.stats()}")
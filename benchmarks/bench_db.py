@@ -0,0 +1,185 @@
+"""Time the queries behind the dashboard, nutrition and progress views.
+
+Run from the project root:
+    python benchmarks/bench_db.py [--db benchmarks/bench.db] [--users 100] [--years 2]
+                                  [--out results.json] [--compare earlier.json]
+
+Generates a seeded database with benchmarks/datagen.py if --db doesn't
+exist yet, then runs each query the views make for a sample of users and
+writes the timings to JSON (benchmarks/results/ by default). --compare
+prints the change against an earlier results file.
+"""
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+import sqlalchemy
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import DEFAULT_DB, EXERCISES, cli_option, generate, has_users
+from database.models import init_db, get_session, NutritionLog, User
+from database.records import check_records
+from database.queries import meals_page, meal_cursor, progress_page, progress_cursor, progress_summary
+from database.rollups import week_summary
+from utils.analytics import TrendAnalytics
+from utils.tdee import AdaptiveTDEE
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+SAMPLE_USERS = 20
+REPEATS = 5
+
+# How far down the progress history the "deep" page starts
+DEEP_PAGES = 10
+
+
+def _latest_log(session, user_id):
+    return session.query(NutritionLog).filter_by(user_id=user_id).order_by(NutritionLog.date.desc()).first()
+
+
+def _deep_cursor(session, user_id):
+    """Cursor DEEP_PAGES pages into a user's progress history"""
+    cursor = None
+    for _ in range(DEEP_PAGES):
+        page = progress_page(session, user_id, before=cursor)
+        if not page:
+            break
+        cursor = progress_cursor(page[-1])
+    return cursor
+
+
+def build_cases(session, user_id, today):
+    """Return {name: zero-argument function} for the queries each view makes"""
+    log = _latest_log(session, user_id)
+    first_meals = meals_page(session, log.id) if log else []
+    meals_after = meal_cursor(first_meals[0]) if first_meals else None
+    deep = _deep_cursor(session, user_id)
+    workout = [(name, 3, 8, start_kg * 2) for name, _, _, _, start_kg in EXERCISES[:4]]
+    
+    return {
+        # Dashboard
+        'dashboard.week_summary': lambda: week_summary(session, user_id, today),
+        'dashboard.tdee_estimate_cold': lambda: AdaptiveTDEE().estimate(session, user_id, today),
+        # save_workout: compare a four-exercise workout with the stored records
+        'workout.record_check': lambda: check_records(session, user_id, workout),
+        # show_nutrition_log: today's log, then the first page of meals
+        'nutrition.todays_log': lambda: session.query(NutritionLog).filter_by(user_id=user_id, date=today).first(),
+        'nutrition.meals_first_page': lambda: meals_page(session, log.id) if log else None,
+        # update_meals_display paging on from the first meal
+        'nutrition.meals_next_page': lambda: meals_page(session, log.id, after=meals_after) if log else None,
+        # show_progress
+        'progress.summary': lambda: progress_summary(session, user_id),
+        'progress.first_page': lambda: progress_page(session, user_id),
+        'progress.deep_page': lambda: progress_page(session, user_id, before=deep),
+        'progress.trend_analytics_cold': lambda: TrendAnalytics().summary(session, user_id),
+    }
+
+
+def run(engine, sample_users=SAMPLE_USERS, repeats=REPEATS, seed=42, today=None):
+    """Time every case for a sample of users; returns {name: stats}"""
+    today = today or date.today()
+    session = get_session(engine)
+    user_ids = [row[0] for row in session.query(User.id).order_by(User.id)]
+    sample = random.Random(seed).sample(user_ids, min(sample_users, len(user_ids)))
+    
+    timings = {}
+    for user_id in sample:
+        for name, case in build_cases(session, user_id, today).items():
+            for _ in range(repeats):
+                # Start each run without objects already in the identity map
+                session.expunge_all()
+                start = time.perf_counter()
+                case()
+                timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    session.close()
+    
+    results = {}
+    for name, values in timings.items():
+        values.sort()
+        results[name] = {
+            'median_ms': round(statistics.median(values), 4),
+            'p95_ms': round(values[min(int(len(values) * 0.95), len(values) - 1)], 4),
+            'min_ms': round(values[0], 4),
+            'max_ms': round(values[-1], 4),
+            'runs': len(values),
+        }
+    return results
+
+
+def dataset_info(engine):
+    """Row counts per table and the database file size"""
+    info = {}
+    with engine.connect() as connection:
+        for table in ('users', 'workouts', 'exercises', 'nutrition_logs', 'meals', 'progress_entries', 'rollups'):
+            info[table] = connection.execute(sqlalchemy.text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    info['file_mb'] = round(os.path.getsize(engine.url.database) / 1e6, 1)
+    return info
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, earlier_path):
+    """Print each query's median against an earlier results file"""
+    with open(earlier_path) as f:
+        earlier = json.load(f)['queries']
+    print(f"\nCompared with {earlier_path}:")
+    for name, stats in results.items():
+        if name in earlier and earlier[name]['median_ms']:
+            ratio = stats['median_ms'] / earlier[name]['median_ms']
+            print(f"  {name:34} {earlier[name]['median_ms']:9.3f} -> {stats['median_ms']:9.3f} ms  ({ratio:.2f}x)")
+
+
+if __name__ == "__main__":
+    db_path = cli_option('--db', DEFAULT_DB)
+    users = cli_option('--users', 100)
+    years = cli_option('--years', 2.0)
+    seed = cli_option('--seed', 42)
+    
+    engine = init_db(db_path)
+    if not has_users(engine):
+        print(f"Generating {users} users x {years} years into {db_path}...")
+        start = time.perf_counter()
+        generate(engine, users=users, years=years, seed=seed)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+    
+    results = run(engine, seed=seed)
+    for name, stats in results.items():
+        print(f"{name:36} median {stats['median_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms")
+    
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'dataset': dataset_info(engine),
+        'queries': results,
+    }
+    
+    out = cli_option('--out', '')
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"db_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {out}")
+    
+    if '--compare' in sys.argv:
+        compare(results, cli_option('--compare', ''))
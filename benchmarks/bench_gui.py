@@ -0,0 +1,191 @@
+"""Benchmark how long each view takes to build and refresh.
+
+Run from the project root:
+    python benchmarks/bench_gui.py [--users 20] [--years 5] [--save-baseline]
+
+Generates a seeded database, starts FitnessTrackerApp with its window
+withdrawn and, for every view, times the first build, the
+update_idletasks() that lays it out, the number of widgets it creates
+and its refresh. The nutrition refresh is also broken down into
+update_macro_display and update_meals_display.
+
+Needs a display. Without one it starts Xvfb if it is installed, and
+otherwise skips. Results are compared with benchmarks/gui_baseline.json
+and the run fails (exit code 1) if any timing regressed;
+--save-baseline stores this run as the new baseline.
+
+The baseline is not committed: timings only compare on the same machine,
+so it is git-ignored and each checkout saves its own before making changes.
+"""
+import cProfile
+import json
+import os
+import pstats
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import cli_option, generate
+from database.models import init_db
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gui_baseline.json')
+
+VIEWS = ('dashboard', 'workout', 'nutrition', 'progress')
+REPEATS = 5
+
+# A timing regressed if it is this much slower than the baseline, and by
+# more than the noise floor
+TOLERANCE = 0.25
+NOISE_FLOOR_MS = 5.0
+
+# Helpers inside the view closures to report separately
+BREAKDOWN = ('update_macro_display', 'update_meals_display')
+
+
+def start_display():
+    """Make sure Tk has a display.
+    
+    Returns the Xvfb process it started, None if a display was already
+    there, or False if there is no way to get one.
+    """
+    if sys.platform in ("win32", "darwin") or os.environ.get("DISPLAY"):
+        return None
+    if not shutil.which("Xvfb"):
+        return False
+    
+    display = ":99"
+    xvfb = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1)
+    os.environ["DISPLAY"] = display
+    return xvfb
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def breakdown(app, name):
+    """Cumulative ms spent in the BREAKDOWN helpers during one refresh"""
+    profile = cProfile.Profile()
+    profile.enable()
+    app.views.refresh(name)
+    profile.disable()
+    
+    found = {}
+    for (_, _, function), (_, _, _, cumulative, _) in pstats.Stats(profile).stats.items():
+        if function in BREAKDOWN:
+            found[function] = found.get(function, 0) + cumulative * 1000
+    return found
+
+
+def measure(app, name, repeats=REPEATS):
+    """Build a view from scratch, then refresh it repeatedly"""
+    app.views.invalidate(name)
+    build_ms = timed(lambda: app.views.show(name))
+    layout_ms = timed(app.update_idletasks)
+    result = {
+        'build_ms': round(build_ms, 2),
+        'layout_ms': round(layout_ms, 2),
+        'widgets': count_widgets(app.views.frames[name]),
+    }
+    
+    if app.views.refreshers.get(name):
+        refreshes = []
+        for _ in range(repeats):
+            refreshes.append(timed(lambda: app.views.refresh(name)) + timed(app.update_idletasks))
+        result['refresh_ms'] = round(statistics.median(refreshes), 2)
+        for function, ms in breakdown(app, name).items():
+            result[f'{function}_ms'] = round(ms, 2)
+    return result
+
+
+def run(users, years, seed=42):
+    """Seed a database, start the app on it and measure every view"""
+    folder = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        engine = init_db(os.path.join(folder, 'fitness_tracker.db'))
+        generate(engine, users=users, years=years, seed=seed)
+        engine.dispose()
+        
+        # The app opens fitness_tracker.db in the working directory and
+        # shows the first user, who now has years of history
+        os.chdir(folder)
+        from main import FitnessTrackerApp
+        
+        start = time.perf_counter()
+        app = FitnessTrackerApp()
+        app.withdraw()
+        app.update_idletasks()
+        results = {'startup': {'build_ms': round((time.perf_counter() - start) * 1000, 2)}}
+        
+        for name in VIEWS:
+            results[name] = measure(app, name)
+        app.on_closing()
+        return results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def regressions(results, baseline):
+    """Return a line for every timing that is slower than the baseline allows"""
+    found = []
+    for view, metrics in results.items():
+        for metric, value in metrics.items():
+            before = baseline.get(view, {}).get(metric)
+            if before is None or not metric.endswith('_ms'):
+                continue
+            if value > before * (1 + TOLERANCE) and value - before > NOISE_FLOOR_MS:
+                found.append(f"{view}.{metric}: {before:.1f} -> {value:.1f} ms")
+    return found
+
+
+if __name__ == "__main__":
+    users = cli_option('--users', 20)
+    years = cli_option('--years', 5.0)
+    
+    xvfb = start_display()
+    if xvfb is False:
+        print("Skipped: no display and Xvfb is not installed")
+        sys.exit(0)
+    
+    try:
+        results = run(users, years)
+    finally:
+        if xvfb:
+            xvfb.terminate()
+    
+    for view, metrics in results.items():
+        print(f"{view:10} " + "  ".join(
+            f"{metric} {value}" for metric, value in metrics.items()
+        ))
+    
+    if '--save-baseline' in sys.argv:
+        with open(BASELINE, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE}")
+    elif os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            found = regressions(results, json.load(f))
+        if found:
+            print("FAIL: slower than baseline")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+        print("OK: no regressions against baseline")
+    else:
+        print("No baseline yet; run with --save-baseline to store one")
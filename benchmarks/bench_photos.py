@@ -0,0 +1,134 @@
+"""Benchmark progress photo thumbnails and memory while paging through photos.
+
+Run from the project root:
+    python benchmarks/bench_photos.py [--photos 500] [--megapixels 12]
+
+Writes synthetic phone-sized JPEGs to a temp folder, then:
+  - times making every photo's thumbnails in the process pool
+  - pages through all photos a screen at a time, as the history list
+    does, and reports how much the process's peak memory grew
+  - times one photo's thumbnails with draft() decoding against a full decode
+
+Fails (exit code 1) if paging grew peak memory by more than the budget.
+"""
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import cli_option
+from utils.photos import THUMBNAIL_SIZES, ThumbnailCache, content_key, make_thumbnails
+
+# Rows the progress history shows at once
+VISIBLE_ROWS = 5
+PEAK_GROWTH_BUDGET_MB = 64
+
+
+def peak_mb():
+    """Peak resident memory of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def write_photos(folder, count, megapixels, seed=42):
+    """Write count distinct JPEGs the size of a phone photo; returns their paths"""
+    from PIL import Image, ImageDraw, ImageFilter
+    
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    rng = random.Random(seed)
+    
+    # Noise keeps the file as large as a real photo; shapes give it edges
+    image = Image.effect_noise((width, height), 60).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.ellipse((x, y, x + width // 6, y + height // 6), fill=tuple(rng.randrange(256) for _ in range(3)))
+    image = image.filter(ImageFilter.GaussianBlur(1))
+    base = os.path.join(folder, 'base.jpg')
+    image.save(base, 'JPEG', quality=95)
+    with open(base, 'rb') as f:
+        data = f.read()
+    
+    # Bytes after the end-of-image marker are ignored by decoders, so each
+    # copy decodes the same but has its own content hash
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f'photo_{i:04d}.jpg')
+        with open(path, 'wb') as f:
+            f.write(data + f'copy {i}'.encode())
+        paths.append(path)
+    return paths, len(data) / 1e6
+
+
+def full_decode_thumbnails(source, folder):
+    """The same thumbnails without draft(): decode at full size, then shrink"""
+    from PIL import Image, ImageOps
+    
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+    for name, box in THUMBNAIL_SIZES.items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail(box, Image.Resampling.LANCZOS)
+        thumbnail.save(os.path.join(folder, f'full_{name}.jpg'), 'JPEG', quality=85)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    count = cli_option('--photos', 500)
+    megapixels = cli_option('--megapixels', 12.0)
+    
+    folder = tempfile.mkdtemp()
+    try:
+        print(f"Writing {count} photos of {megapixels:.0f} MP...")
+        # In a child process, so the full-size image doesn't raise this one's peak memory
+        with ProcessPoolExecutor(1) as writer:
+            paths, file_mb = writer.submit(write_photos, folder, count, megapixels).result()
+        print(f"  {file_mb:.1f} MB each")
+        
+        thumbs = os.path.join(folder, 'thumbs')
+        cache = ThumbnailCache(thumbs)
+        start = time.perf_counter()
+        futures = [cache.generate(path) for path in paths]
+        for future in futures:
+            if future is not None:
+                future.result()
+        elapsed = time.perf_counter() - start
+        print(f"thumbnails for {count} photos in {elapsed:.1f}s with {cache.workers} worker processes")
+        cache.shutdown()
+        
+        # Page through the history a screen at a time, as VirtualList does
+        before = peak_mb()
+        start = time.perf_counter()
+        for offset in range(0, count, VISIBLE_ROWS):
+            for path in paths[offset:offset + VISIBLE_ROWS]:
+                cache.get(path, 'row')
+        elapsed = time.perf_counter() - start
+        growth = peak_mb() - before
+        print(f"paged through {count} row thumbnails in {elapsed * 1000:.0f} ms, "
+              f"peak memory {before:.0f} -> {before + growth:.0f} MB ({growth:+.0f} MB)")
+        
+        # Last, since a full decode raises this process's peak memory
+        draft_ms = timed(make_thumbnails, paths[0], content_key(paths[0]), os.path.join(folder, 'draft'))
+        full_ms = timed(full_decode_thumbnails, paths[0], folder)
+        print(f"one photo: draft decode {draft_ms:.0f} ms, full decode {full_ms:.0f} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    if growth > PEAK_GROWTH_BUDGET_MB:
+        print(f"FAIL: peak memory grew by more than {PEAK_GROWTH_BUDGET_MB} MB")
+        sys.exit(1)
+    print("OK: memory stayed flat while paging")
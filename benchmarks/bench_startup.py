@@ -0,0 +1,117 @@
+"""Benchmark cold-start time of the app.
+
+Run from the project root:
+    python benchmarks/bench_startup.py
+
+Measures how long `import main` takes in a fresh interpreter and checks
+that the modules the first screen needs don't pull in pandas, numpy,
+matplotlib or requests. With a display available it also runs
+`main.py --profile-startup` against a seeded database and checks the
+time to first frame.
+
+Fails (exit code 1) if either time is over budget or a heavy module is
+loaded at startup.
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(ROOT)
+
+RUNS = 5
+IMPORT_BUDGET_MS = 800.0
+FIRST_FRAME_BUDGET_MS = 1500.0
+
+# Loaded on demand by the views that need them, never at startup
+DEFERRED = ('pandas', 'numpy', 'matplotlib', 'requests')
+
+# What building the dashboard imports
+STARTUP_CHECK = """
+import sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+from database.rollups import week_summary
+from utils.tdee import get_tdee
+from api.exercisedb import get_exercise_api
+get_exercise_api()
+print(elapsed * 1000)
+print(",".join(name for name in {deferred!r} if name in sys.modules))
+"""
+
+
+def time_imports():
+    """Return the median `import main` time and any heavy modules loaded"""
+    timings = []
+    loaded = set()
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_CHECK.format(deferred=DEFERRED)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        elapsed, modules = result.stdout.splitlines()[-2:]
+        timings.append(float(elapsed))
+        loaded.update(name for name in modules.split(",") if name)
+    return statistics.median(timings), sorted(loaded)
+
+
+def has_display():
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def time_first_frame():
+    """Run main.py --profile-startup on a seeded database; returns (ms, report)"""
+    from database.models import init_db, get_session, User
+    
+    with tempfile.TemporaryDirectory() as folder:
+        # A user skips the setup screen, so the dashboard is what gets drawn
+        engine = init_db(os.path.join(folder, "fitness_tracker.db"))
+        session = get_session(engine)
+        session.add(User(name="Bench", current_weight_kg=80, target_weight_kg=75,
+                         target_protein_g=160, target_carbs_g=180, target_fats_g=60, target_calories=1900))
+        session.commit()
+        session.close()
+        engine.dispose()
+        
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "main.py"), "--profile-startup"],
+            cwd=folder, capture_output=True, text=True, check=True
+        )
+    
+    match = re.search(r"first frame: ([\d.]+) ms", result.stdout)
+    return float(match.group(1)), result.stdout
+
+
+if __name__ == "__main__":
+    failed = False
+    
+    import_ms, loaded = time_imports()
+    print(f"import main          median {import_ms:.1f} ms over {RUNS} runs (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    if import_ms > IMPORT_BUDGET_MS:
+        failed = True
+    if loaded:
+        print(f"FAIL: loaded at startup: {', '.join(loaded)}")
+        failed = True
+    else:
+        print(f"deferred modules     not loaded at startup ({', '.join(DEFERRED)})")
+    
+    if has_display():
+        first_frame_ms, report = time_first_frame()
+        print(f"time to first frame  {first_frame_ms:.1f} ms (budget {FIRST_FRAME_BUDGET_MS:.0f} ms)")
+        if "-v" in sys.argv:
+            print(report)
+        if first_frame_ms > FIRST_FRAME_BUDGET_MS:
+            failed = True
+    else:
+        print("time to first frame  skipped, no display")
+    
+    if failed:
+        print("FAIL: startup over budget")
+        sys.exit(1)
+    print("OK: startup within budget")
@@ -0,0 +1,136 @@
+"""Benchmark the adaptive TDEE estimator on five years of daily data.
+
+Run from the project root:
+    python benchmarks/bench_tdee.py
+
+Fails (exit code 1) if a one-day update takes 10 ms or more.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import init_db, get_session, NutritionLog, ProgressEntry, User
+from utils.tdee import RollingTDEE, estimate_history, get_tdee
+
+YEARS = 5
+BUDGET_MS = 10.0
+SEED = 42
+
+
+def synthetic_days(days, seed=SEED):
+    """Return dates, daily intake and a noisy weight series with a known TDEE of ~2200"""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days)
+    dates, intake, weights = [], [], []
+    weight = 75.0
+    for i in range(days):
+        calories = 2000 + rng.gauss(0, 250)
+        weight += (calories - 2200) / 7700
+        dates.append(start + timedelta(days=i))
+        intake.append(calories)
+        weights.append(weight + rng.gauss(0, 0.4))
+    return dates, intake, weights
+
+
+def percentile(values, pct):
+    return float(np.percentile(values, pct))
+
+
+def bench_estimator(dates, intake, trend):
+    """Time RollingTDEE.update for every day and check it against the vectorized version"""
+    estimator = RollingTDEE()
+    timings = []
+    estimates = []
+    for day, calories, weight in zip(dates, intake, trend):
+        start = time.perf_counter()
+        estimates.append(estimator.update(day, calories, weight))
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    vectorized = estimate_history(dates, intake, trend)
+    vectorized_ms = (time.perf_counter() - start) * 1000
+    
+    incremental = np.array([np.nan if value is None else value for value in estimates])
+    assert np.allclose(incremental, vectorized.to_numpy(), equal_nan=True, atol=1e-6), "incremental and vectorized estimates differ"
+    
+    print(f"RollingTDEE.update    mean {np.mean(timings):.4f} ms  p99 {percentile(timings, 99):.4f} ms  max {max(timings):.4f} ms")
+    print(f"estimate_history      {vectorized_ms:.2f} ms for {len(dates)} days")
+    print(f"final estimate        {estimates[-1]:.0f} kcal/day")
+    return percentile(timings, 99)
+
+
+def bench_app(dates, intake, weights, new_days=7):
+    """Time AdaptiveTDEE.estimate as new days arrive in a 5-year database"""
+    history = len(dates) - new_days
+    with tempfile.TemporaryDirectory() as folder:
+        engine = init_db(os.path.join(folder, 'bench.db'))
+        session = get_session(engine)
+        user = User(name="Bench", target_protein_g=120, target_calories=1800)
+        session.add(user)
+        session.flush()
+        
+        session.add_all(
+            NutritionLog(user_id=user.id, date=day, total_calories=calories)
+            for day, calories in zip(dates[:history], intake[:history])
+        )
+        session.add_all(
+            ProgressEntry(user_id=user.id, date=day, weight_kg=weight)
+            for day, weight in zip(dates[:history], weights[:history])
+        )
+        session.commit()
+        
+        tdee = get_tdee()
+        start = time.perf_counter()
+        tdee.estimate(session, user.id, today=dates[history])
+        first_ms = (time.perf_counter() - start) * 1000
+        
+        # Each new day brings that day's intake and weigh-in
+        timings = []
+        for i in range(history, len(dates)):
+            session.add(NutritionLog(user_id=user.id, date=dates[i], total_calories=intake[i]))
+            session.add(ProgressEntry(user_id=user.id, date=dates[i], weight_kg=weights[i]))
+            session.commit()
+            
+            start = time.perf_counter()
+            estimate, days_used = tdee.estimate(session, user.id, today=dates[i] + timedelta(days=1))
+            timings.append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        tdee.estimate(session, user.id, today=dates[-1] + timedelta(days=1))
+        cached_ms = (time.perf_counter() - start) * 1000
+        
+        session.close()
+        engine.dispose()
+    
+    print(f"AdaptiveTDEE first     {first_ms:.2f} ms  (full history)")
+    print(f"AdaptiveTDEE new day   first {timings[0]:.2f} ms  median {np.median(timings):.2f} ms  "
+          f"max {max(timings):.2f} ms  ({estimate:.0f} kcal/day from {days_used} days)")
+    print(f"AdaptiveTDEE no change {cached_ms:.2f} ms")
+    # The first update is the one the app pays after each launch, so it counts too
+    return max(timings)
+
+
+if __name__ == "__main__":
+    dates, intake, weights = synthetic_days(YEARS * 365)
+    # Trend weight the same way the app smooths it
+    smoothed = []
+    for weight in weights:
+        smoothed.append(weight if not smoothed else smoothed[-1] + 0.1 * (weight - smoothed[-1]))
+    
+    print(f"{len(dates)} days of synthetic data")
+    estimator_p99 = bench_estimator(dates, intake, smoothed)
+    app_ms = bench_app(dates, intake, weights)
+    
+    worst = max(estimator_p99, app_ms)
+    if worst >= BUDGET_MS:
+        print(f"FAIL: one-day update took {worst:.2f} ms (budget {BUDGET_MS:.0f} ms)")
+        sys.exit(1)
+    print(f"OK: one-day updates under {BUDGET_MS:.0f} ms")
@@ -0,0 +1,114 @@
+"""Check that the bulk importer reads numbers the way each export writes them.
+
+Run from the project root:
+    python benchmarks/check_importers.py
+
+Writes small Strong, MyFitnessPal and generic CSV files to a temp folder,
+imports each into a fresh database and compares what was stored with
+what the file meant, including European exports that separate columns
+with ; and write decimal commas. Values that can't be read safely must
+be reported as errors, never stored scaled.
+
+Fails (exit code 1) if any case stores the wrong values.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from sqlalchemy import select
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import init_db, Exercise, Meal, ProgressEntry, User
+from utils.importers import import_file
+
+# (name, file contents, model to read back, columns, expected rows, rows reported as errors)
+CASES = [
+    (
+        "MyFitnessPal measurements, ; and decimal commas",
+        "Date;Weight;Body Fat %\n2023-01-05;72,5;18,2\n2023-01-06;1.072,5;18\n",
+        ProgressEntry, ('weight_kg', 'body_fat_percentage'),
+        [(72.5, 18.2), (1072.5, 18.0)], 0,
+    ),
+    (
+        "MyFitnessPal measurements, ; with decimal points",
+        "Date;Weight;Body Fat %\n2023-01-05;72.5;18.2\n",
+        ProgressEntry, ('weight_kg', 'body_fat_percentage'),
+        [(72.5, 18.2)], 0,
+    ),
+    (
+        "MyFitnessPal measurements, a decimal comma in a comma-separated file",
+        'Date,Weight,Body Fat %\n2023-01-05,"72,5","18,2"\n2023-01-06,72.4,18.1\n',
+        ProgressEntry, ('weight_kg', 'body_fat_percentage'),
+        [(72.4, 18.1)], 1,
+    ),
+    (
+        "MyFitnessPal nutrition, thousands separators",
+        'Date,Meal,Calories,Protein (g),Carbohydrates (g),Fat (g)\n'
+        '2023-01-05,Dinner,"1,250.5",60,120.5,40\n',
+        Meal, ('calories', 'protein_g', 'carbs_g', 'fats_g'),
+        [(1250.5, 60.0, 120.5, 40.0)], 0,
+    ),
+    (
+        "Strong, ; and decimal commas",
+        "Date;Workout Name;Duration;Exercise Name;Set Order;Weight;Reps\n"
+        "2023-01-05 18:03:40;Push;1h 5m;Bench Press;1;82,5;5\n",
+        Exercise, ('weight_kg', 'reps'),
+        [(82.5, 5)], 0,
+    ),
+    (
+        "Generic CSV, ; and decimal commas",
+        "date;exercise;sets;reps;weight\n2023-01-05;Squat;3;5;102,5\n",
+        Exercise, ('sets', 'reps', 'weight_kg'),
+        [(3, 5, 102.5)], 0,
+    ),
+]
+
+
+def run_case(folder, number, contents, model, columns):
+    """Import one file into its own database; returns (stored rows, rows reported as errors)"""
+    path = os.path.join(folder, f'case_{number}.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write(contents)
+    
+    engine = init_db(os.path.join(folder, f'case_{number}.db'))
+    try:
+        with engine.begin() as connection:
+            user_id = connection.execute(User.__table__.insert().values(name="Check")).inserted_primary_key[0]
+        summary = import_file(engine, path, user_id)
+        with engine.connect() as connection:
+            rows = connection.execute(
+                select(*[getattr(model, column) for column in columns]).order_by(model.id)
+            ).all()
+    finally:
+        engine.dispose()
+    return [tuple(row) for row in rows], summary['skipped']
+
+
+def close(stored, expected):
+    return len(stored) == len(expected) and all(
+        len(a) == len(b) and all(abs(x - y) < 1e-6 for x, y in zip(a, b))
+        for a, b in zip(stored, expected)
+    )
+
+
+if __name__ == "__main__":
+    folder = tempfile.mkdtemp()
+    failures = 0
+    try:
+        for number, (name, contents, model, columns, expected, errors) in enumerate(CASES):
+            stored, skipped = run_case(folder, number, contents, model, columns)
+            ok = close(stored, expected) and skipped == errors
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name}")
+            if not ok:
+                print(f"     stored {stored} with {skipped} errors, expected {expected} with {errors}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    if failures:
+        print(f"FAIL: {failures} of {len(CASES)} cases stored the wrong values")
+        sys.exit(1)
+    print("OK: every export was read as written")
@@ -0,0 +1,145 @@
+"""Check that memory stays flat over a simulated day of app use.
+
+Run from the project root:
+    python benchmarks/check_memory.py [--cycles 1440] [--users 5] [--years 2]
+
+Seeds a database, then repeats what the views do once a minute for a day:
+refresh the dashboard, nutrition and progress views, page through the
+history, and add and remove a meal and a weigh-in. Every operation uses
+its own session_scope, as the app does. tracemalloc compares the heap
+after a warm-up with the heap at the end.
+
+Fails (exit code 1) if memory grew by more than the budget.
+"""
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.datagen import cli_option, generate
+from database.consistency import recompute_log_totals
+from database.models import init_db, Meal, NutritionLog, ProgressEntry, User
+from database.queries import meals_page, meal_cursor, progress_page, progress_cursor, progress_summary
+from database.rollups import week_summary
+from database.session import session_factory, session_scope
+from utils.analytics import get_analytics
+from utils.tdee import get_tdee
+
+GROWTH_BUDGET_KB = 512
+WARMUP_FRACTION = 0.1
+
+# How far a user scrolls the progress history on each visit
+HISTORY_PAGES = 5
+
+
+def refresh_views(Session, user, log):
+    """The queries behind one refresh of each view"""
+    with session_scope(Session) as session:
+        week_summary(session, user.id, date.today())
+        get_tdee().estimate(session, user.id)
+    
+    with session_scope(Session) as session:
+        session.add(log)
+        session.refresh(log)
+    with session_scope(Session) as session:
+        meals = meals_page(session, log.id)
+    if meals:
+        with session_scope(Session) as session:
+            meals_page(session, log.id, after=meal_cursor(meals[-1]))
+    
+    with session_scope(Session) as session:
+        progress_summary(session, user.id)
+        get_analytics().summary(session, user.id)
+    cursor = None
+    for _ in range(HISTORY_PAGES):
+        with session_scope(Session) as session:
+            page = progress_page(session, user.id, before=cursor)
+        if not page:
+            break
+        cursor = progress_cursor(page[-1])
+
+
+def log_and_undo(Session, user, log):
+    """Add a meal and a weigh-in, then remove them, as a user fixing a mistake would"""
+    meal = Meal(nutrition_log_id=log.id, meal_type="Snack", food_name="Apple", serving_size="100g",
+                protein_g=0.3, carbs_g=14, fats_g=0.2, calories=52)
+    entry = ProgressEntry(user_id=user.id, date=date.today(), weight_kg=user.current_weight_kg)
+    with session_scope(Session) as session:
+        session.add(log)
+        session.add(meal)
+        session.add(entry)
+        recompute_log_totals(session, log)
+    
+    with session_scope(Session) as session:
+        session.add(log)
+        session.delete(meal)
+        session.delete(entry)
+        recompute_log_totals(session, log)
+
+
+def simulate(Session, cycles):
+    """Run the day; returns (kb at end of warm-up, kb at end, top growth lines)"""
+    with session_scope(Session) as session:
+        user = session.query(User).first()
+        log = session.query(NutritionLog).filter_by(user_id=user.id, date=date.today()).first()
+        if log is None:
+            log = NutritionLog(user_id=user.id, date=date.today())
+            session.add(log)
+    
+    warmup = max(int(cycles * WARMUP_FRACTION), 1)
+    baseline = None
+    for cycle in range(cycles):
+        refresh_views(Session, user, log)
+        if cycle % 10 == 0:
+            log_and_undo(Session, user, log)
+        
+        if cycle + 1 == warmup:
+            gc.collect()
+            baseline = tracemalloc.take_snapshot()
+    
+    gc.collect()
+    final = tracemalloc.take_snapshot()
+    growth = final.compare_to(baseline, 'lineno')
+    start_kb = sum(stat.size for stat in baseline.statistics('filename')) / 1024
+    end_kb = sum(stat.size for stat in final.statistics('filename')) / 1024
+    return start_kb, end_kb, [str(stat) for stat in growth[:5]]
+
+
+if __name__ == "__main__":
+    cycles = cli_option('--cycles', 1440)
+    users = cli_option('--users', 5)
+    years = cli_option('--years', 2.0)
+    
+    folder = tempfile.mkdtemp()
+    try:
+        engine = init_db(os.path.join(folder, 'memory.db'))
+        generate(engine, users=users, years=years)
+        Session = session_factory(engine)
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        start_kb, end_kb, top = simulate(Session, cycles)
+        elapsed = time.perf_counter() - start
+        tracemalloc.stop()
+        engine.dispose()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    growth_kb = end_kb - start_kb
+    print(f"{cycles} refresh cycles in {elapsed:.1f}s")
+    print(f"traced memory after warm-up {start_kb:,.0f} KB, at end {end_kb:,.0f} KB ({growth_kb:+,.0f} KB)")
+    print("largest changes:")
+    for line in top:
+        print(f"  {line}")
+    
+    if growth_kb > GROWTH_BUDGET_KB:
+        print(f"FAIL: memory grew by more than {GROWTH_BUDGET_KB} KB")
+        sys.exit(1)
+    print("OK: memory stayed flat")
@@ -0,0 +1,243 @@
+"""Seeded synthetic data for benchmarking the database layer.
+
+Run from the project root:
+    python benchmarks/datagen.py [--db benchmarks/bench.db] [--users 100] [--years 2] [--seed 42]
+
+Fills a database with years of daily workouts, exercises, nutrition logs,
+meals and progress entries for every user. The same seed always gives the
+same rows. Refuses to add to a database that already has users, so a real
+fitness_tracker.db is never mixed with fake data.
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+
+# Allow running this file directly from the benchmarks/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import init_db, Exercise, Meal, NutritionLog, ProgressEntry, User, Workout
+from database.records import rebuild_records
+from database.rollups import rebuild_rollups
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench.db')
+
+# Rows per executemany batch, which bounds memory for large runs
+CHUNK_SIZE = 5000
+
+# (name, serving, protein, carbs, fats) per serving
+FOODS = [
+    ("Chicken breast", "150 g", 46, 0, 5),
+    ("Greek yogurt", "200 g", 20, 8, 0),
+    ("Oatmeal", "60 g", 8, 40, 4),
+    ("Brown rice", "1 cup", 5, 45, 2),
+    ("Salmon", "150 g", 34, 0, 18),
+    ("Eggs", "3 large", 18, 1, 15),
+    ("Banana", "1 medium", 1, 27, 0),
+    ("Almonds", "30 g", 6, 6, 14),
+    ("Protein shake", "1 scoop", 24, 3, 2),
+    ("Sweet potato", "200 g", 4, 40, 0),
+    ("Avocado toast", "1 slice", 6, 25, 12),
+    ("Pasta", "100 g", 13, 75, 2),
+]
+
+# (name, body part, target, equipment, starting kg)
+EXERCISES = [
+    ("barbell squat", "upper legs", "quads", "barbell", 50),
+    ("barbell bench press", "chest", "pectorals", "barbell", 35),
+    ("barbell deadlift", "upper legs", "glutes", "barbell", 60),
+    ("dumbbell shoulder press", "shoulders", "delts", "dumbbell", 10),
+    ("cable seated row", "back", "upper back", "cable", 30),
+    ("barbell hip thrust", "upper legs", "glutes", "barbell", 60),
+    ("lat pulldown", "back", "lats", "cable", 35),
+    ("dumbbell lunge", "upper legs", "glutes", "dumbbell", 8),
+]
+
+MEAL_TYPES = ["Breakfast", "Lunch", "Dinner", "Snack", "Snack"]
+WORKOUT_TYPES = ["Strength", "Sculpt", "Cardio"]
+
+
+class _Writer:
+    """Buffers rows per table and inserts them in chunks, parents first"""
+    
+    def __init__(self, connection, chunk_size=CHUNK_SIZE):
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.tables = [model.__table__ for model in (User, Workout, Exercise, NutritionLog, Meal, ProgressEntry)]
+        self.rows = {table.name: [] for table in self.tables}
+        self.counts = {table.name: 0 for table in self.tables}
+        self.next_id = {
+            table.name: (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+            for table in self.tables
+        }
+    
+    def add(self, table_name, row):
+        """Queue a row and return the id it will get"""
+        row['id'] = self.next_id[table_name]
+        self.next_id[table_name] += 1
+        self.rows[table_name].append(row)
+        if len(self.rows[table_name]) >= self.chunk_size:
+            self.flush()
+        return row['id']
+    
+    def flush(self):
+        for table in self.tables:
+            rows = self.rows[table.name]
+            if rows:
+                self.connection.execute(table.insert(), rows)
+                self.counts[table.name] += len(rows)
+                rows.clear()
+
+
+def _add_user(writer, rng, number, start, days):
+    """Generate one user's whole history"""
+    now = datetime.now()
+    weight = rng.uniform(55, 100)
+    protein = round(weight * 2)
+    calories = round(weight * 28)
+    user_id = writer.add('users', {
+        'name': f"Bench User {number}",
+        'age': rng.randint(18, 65),
+        'gender': rng.choice(["Female", "Male"]),
+        'height_cm': rng.uniform(150, 195),
+        'current_weight_kg': weight,
+        'target_weight_kg': weight - rng.uniform(0, 8),
+        'target_protein_g': protein,
+        'target_carbs_g': round((calories - protein * 4 - calories * 0.25) / 4),
+        'target_fats_g': round(calories * 0.25 / 9),
+        'target_calories': calories,
+        'created_at': now,
+    })
+    
+    strength = {name: start_kg * rng.uniform(0.7, 1.5) for name, _, _, _, start_kg in EXERCISES}
+    body_fat = rng.uniform(15, 35)
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        weight += rng.gauss(-0.005, 0.05)
+        
+        if rng.random() < 0.6:
+            writer.add('progress_entries', {
+                'user_id': user_id,
+                'date': day,
+                'weight_kg': weight + rng.gauss(0, 0.4),
+                'body_fat_percentage': body_fat + rng.gauss(0, 1) if rng.random() < 0.2 else None,
+                'waist_cm': rng.uniform(60, 100) if rng.random() < 0.1 else None,
+                'notes': "Feeling good" if rng.random() < 0.05 else None,
+                'created_at': now,
+            })
+        
+        if rng.random() < 0.9:
+            meals = []
+            for _ in range(rng.randint(2, 5)):
+                name, serving, p, c, f = rng.choice(FOODS)
+                scale = rng.uniform(0.5, 2.0)
+                p, c, f = p * scale, c * scale, f * scale
+                meals.append({
+                    'meal_type': rng.choice(MEAL_TYPES),
+                    'food_name': name,
+                    'serving_size': serving,
+                    'protein_g': p,
+                    'carbs_g': c,
+                    'fats_g': f,
+                    'calories': p * 4 + c * 4 + f * 9,
+                })
+            # Totals match the meals, as the app keeps them
+            log_id = writer.add('nutrition_logs', {
+                'user_id': user_id,
+                'date': day,
+                'total_protein_g': sum(meal['protein_g'] for meal in meals),
+                'total_carbs_g': sum(meal['carbs_g'] for meal in meals),
+                'total_fats_g': sum(meal['fats_g'] for meal in meals),
+                'total_calories': sum(meal['calories'] for meal in meals),
+                'notes': None,
+                'created_at': now,
+            })
+            for meal in meals:
+                meal['nutrition_log_id'] = log_id
+                writer.add('meals', meal)
+        
+        if rng.random() < 0.55:
+            workout_id = writer.add('workouts', {
+                'user_id': user_id,
+                'date': day,
+                'workout_type': rng.choice(WORKOUT_TYPES),
+                'duration_minutes': rng.randint(30, 90),
+                'notes': None,
+                'created_at': now,
+            })
+            for name, body_part, target, equipment, _ in rng.sample(EXERCISES, rng.randint(3, 6)):
+                strength[name] *= 1 + rng.gauss(0.002, 0.01)
+                writer.add('exercises', {
+                    'workout_id': workout_id,
+                    'exercise_name': name,
+                    'exercise_id': None,
+                    'body_part': body_part,
+                    'target_muscle': target,
+                    'equipment': equipment,
+                    'sets': rng.randint(3, 5),
+                    'reps': rng.randint(5, 15),
+                    'weight_kg': round(strength[name] * 2) / 2,
+                })
+
+
+def generate(engine, users=100, years=2, seed=42, end=None, progress=None):
+    """Fill the database with synthetic history; returns rows added per table.
+    
+    History runs for `years` up to `end` (today by default). progress, if
+    given, is called with the number of users done so far.
+    """
+    rng = random.Random(seed)
+    days = int(years * 365)
+    start = (end or date.today()) - timedelta(days=days)
+    
+    with engine.begin() as connection:
+        writer = _Writer(connection)
+        for number in range(1, users + 1):
+            _add_user(writer, rng, number, start, days)
+            if progress:
+                progress(number)
+        writer.flush()
+        
+        # Core inserts skip the ORM listeners, so build the rollups and records in one pass
+        rebuild_rollups(connection)
+        rebuild_records(connection)
+    return writer.counts
+
+
+def has_users(engine):
+    with engine.connect() as connection:
+        return bool(connection.execute(select(func.count(User.id))).scalar())
+
+
+def cli_option(name, default):
+    """Read `--name value` from the command line"""
+    if name in sys.argv:
+        return type(default)(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+
+if __name__ == "__main__":
+    db_path = cli_option('--db', DEFAULT_DB)
+    users = cli_option('--users', 100)
+    years = cli_option('--years', 2.0)
+    seed = cli_option('--seed', 42)
+    
+    engine = init_db(db_path)
+    if has_users(engine):
+        print(f"{db_path} already has users; pick a new --db to generate into")
+        sys.exit(1)
+    
+    def report(done):
+        if done % max(users // 10, 1) == 0:
+            print(f"  {done}/{users} users")
+    
+    start = time.perf_counter()
+    counts = generate(engine, users=users, years=years, seed=seed, progress=report)
+    elapsed = time.perf_counter() - start
+    
+    print(f"Generated {sum(counts.values())} rows in {elapsed:.1f}s into {db_path}")
+    for table, count in counts.items():
+        print(f"  {table}: {count}")
@@ -0,0 +1,96 @@
+import os
+import sys
+
+from sqlalchemy import func, text
+
+# Allow running this file directly from the database/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import Meal
+
+TOTAL_COLUMNS = {
+    'total_protein_g': 'protein_g',
+    'total_carbs_g': 'carbs_g',
+    'total_fats_g': 'fats_g',
+    'total_calories': 'calories',
+}
+
+# Differences smaller than this are float noise, not drift
+TOLERANCE = 1e-6
+
+# One pass over meals, grouped by log, joined to every log that has stored totals
+_MISMATCH_SQL = (
+    "SELECT l.id, l.date, "
+    + ", ".join(f"l.{total}" for total in TOTAL_COLUMNS) + ", "
+    + ", ".join(f"COALESCE(m.{column}, 0)" for column in TOTAL_COLUMNS.values()) + " "
+    "FROM nutrition_logs l LEFT JOIN ("
+    "SELECT nutrition_log_id, "
+    + ", ".join(f"SUM({column}) AS {column}" for column in TOTAL_COLUMNS.values()) + " "
+    "FROM meals GROUP BY nutrition_log_id"
+    ") m ON m.nutrition_log_id = l.id "
+    "WHERE "
+    + " OR ".join(
+        f"ABS(COALESCE(l.{total}, 0) - COALESCE(m.{column}, 0)) > :tolerance"
+        for total, column in TOTAL_COLUMNS.items()
+    )
+)
+
+
+def find_total_mismatches(connection, tolerance=TOLERANCE):
+    """Return every nutrition log whose stored totals differ from the sum of its meals"""
+    mismatches = []
+    for row in connection.execute(text(_MISMATCH_SQL), {'tolerance': tolerance}):
+        log_id, log_date = row[0], row[1]
+        stored = row[2:2 + len(TOTAL_COLUMNS)]
+        actual = row[2 + len(TOTAL_COLUMNS):]
+        mismatches.append({
+            'id': log_id,
+            'date': log_date,
+            'stored': dict(zip(TOTAL_COLUMNS, stored)),
+            'actual': dict(zip(TOTAL_COLUMNS, actual)),
+        })
+    return mismatches
+
+
+def repair_totals(connection, mismatches):
+    """Overwrite stored totals with the recomputed sums"""
+    if not mismatches:
+        return 0
+    assignments = ", ".join(f"{total} = :{total}" for total in TOTAL_COLUMNS)
+    connection.execute(
+        text(f"UPDATE nutrition_logs SET {assignments} WHERE id = :id"),
+        [dict(mismatch['actual'], id=mismatch['id']) for mismatch in mismatches]
+    )
+    return len(mismatches)
+
+
+def check_nutrition_totals(engine, repair=True, tolerance=TOLERANCE):
+    """Find, report and optionally fix drifted nutrition totals in one transaction"""
+    with engine.begin() as connection:
+        mismatches = find_total_mismatches(connection, tolerance)
+        if repair:
+            repair_totals(connection, mismatches)
+    
+    if mismatches:
+        action = "Repaired" if repair else "Found"
+        print(f"✓ {action} {len(mismatches)} nutrition logs whose totals didn't match their meals")
+    return mismatches
+
+
+def recompute_log_totals(session, nutrition_log):
+    """Set a log's totals to the sum of its meals instead of applying deltas"""
+    session.flush()
+    sums = session.query(
+        *[func.coalesce(func.sum(getattr(Meal, column)), 0) for column in TOTAL_COLUMNS.values()]
+    ).filter(Meal.nutrition_log_id == nutrition_log.id).one()
+    for total, value in zip(TOTAL_COLUMNS, sums):
+        setattr(nutrition_log, total, value)
+
+
+if __name__ == "__main__":
+    from database.models import init_db
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    engine = init_db(args[0] if args else 'fitness_tracker.db')
+    for mismatch in check_nutrition_totals(engine, repair='--repair' in sys.argv):
+        print(f"  {mismatch['date']}: stored {mismatch['stored']} actual {mismatch['actual']}")
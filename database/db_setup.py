@@ -1,6 +1,12 @@
-from models import init_db, get_session, User
+import os
+import sys
 from datetime import datetime
 
+# Allow running this file directly from the database/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import init_db, get_session, User
+
 def setup_database():
     """Initialize database and create a default user"""
     print("Setting up database...")
@@ -0,0 +1,82 @@
+from sqlalchemy import create_engine, event, inspect, text
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers don't block the writer
+    'synchronous': 'NORMAL',      # safe with WAL, avoids an fsync per commit
+    'mmap_size': 268435456,       # 256 MB memory-mapped reads
+    'cache_size': -32000,         # 32 MB page cache (negative means KiB)
+    'temp_store': 'MEMORY',
+}
+
+
+def create_sqlite_engine(db_path, pragmas=None, **kwargs):
+    """Create a SQLAlchemy engine for a SQLite file with tuned pragmas"""
+    engine = create_engine(f'sqlite:///{db_path}', **kwargs)
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    
+    return engine
+
+
+def merge_duplicate_nutrition_logs(connection):
+    """Fold duplicate (user_id, date) nutrition logs into the oldest one.
+    
+    Older databases could end up with two logs for the same day, which
+    would stop the unique index from being created.
+    """
+    duplicates = connection.execute(text(
+        "SELECT user_id, date, MIN(id) FROM nutrition_logs "
+        "GROUP BY user_id, date HAVING COUNT(*) > 1"
+    )).fetchall()
+    
+    for user_id, log_date, keep_id in duplicates:
+        params = {'user_id': user_id, 'date': log_date, 'keep_id': keep_id}
+        connection.execute(text(
+            "UPDATE meals SET nutrition_log_id = :keep_id WHERE nutrition_log_id IN "
+            "(SELECT id FROM nutrition_logs WHERE user_id = :user_id AND date = :date AND id != :keep_id)"
+        ), params)
+        connection.execute(text(
+            "UPDATE nutrition_logs SET "
+            "total_protein_g = (SELECT SUM(total_protein_g) FROM nutrition_logs WHERE user_id = :user_id AND date = :date), "
+            "total_carbs_g = (SELECT SUM(total_carbs_g) FROM nutrition_logs WHERE user_id = :user_id AND date = :date), "
+            "total_fats_g = (SELECT SUM(total_fats_g) FROM nutrition_logs WHERE user_id = :user_id AND date = :date), "
+            "total_calories = (SELECT SUM(total_calories) FROM nutrition_logs WHERE user_id = :user_id AND date = :date), "
+            "notes = (SELECT GROUP_CONCAT(notes, '\n') FROM nutrition_logs WHERE user_id = :user_id AND date = :date) "
+            "WHERE id = :keep_id"
+        ), params)
+        connection.execute(text(
+            "DELETE FROM nutrition_logs WHERE user_id = :user_id AND date = :date AND id != :keep_id"
+        ), params)
+    
+    return len(duplicates)
+
+
+def migrate(engine, metadata):
+    """Bring an existing database's indexes up to date with the models.
+    
+    create_all only adds indexes when it creates a table, so databases made
+    before the indexes existed need them added here. Safe to run on every
+    startup; it only does work the first time.
+    """
+    existing = {}
+    inspector = inspect(engine)
+    for table_name in inspector.get_table_names():
+        existing[table_name] = {index['name'] for index in inspector.get_indexes(table_name)}
+    
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in existing.get(table.name, set()):
+                    continue
+                if table.name == 'nutrition_logs' and index.unique:
+                    merged = merge_duplicate_nutrition_logs(connection)
+                    if merged:
+                        print(f"✓ Merged {merged} duplicate nutrition logs")
+                index.create(connection)
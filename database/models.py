@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
 
+from database.engine import create_sqlite_engine, migrate
+
 Base = declarative_base()
 
 class User(Base):
@@ -34,6 +36,9 @@ class User(Base):
 class Workout(Base):
     """Workout session information"""
     __tablename__ = 'workouts'
+    __table_args__ = (
+        Index('ix_workouts_user_date', 'user_id', 'date'),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -51,6 +56,9 @@ class Workout(Base):
 class Exercise(Base):
     """Individual exercises within a workout"""
     __tablename__ = 'exercises'
+    __table_args__ = (
+        Index('ix_exercises_workout_id', 'workout_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     workout_id = Column(Integer, ForeignKey('workouts.id'))
@@ -72,6 +80,10 @@ class Exercise(Base):
 class NutritionLog(Base):
     """Daily nutrition tracking"""
     __tablename__ = 'nutrition_logs'
+    __table_args__ = (
+        # One log per user per day; a unique index so it can be added to existing tables
+        Index('uq_nutrition_logs_user_date', 'user_id', 'date', unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -94,6 +106,9 @@ class NutritionLog(Base):
 class Meal(Base):
     """Individual meals/foods within a day"""
     __tablename__ = 'meals'
+    __table_args__ = (
+        Index('ix_meals_nutrition_log_id', 'nutrition_log_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     nutrition_log_id = Column(Integer, ForeignKey('nutrition_logs.id'))
@@ -114,6 +129,9 @@ class Meal(Base):
 class ProgressEntry(Base):
     """Track body measurements and progress photos"""
     __tablename__ = 'progress_entries'
+    __table_args__ = (
+        Index('ix_progress_entries_user_date', 'user_id', 'date'),
+    )
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -137,11 +155,63 @@ class ProgressEntry(Base):
     user = relationship("User", back_populates="progress_entries")
 
 
+class Rollup(Base):
+    """Nutrition and training totals for one day, ISO week or month"""
+    __tablename__ = 'rollups'
+    
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    period = Column(String(10), primary_key=True)  # "day", "week" or "month"
+    period_start = Column(Date, primary_key=True)  # the day, the week's Monday or the 1st
+    
+    # Nutrition
+    protein_g = Column(Float, default=0)
+    carbs_g = Column(Float, default=0)
+    fats_g = Column(Float, default=0)
+    calories = Column(Float, default=0)
+    meal_count = Column(Integer, default=0)
+    
+    # Training
+    volume_kg = Column(Float, default=0)  # sets x reps x weight
+    set_count = Column(Integer, default=0)
+    workout_count = Column(Integer, default=0)
+    workout_minutes = Column(Integer, default=0)
+
+
+class PersonalRecord(Base):
+    """Best weight, estimated 1RM and volume for one user and exercise"""
+    __tablename__ = 'personal_records'
+    
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    exercise_key = Column(String(200), primary_key=True)  # exercise name, trimmed and lower-cased
+    exercise_name = Column(String(200))
+    
+    # Heaviest weight lifted, for any reps
+    best_weight_kg = Column(Float)
+    best_weight_reps = Column(Integer)
+    best_weight_date = Column(Date)
+    
+    # Best estimated one-rep max (see database/records.py for the formula)
+    best_e1rm_kg = Column(Float)
+    best_e1rm_date = Column(Date)
+    
+    # Most sets x reps x weight for the exercise in one workout
+    best_volume_kg = Column(Float)
+    best_volume_date = Column(Date)
+
+
 # Database initialization function
 def init_db(db_path='fitness_tracker.db'):
     """Initialize the database and create all tables"""
-    engine = create_engine(f'sqlite:///{db_path}')
+    engine = create_sqlite_engine(db_path)
     Base.metadata.create_all(engine)
+    migrate(engine, Base.metadata)
+    
+    from database.rollups import install_rollup_listeners, ensure_rollups
+    from database.records import install_record_listeners, ensure_records
+    install_rollup_listeners()
+    install_record_listeners()
+    ensure_rollups(engine)
+    ensure_records(engine)
     return engine
 
 def get_session(engine):
@@ -0,0 +1,55 @@
+from sqlalchemy import and_, func, or_
+
+from database.models import Meal, ProgressEntry
+
+
+def progress_page(session, user_id, before=None, limit=50):
+    """Return up to `limit` progress entries, newest first.
+    
+    Keyset pagination: pass the (date, id) of the last entry from the
+    previous page as `before` to get the next one. Each page costs the same
+    regardless of how much history there is, unlike OFFSET.
+    """
+    query = session.query(ProgressEntry).filter(ProgressEntry.user_id == user_id)
+    if before is not None:
+        before_date, before_id = before
+        query = query.filter(or_(
+            ProgressEntry.date < before_date,
+            and_(ProgressEntry.date == before_date, ProgressEntry.id < before_id)
+        ))
+    return query.order_by(ProgressEntry.date.desc(), ProgressEntry.id.desc()).limit(limit).all()
+
+
+def progress_cursor(entry):
+    """Return the keyset cursor that continues after this entry"""
+    return (entry.date, entry.id)
+
+
+def progress_summary(session, user_id):
+    """Return the entry count and the first and latest logged weights"""
+    count = session.query(func.count(ProgressEntry.id)).filter(
+        ProgressEntry.user_id == user_id
+    ).scalar()
+    if not count:
+        return {'count': 0, 'first_weight_kg': None, 'latest_weight_kg': None}
+    
+    weights = session.query(ProgressEntry.weight_kg).filter(ProgressEntry.user_id == user_id)
+    first = weights.order_by(ProgressEntry.date.asc(), ProgressEntry.id.asc()).first()
+    latest = weights.order_by(ProgressEntry.date.desc(), ProgressEntry.id.desc()).first()
+    return {'count': count, 'first_weight_kg': first[0], 'latest_weight_kg': latest[0]}
+
+
+def meals_page(session, nutrition_log_id, after=None, limit=50):
+    """Return up to `limit` meals from a day's log in the order they were added.
+    
+    Pass the id of the last meal from the previous page as `after`.
+    """
+    query = session.query(Meal).filter(Meal.nutrition_log_id == nutrition_log_id)
+    if after is not None:
+        query = query.filter(Meal.id > after)
+    return query.order_by(Meal.id).limit(limit).all()
+
+
+def meal_cursor(meal):
+    """Return the keyset cursor that continues after this meal"""
+    return meal.id
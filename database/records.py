@@ -0,0 +1,308 @@
+import os
+import string
+import sys
+
+from sqlalchemy import Date, bindparam, event, select, text
+from sqlalchemy.orm.attributes import get_history
+
+# Allow running this file directly from the database/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import Exercise, PersonalRecord, Workout
+
+# Formula for the estimated one-rep max, and the most reps it is trusted for
+E1RM_FORMULA = 'epley'
+MAX_E1RM_REPS = 12
+
+# Each record's value column and the columns that change with it
+RECORD_FIELDS = {
+    'best_weight_kg': ('exercise_name', 'best_weight_kg', 'best_weight_reps', 'best_weight_date'),
+    'best_e1rm_kg': ('best_e1rm_kg', 'best_e1rm_date'),
+    'best_volume_kg': ('best_volume_kg', 'best_volume_date'),
+}
+
+# SQLite's lower() and trim() only touch ASCII, so exercise_key does the same
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_KEY_SQL = "lower(trim({column}, ' '))"
+
+
+def exercise_key(name):
+    """The name records are stored under; matches lower(trim(name)) in SQL"""
+    return name.strip(' ').translate(_ASCII_LOWER)
+
+
+def epley(weight, reps):
+    return weight if reps == 1 else weight * (1 + reps / 30)
+
+
+def brzycki(weight, reps):
+    return weight if reps == 1 else weight * 36 / (37 - reps)
+
+
+_E1RM = {'epley': epley, 'brzycki': brzycki}
+
+_E1RM_SQL = {
+    'epley': "CASE WHEN {reps} = 1 THEN {weight} ELSE {weight} * (1 + {reps} / 30.0) END",
+    'brzycki': "CASE WHEN {reps} = 1 THEN {weight} ELSE {weight} * 36.0 / (37 - {reps}) END",
+}
+
+
+def estimate_1rm(weight, reps, formula=E1RM_FORMULA):
+    """Estimated one-rep max, or None when there is no weight or too many reps to trust"""
+    if not weight or weight <= 0 or not reps or reps < 1 or reps > MAX_E1RM_REPS:
+        return None
+    return _E1RM[formula](weight, reps)
+
+
+# Upsert that keeps whichever of the stored and new values is higher for
+# each record; a missing value never replaces a stored one. Built once as
+# text so it is compiled once rather than on every save.
+_APPLY_SQL = text(
+    "INSERT INTO personal_records (user_id, exercise_key, "
+    + ", ".join(field for fields in RECORD_FIELDS.values() for field in fields) + ") "
+    "VALUES (:user_id, :exercise_key, "
+    + ", ".join(f":{field}" for fields in RECORD_FIELDS.values() for field in fields) + ") "
+    "ON CONFLICT (user_id, exercise_key) DO UPDATE SET "
+    + ", ".join(
+        f"{field} = CASE WHEN personal_records.{value} IS NULL OR excluded.{value} > personal_records.{value} "
+        f"THEN excluded.{field} ELSE personal_records.{field} END"
+        for value, fields in RECORD_FIELDS.items() for field in fields
+    )
+).bindparams(*[
+    bindparam(field, type_=Date) for field in ('best_weight_date', 'best_e1rm_date', 'best_volume_date')
+])
+
+
+def apply_lift(connection, user_id, day, name, weight_kg, reps, workout_volume_kg):
+    """Raise the user's records for an exercise if this lift beats them"""
+    if user_id is None or day is None or not name or not weight_kg or weight_kg <= 0:
+        return
+    
+    e1rm = estimate_1rm(weight_kg, reps)
+    volume = workout_volume_kg if workout_volume_kg and workout_volume_kg > 0 else None
+    connection.execute(_APPLY_SQL, {
+        'user_id': user_id,
+        'exercise_key': exercise_key(name),
+        'exercise_name': name,
+        'best_weight_kg': weight_kg,
+        'best_weight_reps': reps,
+        'best_weight_date': day,
+        'best_e1rm_kg': e1rm,
+        'best_e1rm_date': day if e1rm is not None else None,
+        'best_volume_kg': volume,
+        'best_volume_date': day if volume is not None else None,
+    })
+
+
+def _workout_volume(connection, workout_id, key):
+    """Volume of every set of an exercise already saved in a workout"""
+    return connection.execute(text(
+        "SELECT COALESCE(SUM(COALESCE(sets, 0) * COALESCE(reps, 0) * weight_kg), 0) FROM exercises "
+        f"WHERE workout_id = :workout_id AND weight_kg > 0 AND {_KEY_SQL.format(column='exercise_name')} = :key"
+    ), {'workout_id': workout_id, 'key': key}).scalar()
+
+
+def _old(target, attribute):
+    """Return an attribute's value before this flush"""
+    history = get_history(target, attribute)
+    return history.deleted[0] if history.deleted else getattr(target, attribute)
+
+
+def _owner(connection, workout_id):
+    row = connection.execute(
+        select(Workout.user_id, Workout.date).where(Workout.id == workout_id)
+    ).first()
+    return row if row else (None, None)
+
+
+# Mapper events; these run inside the flush, on the same connection
+
+def _exercise_inserted(mapper, connection, exercise):
+    if not exercise.exercise_name:
+        return
+    user_id, day = _owner(connection, exercise.workout_id)
+    volume = _workout_volume(connection, exercise.workout_id, exercise_key(exercise.exercise_name))
+    apply_lift(connection, user_id, day, exercise.exercise_name, exercise.weight_kg, exercise.reps, volume)
+
+
+def _exercise_updated(mapper, connection, exercise):
+    attributes = ('workout_id', 'exercise_name', 'sets', 'reps', 'weight_kg')
+    if not any(get_history(exercise, attribute).has_changes() for attribute in attributes):
+        return
+    # A lower value can't be applied as a delta, so recompute the affected records
+    affected = {
+        (_owner(connection, _old(exercise, 'workout_id'))[0], exercise_key(_old(exercise, 'exercise_name'))),
+        (_owner(connection, exercise.workout_id)[0], exercise_key(exercise.exercise_name)),
+    }
+    for user_id, key in affected:
+        if user_id is not None:
+            rebuild_records(connection, user_id, key)
+
+
+def _exercise_deleted(mapper, connection, exercise):
+    user_id, _ = _owner(connection, _old(exercise, 'workout_id'))
+    if user_id is not None:
+        rebuild_records(connection, user_id, exercise_key(_old(exercise, 'exercise_name')))
+
+
+def _workout_updated(mapper, connection, workout):
+    if not any(get_history(workout, attribute).has_changes() for attribute in ('user_id', 'date')):
+        return
+    for user_id in {_old(workout, 'user_id'), workout.user_id}:
+        if user_id is not None:
+            rebuild_records(connection, user_id)
+
+
+_LISTENERS = (
+    (Exercise, 'after_insert', _exercise_inserted),
+    (Exercise, 'after_update', _exercise_updated),
+    (Exercise, 'after_delete', _exercise_deleted),
+    (Workout, 'after_update', _workout_updated),
+)
+
+
+def install_record_listeners():
+    """Keep personal records in step with ORM writes to exercises and workouts.
+    
+    Bulk Core inserts bypass these hooks; call rebuild_records afterwards.
+    """
+    for model, name, listener in _LISTENERS:
+        if not event.contains(model, name, listener):
+            event.listen(model, name, listener)
+
+
+# Full rebuild, for first use and after bulk imports
+
+def rebuild_records(connection, user_id=None, key=None):
+    """Recompute personal records from every exercise, for everyone or one user/exercise.
+    
+    Ties go to the earliest lift, as they do when records are kept up to date on save.
+    """
+    key_sql = _KEY_SQL.format(column='e.exercise_name')
+    filters = ""
+    params = {'max_reps': MAX_E1RM_REPS}
+    if user_id is not None:
+        filters += " AND w.user_id = :user_id"
+        params['user_id'] = user_id
+    if key is not None:
+        filters += f" AND {key_sql} = :key"
+        params['key'] = key
+    
+    deleted = ["1 = 1"]
+    if user_id is not None:
+        deleted.append("user_id = :user_id")
+    if key is not None:
+        deleted.append("exercise_key = :key")
+    connection.execute(text(f"DELETE FROM personal_records WHERE {' AND '.join(deleted)}"), params)
+    
+    e1rm = _E1RM_SQL[E1RM_FORMULA].format(weight='e.weight_kg', reps='e.reps')
+    lifts = (
+        f"SELECT w.user_id, {key_sql} AS exercise_key, e.exercise_name, w.date, e.workout_id, e.id, "
+        "e.weight_kg, e.reps, "
+        f"CASE WHEN e.reps BETWEEN 1 AND :max_reps THEN {e1rm} END AS e1rm, "
+        "COALESCE(e.sets, 0) * COALESCE(e.reps, 0) * e.weight_kg AS volume "
+        "FROM exercises e JOIN workouts w ON w.id = e.workout_id "
+        f"WHERE w.user_id IS NOT NULL AND e.exercise_name IS NOT NULL AND e.weight_kg > 0 {filters}"
+    )
+    
+    def best(order, source, where="1 = 1"):
+        """The first row per user and exercise when ordered by `order`"""
+        return (
+            f"SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY user_id, exercise_key ORDER BY {order}) AS place "
+            f"FROM ({source}) WHERE {where}) WHERE place = 1"
+        )
+    
+    # One pass per record; the heaviest lift creates the row and the others
+    # fill in their columns through the primary key
+    connection.execute(text(
+        "INSERT INTO personal_records (user_id, exercise_key, exercise_name, best_weight_kg, best_weight_reps, "
+        "best_weight_date) "
+        "SELECT user_id, exercise_key, exercise_name, weight_kg, reps, date "
+        f"FROM ({best('weight_kg DESC, date, id', lifts)})"
+    ), params)
+    
+    connection.execute(text(
+        "INSERT INTO personal_records (user_id, exercise_key, best_e1rm_kg, best_e1rm_date) "
+        "SELECT user_id, exercise_key, e1rm, date "
+        f"FROM ({best('e1rm DESC, date, id', lifts, 'e1rm IS NOT NULL')}) WHERE 1 = 1 "
+        "ON CONFLICT (user_id, exercise_key) DO UPDATE SET "
+        "best_e1rm_kg = excluded.best_e1rm_kg, best_e1rm_date = excluded.best_e1rm_date"
+    ), params)
+    
+    sessions = (
+        "SELECT user_id, exercise_key, date, MIN(id) AS id, SUM(volume) AS volume "
+        f"FROM ({lifts}) GROUP BY user_id, exercise_key, workout_id"
+    )
+    connection.execute(text(
+        "INSERT INTO personal_records (user_id, exercise_key, best_volume_kg, best_volume_date) "
+        "SELECT user_id, exercise_key, volume, date "
+        f"FROM ({best('volume DESC, date, id', sessions, 'volume > 0')}) WHERE 1 = 1 "
+        "ON CONFLICT (user_id, exercise_key) DO UPDATE SET "
+        "best_volume_kg = excluded.best_volume_kg, best_volume_date = excluded.best_volume_date"
+    ), params)
+
+
+def ensure_records(engine):
+    """Build the personal records once for databases that have workouts but no records yet"""
+    with engine.begin() as connection:
+        if connection.execute(text("SELECT 1 FROM personal_records LIMIT 1")).first():
+            return
+        if connection.execute(text("SELECT 1 FROM exercises LIMIT 1")).first():
+            rebuild_records(connection)
+            print("✓ Built personal records")
+
+
+# Reading
+
+def get_record(session, user_id, name):
+    """Return the user's records for an exercise, or None if it hasn't been logged"""
+    return session.get(PersonalRecord, (user_id, exercise_key(name)))
+
+
+def check_records(session, user_id, lifts):
+    """Return {exercise name: {record: new value}} for lifts that beat the user's records.
+    
+    lifts are (name, sets, reps, weight_kg) tuples for one workout, checked
+    before it is saved; each exercise costs one primary-key lookup. An
+    exercise logged for the first time sets a baseline rather than a record.
+    """
+    best = {}
+    for name, sets, reps, weight_kg in lifts:
+        if not name or not weight_kg or weight_kg <= 0:
+            continue
+        entry = best.setdefault(exercise_key(name), {'name': name, 'weight_kg': 0, 'e1rm_kg': None, 'volume_kg': 0})
+        entry['weight_kg'] = max(entry['weight_kg'], weight_kg)
+        e1rm = estimate_1rm(weight_kg, reps)
+        if e1rm is not None and (entry['e1rm_kg'] is None or e1rm > entry['e1rm_kg']):
+            entry['e1rm_kg'] = e1rm
+        entry['volume_kg'] += (sets or 0) * (reps or 0) * weight_kg
+    
+    beaten = {}
+    for key, entry in best.items():
+        record = session.get(PersonalRecord, (user_id, key))
+        if record is None:
+            continue
+        improved = {}
+        if record.best_weight_kg is None or entry['weight_kg'] > record.best_weight_kg:
+            improved['weight_kg'] = entry['weight_kg']
+        if entry['e1rm_kg'] is not None and (record.best_e1rm_kg is None or entry['e1rm_kg'] > record.best_e1rm_kg):
+            improved['e1rm_kg'] = entry['e1rm_kg']
+        if entry['volume_kg'] > 0 and (record.best_volume_kg is None or entry['volume_kg'] > record.best_volume_kg):
+            improved['volume_kg'] = entry['volume_kg']
+        if improved:
+            beaten[entry['name']] = improved
+    return beaten
+
+
+if __name__ == "__main__":
+    import time
+    
+    from database.models import init_db
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    engine = init_db(args[0] if args else 'fitness_tracker.db')
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        rebuild_records(connection)
+        count = connection.execute(text("SELECT COUNT(*) FROM personal_records")).scalar()
+    print(f"✓ Rebuilt {count} personal records in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,322 @@
+from datetime import timedelta
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm.attributes import get_history
+
+from database.models import Exercise, Meal, NutritionLog, Rollup, Workout
+
+PERIODS = ('day', 'week', 'month')
+
+NUTRITION_FIELDS = ('protein_g', 'carbs_g', 'fats_g', 'calories', 'meal_count')
+TRAINING_FIELDS = ('volume_kg', 'set_count', 'workout_count', 'workout_minutes')
+ROLLUP_FIELDS = NUTRITION_FIELDS + TRAINING_FIELDS
+
+
+def period_start(day, period):
+    """Return the first day of the day, ISO week (Monday) or month containing day"""
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unknown rollup period: {period}")
+
+
+def apply_delta(connection, user_id, day, delta):
+    """Add delta to the day, week and month rollups containing day"""
+    delta = {field: value for field, value in delta.items() if value}
+    if user_id is None or day is None or not delta:
+        return
+    
+    table = Rollup.__table__
+    for period in PERIODS:
+        values = {field: 0 for field in ROLLUP_FIELDS}
+        values.update(delta)
+        statement = insert(table).values(
+            user_id=user_id,
+            period=period,
+            period_start=period_start(day, period),
+            **values
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'period', 'period_start'],
+            set_={field: table.c[field] + statement.excluded[field] for field in delta}
+        )
+        connection.execute(statement)
+
+
+def _negate(delta):
+    return {field: -value for field, value in delta.items()}
+
+
+def _value(target, attribute, old):
+    """Return an attribute's current value, or its value before this flush"""
+    if old:
+        history = get_history(target, attribute)
+        if history.deleted:
+            return history.deleted[0]
+    return getattr(target, attribute)
+
+
+def _changed(target, attributes):
+    return any(get_history(target, attribute).has_changes() for attribute in attributes)
+
+
+# Per-row contributions and where they land
+
+def _meal_delta(meal, old=False):
+    return {
+        'protein_g': _value(meal, 'protein_g', old) or 0,
+        'carbs_g': _value(meal, 'carbs_g', old) or 0,
+        'fats_g': _value(meal, 'fats_g', old) or 0,
+        'calories': _value(meal, 'calories', old) or 0,
+        'meal_count': 1,
+    }
+
+
+def _meal_owner(connection, meal, old=False):
+    log_id = _value(meal, 'nutrition_log_id', old)
+    row = connection.execute(
+        select(NutritionLog.user_id, NutritionLog.date).where(NutritionLog.id == log_id)
+    ).first()
+    return row if row else (None, None)
+
+
+def _exercise_delta(exercise, old=False):
+    sets = _value(exercise, 'sets', old) or 0
+    reps = _value(exercise, 'reps', old) or 0
+    weight = _value(exercise, 'weight_kg', old) or 0
+    return {'volume_kg': sets * reps * weight, 'set_count': sets}
+
+
+def _exercise_owner(connection, exercise, old=False):
+    workout_id = _value(exercise, 'workout_id', old)
+    row = connection.execute(
+        select(Workout.user_id, Workout.date).where(Workout.id == workout_id)
+    ).first()
+    return row if row else (None, None)
+
+
+def _workout_delta(workout, old=False):
+    return {'workout_count': 1, 'workout_minutes': _value(workout, 'duration_minutes', old) or 0}
+
+
+def _workout_exercise_totals(connection, workout_id):
+    """Return the rollup contribution of every exercise already in a workout"""
+    sets, volume = connection.execute(
+        select(
+            func.coalesce(func.sum(Exercise.sets), 0),
+            func.coalesce(func.sum(
+                func.coalesce(Exercise.sets, 0) * func.coalesce(Exercise.reps, 0) * func.coalesce(Exercise.weight_kg, 0)
+            ), 0)
+        ).where(Exercise.workout_id == workout_id)
+    ).one()
+    return {'volume_kg': volume, 'set_count': sets}
+
+
+def _log_meal_totals(connection, log_id):
+    """Return the rollup contribution of every meal already in a nutrition log"""
+    row = connection.execute(
+        select(
+            func.coalesce(func.sum(Meal.protein_g), 0),
+            func.coalesce(func.sum(Meal.carbs_g), 0),
+            func.coalesce(func.sum(Meal.fats_g), 0),
+            func.coalesce(func.sum(Meal.calories), 0),
+            func.count(Meal.id)
+        ).where(Meal.nutrition_log_id == log_id)
+    ).one()
+    return dict(zip(NUTRITION_FIELDS, row))
+
+
+# Mapper events; these run inside the flush, on the same connection
+
+def _meal_inserted(mapper, connection, meal):
+    apply_delta(connection, *_meal_owner(connection, meal), _meal_delta(meal))
+
+
+def _meal_updated(mapper, connection, meal):
+    if not _changed(meal, ('nutrition_log_id', 'protein_g', 'carbs_g', 'fats_g', 'calories')):
+        return
+    apply_delta(connection, *_meal_owner(connection, meal, old=True), _negate(_meal_delta(meal, old=True)))
+    apply_delta(connection, *_meal_owner(connection, meal), _meal_delta(meal))
+
+
+def _meal_deleted(mapper, connection, meal):
+    apply_delta(connection, *_meal_owner(connection, meal, old=True), _negate(_meal_delta(meal, old=True)))
+
+
+def _exercise_inserted(mapper, connection, exercise):
+    apply_delta(connection, *_exercise_owner(connection, exercise), _exercise_delta(exercise))
+
+
+def _exercise_updated(mapper, connection, exercise):
+    if not _changed(exercise, ('workout_id', 'sets', 'reps', 'weight_kg')):
+        return
+    apply_delta(connection, *_exercise_owner(connection, exercise, old=True), _negate(_exercise_delta(exercise, old=True)))
+    apply_delta(connection, *_exercise_owner(connection, exercise), _exercise_delta(exercise))
+
+
+def _exercise_deleted(mapper, connection, exercise):
+    apply_delta(connection, *_exercise_owner(connection, exercise, old=True), _negate(_exercise_delta(exercise, old=True)))
+
+
+def _workout_inserted(mapper, connection, workout):
+    apply_delta(connection, workout.user_id, workout.date, _workout_delta(workout))
+
+
+def _workout_updated(mapper, connection, workout):
+    if not _changed(workout, ('user_id', 'date', 'duration_minutes')):
+        return
+    old_delta = _workout_delta(workout, old=True)
+    new_delta = _workout_delta(workout)
+    # Moving a workout to another day moves its exercises' volume with it
+    if _changed(workout, ('user_id', 'date')):
+        exercises = _workout_exercise_totals(connection, workout.id)
+        old_delta.update(exercises)
+        new_delta.update(exercises)
+    apply_delta(connection, _value(workout, 'user_id', True), _value(workout, 'date', True), _negate(old_delta))
+    apply_delta(connection, workout.user_id, workout.date, new_delta)
+
+
+def _workout_deleted(mapper, connection, workout):
+    # Exercises are deleted first by the cascade and remove their own volume
+    apply_delta(connection, _value(workout, 'user_id', True), _value(workout, 'date', True),
+                _negate(_workout_delta(workout, old=True)))
+
+
+def _log_updated(mapper, connection, log):
+    if not _changed(log, ('user_id', 'date')):
+        return
+    meals = _log_meal_totals(connection, log.id)
+    apply_delta(connection, _value(log, 'user_id', True), _value(log, 'date', True), _negate(meals))
+    apply_delta(connection, log.user_id, log.date, meals)
+
+
+_LISTENERS = (
+    (Meal, 'after_insert', _meal_inserted),
+    (Meal, 'after_update', _meal_updated),
+    (Meal, 'after_delete', _meal_deleted),
+    (Exercise, 'after_insert', _exercise_inserted),
+    (Exercise, 'after_update', _exercise_updated),
+    (Exercise, 'after_delete', _exercise_deleted),
+    (Workout, 'after_insert', _workout_inserted),
+    (Workout, 'after_update', _workout_updated),
+    (Workout, 'after_delete', _workout_deleted),
+    (NutritionLog, 'after_update', _log_updated),
+)
+
+
+def install_rollup_listeners():
+    """Keep rollups in step with ORM writes to meals, exercises and workouts.
+    
+    Bulk Core inserts bypass these hooks; call rebuild_rollups afterwards.
+    """
+    for model, name, listener in _LISTENERS:
+        if not event.contains(model, name, listener):
+            event.listen(model, name, listener)
+
+
+# Full rebuild, for first use and after bulk imports
+
+_PERIOD_SQL = {
+    'day': "{column}",
+    'week': "date({column}, '-6 days', 'weekday 1')",
+    'month': "date({column}, 'start of month')",
+}
+
+
+def rebuild_rollups(connection, user_id=None):
+    """Recompute every rollup from the raw meals, exercises and workouts"""
+    user_filter = "" if user_id is None else "AND {alias}.user_id = :user_id"
+    params = {} if user_id is None else {'user_id': user_id}
+    
+    if user_id is None:
+        connection.execute(text("DELETE FROM rollups"))
+    else:
+        connection.execute(text("DELETE FROM rollups WHERE user_id = :user_id"), params)
+    
+    for period, expression in _PERIOD_SQL.items():
+        params['period'] = period
+        
+        start = expression.format(column='l.date')
+        connection.execute(text(
+            "INSERT INTO rollups (user_id, period, period_start, protein_g, carbs_g, fats_g, calories, meal_count, "
+            "volume_kg, set_count, workout_count, workout_minutes) "
+            f"SELECT l.user_id, :period, {start}, COALESCE(SUM(m.protein_g), 0), COALESCE(SUM(m.carbs_g), 0), "
+            "COALESCE(SUM(m.fats_g), 0), COALESCE(SUM(m.calories), 0), COUNT(*), 0, 0, 0, 0 "
+            "FROM meals m JOIN nutrition_logs l ON l.id = m.nutrition_log_id "
+            f"WHERE l.user_id IS NOT NULL {user_filter.format(alias='l')} "
+            f"GROUP BY l.user_id, {start}"
+        ), params)
+        
+        start = expression.format(column='w.date')
+        connection.execute(text(
+            "INSERT INTO rollups (user_id, period, period_start, protein_g, carbs_g, fats_g, calories, meal_count, "
+            "volume_kg, set_count, workout_count, workout_minutes) "
+            f"SELECT w.user_id, :period, {start}, 0, 0, 0, 0, 0, 0, 0, COUNT(*), COALESCE(SUM(w.duration_minutes), 0) "
+            "FROM workouts w "
+            f"WHERE w.user_id IS NOT NULL {user_filter.format(alias='w')} "
+            f"GROUP BY w.user_id, {start} "
+            "ON CONFLICT (user_id, period, period_start) DO UPDATE SET "
+            "workout_count = excluded.workout_count, workout_minutes = excluded.workout_minutes"
+        ), params)
+        
+        connection.execute(text(
+            "INSERT INTO rollups (user_id, period, period_start, protein_g, carbs_g, fats_g, calories, meal_count, "
+            "volume_kg, set_count, workout_count, workout_minutes) "
+            f"SELECT w.user_id, :period, {start}, 0, 0, 0, 0, 0, "
+            "COALESCE(SUM(COALESCE(e.sets, 0) * COALESCE(e.reps, 0) * COALESCE(e.weight_kg, 0)), 0), "
+            "COALESCE(SUM(e.sets), 0), 0, 0 "
+            "FROM exercises e JOIN workouts w ON w.id = e.workout_id "
+            f"WHERE w.user_id IS NOT NULL {user_filter.format(alias='w')} "
+            f"GROUP BY w.user_id, {start} "
+            "ON CONFLICT (user_id, period, period_start) DO UPDATE SET "
+            "volume_kg = excluded.volume_kg, set_count = excluded.set_count"
+        ), params)
+
+
+def ensure_rollups(engine):
+    """Build the rollups once for databases that have data but no rollups yet"""
+    with engine.begin() as connection:
+        if connection.execute(text("SELECT 1 FROM rollups LIMIT 1")).first():
+            return
+        has_data = connection.execute(text(
+            "SELECT 1 FROM meals UNION ALL SELECT 1 FROM workouts LIMIT 1"
+        )).first()
+        if has_data:
+            rebuild_rollups(connection)
+            print("✓ Built nutrition and training rollups")
+
+
+# Reading
+
+def get_rollups(session, user_id, period, start, end):
+    """Return the rollups for periods starting between start and end, oldest first"""
+    return session.query(Rollup).filter(
+        Rollup.user_id == user_id,
+        Rollup.period == period,
+        Rollup.period_start >= period_start(start, period),
+        Rollup.period_start <= end
+    ).order_by(Rollup.period_start).all()
+
+
+def week_summary(session, user_id, day):
+    """Return this ISO week's training totals and average daily intake"""
+    week_start = period_start(day, 'week')
+    week = session.query(Rollup).filter_by(user_id=user_id, period='week', period_start=week_start).first()
+    days_logged = session.query(func.count()).select_from(Rollup).filter(
+        Rollup.user_id == user_id,
+        Rollup.period == 'day',
+        Rollup.period_start >= week_start,
+        Rollup.period_start < week_start + timedelta(days=7),
+        Rollup.meal_count > 0
+    ).scalar()
+    
+    summary = {field: (getattr(week, field) or 0) if week else 0 for field in ROLLUP_FIELDS}
+    summary['week_start'] = week_start
+    summary['days_logged'] = days_logged
+    summary['avg_calories'] = summary['calories'] / days_logged if days_logged else 0
+    summary['avg_protein_g'] = summary['protein_g'] / days_logged if days_logged else 0
+    return summary
@@ -0,0 +1,40 @@
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy.orm import sessionmaker
+
+_factories = {}  # engine -> sessionmaker
+_factories_lock = threading.Lock()
+
+
+def session_factory(engine):
+    """Return the sessionmaker for an engine, creating it on first use.
+    
+    Sessions keep loaded attributes after commit (expire_on_commit=False),
+    so objects handed to the UI stay readable once their session has
+    closed instead of going back to the database on the next access.
+    """
+    with _factories_lock:
+        factory = _factories.get(engine)
+        if factory is None:
+            factory = _factories[engine] = sessionmaker(bind=engine, expire_on_commit=False)
+        return factory
+
+
+@contextmanager
+def session_scope(factory):
+    """Run one unit of work: commit on success, roll back on error, always close.
+    
+    Each operation, and each worker thread, opens its own scope; sessions
+    are never shared. Objects loaded inside are detached afterwards and
+    can be passed to session.add() in a later scope to change them.
+    """
+    session = factory()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
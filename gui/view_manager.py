@@ -0,0 +1,53 @@
+import customtkinter as ctk
+
+
+class ViewManager:
+    """Builds each view once and switches between them by packing frames.
+
+    A view is registered with a build function that fills a frame and
+    returns a refresh callable (or None). The first show builds the view;
+    later shows just repack the frame and call refresh, so only the data
+    bindings are updated instead of every widget being recreated.
+    """
+
+    def __init__(self, container, fg_color=None):
+        self.container = container
+        self.fg_color = fg_color
+        self.builders = {}
+        self.frames = {}
+        self.refreshers = {}
+        self.current = None
+
+    def register(self, name, build):
+        """Register a view; build(frame) fills the frame and returns a refresh callable"""
+        self.builders[name] = build
+
+    def show(self, name):
+        """Show a view, building it on first use and refreshing it otherwise"""
+        if name not in self.frames:
+            frame = ctk.CTkFrame(self.container, fg_color=self.fg_color)
+            self.frames[name] = frame
+            self.refreshers[name] = self.builders[name](frame)
+        elif self.refreshers[name]:
+            self.refreshers[name]()
+
+        if self.current != name:
+            if self.current in self.frames:
+                self.frames[self.current].pack_forget()
+            self.frames[name].pack(fill="both", expand=True)
+            self.current = name
+
+    def refresh(self, name=None):
+        """Refresh a built view's data, the visible one by default"""
+        name = name or self.current
+        if self.refreshers.get(name):
+            self.refreshers[name]()
+
+    def invalidate(self, name):
+        """Drop a built view so the next show rebuilds it from scratch"""
+        frame = self.frames.pop(name, None)
+        self.refreshers.pop(name, None)
+        if frame is not None:
+            frame.destroy()
+        if self.current == name:
+            self.current = None
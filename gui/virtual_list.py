@@ -0,0 +1,119 @@
+import tkinter
+
+import customtkinter as ctk
+
+
+class VirtualList(ctk.CTkFrame):
+    """Scrollable list that only keeps widgets for the visible rows.
+    
+    A fixed set of row widgets is created once and rebound to different
+    items as the list scrolls. Items are pulled a page at a time with
+    fetch_page(cursor, limit), where cursor is None for the first page and
+    cursor_for(last_item) after that, so only the pages the user scrolls to
+    are ever loaded.
+    """
+    
+    def __init__(self, master, fetch_page, create_row, bind_row, cursor_for,
+                 visible_rows=5, row_height=50, page_size=50, empty_text="",
+                 font=None, text_color=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.fetch_page = fetch_page
+        self.bind_row = bind_row
+        self.cursor_for = cursor_for
+        self.visible_rows = visible_rows
+        self.page_size = page_size
+        
+        self.items = []
+        self.cursor = None
+        self.exhausted = False
+        self.offset = 0
+        
+        self.body = ctk.CTkFrame(self, fg_color=kwargs.get('fg_color'), height=visible_rows * row_height)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.grid_columnconfigure(0, weight=1)
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text, font=font, text_color=text_color)
+        
+        self.rows = []
+        for i in range(visible_rows):
+            row = create_row(self.body)
+            row.configure(height=row_height)
+            row.pack_propagate(False)
+            row.grid(row=i, column=0, sticky="ew", padx=5, pady=2)
+            self._bind_wheel(row)
+            self.rows.append(row)
+        self._bind_wheel(self.body)
+    
+    def _bind_wheel(self, widget):
+        # Bind the raw Tk widgets; CTk's own bind() also forwards to the inner
+        # canvas, which would make every wheel tick scroll twice
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tkinter.Misc.bind(widget, sequence, self._on_wheel, "+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+    
+    def _load_page(self):
+        page = self.fetch_page(self.cursor, self.page_size)
+        self.items.extend(page)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        else:
+            self.cursor = self.cursor_for(page[-1])
+    
+    def _ensure_loaded(self, count):
+        while len(self.items) < count and not self.exhausted:
+            self._load_page()
+    
+    def reload(self, keep_position=False):
+        """Drop loaded items and fetch again, optionally staying at the same row"""
+        offset = self.offset if keep_position else 0
+        self.items = []
+        self.cursor = None
+        self.exhausted = False
+        self.offset = 0
+        self.scroll_to(offset)
+    
+    def scroll_to(self, offset):
+        """Show the rows starting at this item index"""
+        self._ensure_loaded(offset + self.visible_rows)
+        self.offset = max(0, min(offset, len(self.items) - self.visible_rows))
+        self._render()
+    
+    def _render(self):
+        for i, row in enumerate(self.rows):
+            index = self.offset + i
+            if index < len(self.items):
+                self.bind_row(row, self.items[index])
+                row.grid()
+            else:
+                row.grid_remove()
+        
+        if self.items:
+            self.empty_label.grid_remove()
+        else:
+            self.empty_label.grid(row=0, column=0, pady=20)
+        
+        # Until the last page is in, assume there is at least one more
+        total = len(self.items) if self.exhausted else len(self.items) + self.page_size
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            total = len(self.items) if self.exhausted else len(self.items) + self.page_size
+            self.scroll_to(int(float(amount) * total))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.offset + int(amount) * step)
+    
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_to(self.offset - 1)
+        else:
+            self.scroll_to(self.offset + 1)
+        return "break"
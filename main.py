@@ -1,12 +1,29 @@
+import sys
+import time
+
+# Started before the heavy imports below so --profile-startup covers them
+STARTED_AT = time.perf_counter()
+startup_profiler = None
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    from utils.profiling import StartupProfiler
+    startup_profiler = StartupProfiler(STARTED_AT)
+    startup_profiler.start()
+
 import customtkinter as ctk
 from datetime import datetime
-import sys
 import os
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.models import init_db, get_session, User
+from database.consistency import check_nutrition_totals
+from database.models import init_db, User
+from database.session import session_factory, session_scope
+from gui.view_manager import ViewManager
+from gui.virtual_list import VirtualList
+from utils.lazy import is_loaded
+from utils.search import TypeAheadSearch, coalescer, normalize_query
+from utils.tasks import BackgroundTasks
 
 class FitnessTrackerApp(ctk.CTk):
     """Main application window"""
@@ -41,15 +58,39 @@ class FitnessTrackerApp(ctk.CTk):
         
         # Initialize database
         self.engine = init_db('fitness_tracker.db')
-        self.session = get_session(self.engine)
+        check_nutrition_totals(self.engine)
+        
+        # Each operation opens its own short-lived session from this factory
+        self.Session = session_factory(self.engine)
+        
+        # Worker pool for network calls so the UI never blocks on I/O; the
+        # API budget in the sidebar is checked whenever tasks finish
+        self.quota_label = None
+        self.quota_version = None
+        self.tasks = BackgroundTasks(self, after_results=self.update_quota_display)
+        
+        # Set to stop a running export early
+        self.export_cancel = None
+        
+        # Keep the local exercise catalog in sync without blocking startup
+        self.start_catalog_refresh()
         
         # Get or create user
-        self.user = self.session.query(User).first()
+        with session_scope(self.Session) as session:
+            self.user = session.query(User).first()
         if not self.user:
             self.show_user_setup()
         else:
             self.create_main_layout()
     
+    def start_catalog_refresh(self):
+        """Sync the local exercise catalog in the background if it is stale"""
+        from api.exercisedb import get_exercise_api
+        
+        api = get_exercise_api()
+        if api.api_key:
+            api.catalog.start_background_refresh(api)
+    
     def show_user_setup(self):
         """Show initial user setup screen"""
         setup_frame = ctk.CTkFrame(self, fg_color=self.colors['bg'])
@@ -239,8 +280,8 @@ class FitnessTrackerApp(ctk.CTk):
                     target_calories=float(protein_entry.get())*4 + float(carbs_entry.get())*4 + float(fats_entry.get())*9
                 )
                 
-                self.session.add(new_user)
-                self.session.commit()
+                with session_scope(self.Session) as session:
+                    session.add(new_user)
                 self.user = new_user
                 
                 # Destroy setup frame and create main layout
@@ -337,29 +378,100 @@ class FitnessTrackerApp(ctk.CTk):
         )
         self.progress_btn.pack(pady=10, padx=20, fill="x")
         
+        self.export_btn = ctk.CTkButton(
+            self.sidebar,
+            text="Export Data",
+            command=self.show_export,
+            height=40,
+            font=self.fonts['body'],
+            fg_color="white",
+            text_color=self.colors['text'],
+            hover_color=self.colors['pink_dark']
+        )
+        self.export_btn.pack(pady=10, padx=20, fill="x")
+        
+        self.import_btn = ctk.CTkButton(
+            self.sidebar,
+            text="Import Data",
+            command=self.show_import,
+            height=40,
+            font=self.fonts['body'],
+            fg_color="white",
+            text_color=self.colors['text'],
+            hover_color=self.colors['pink_dark']
+        )
+        self.import_btn.pack(pady=10, padx=20, fill="x")
+        
+        # Remaining API budget for today
+        self.quota_label = ctk.CTkLabel(
+            self.sidebar,
+            text="",
+            font=self.fonts['small'],
+            text_color=self.colors['text'],
+            justify="left"
+        )
+        self.quota_label.pack(side="bottom", pady=20)
+        self.quota_version = None
+        self.update_quota_display()
+        
         # Main content area
         self.main_frame = ctk.CTkFrame(self, fg_color=self.colors['bg'])
         self.main_frame.pack(side="right", fill="both", expand=True, padx=20, pady=20)
         
+        # Each view is built once and then just hidden, shown and refreshed
+        self.views = ViewManager(self.main_frame, fg_color=self.colors['bg'])
+        self.views.register('dashboard', self.build_dashboard)
+        self.views.register('workout', self.build_workout_log)
+        self.views.register('nutrition', self.build_nutrition_log)
+        self.views.register('progress', self.build_progress)
+        
         # Show dashboard by default
         self.show_dashboard()
     
-    def clear_main_frame(self):
-        """Clear the main content area"""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+    def update_quota_display(self):
+        """Reload the sidebar's remaining API calls if any were used since it was drawn"""
+        from api.quota import get_quota_manager
+        
+        quota = get_quota_manager()
+        if self.quota_label is None or quota.version == self.quota_version:
+            return
+        self.quota_version = quota.version
+        # Read on a worker so the UI thread never waits on the quota database
+        self.tasks.submit(quota.status, key='quota_status', on_success=self.show_quota_status)
+    
+    def show_quota_status(self, status):
+        exercises = status['exercisedb']
+        foods = status['usda']
+        self.quota_label.configure(
+            text=f"API calls left today\n"
+                 f"Exercises: {exercises['remaining']}/{exercises['limit']}\n"
+                 f"Foods: {foods['remaining']}/{foods['limit']}"
+        )
     
     def show_dashboard(self):
         """Show the dashboard view"""
-        self.clear_main_frame()
-        
-        # Convert stored metric units to imperial for display
-        current_weight_lbs = self.user.current_weight_kg / 0.453592
-        target_weight_lbs = self.user.target_weight_kg / 0.453592
-        height_inches = self.user.height_cm / 2.54
+        self.views.show('dashboard')
+    
+    def show_workout_log(self):
+        """Show workout logging view"""
+        self.views.show('workout')
+    
+    def show_nutrition_log(self):
+        """Show nutrition logging view"""
+        self.views.show('nutrition')
+    
+    def show_progress(self):
+        """Show progress tracking view"""
+        self.views.show('progress')
+    
+    def build_dashboard(self, parent):
+        """Build the dashboard view and return its refresh function"""
+        from database.rollups import week_summary
+        from utils.tdee import MIN_DAYS, apply_target, get_tdee, recomp_target
+        from datetime import date
         
         title = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Dashboard",
             font=self.fonts['title'],
             text_color=self.colors['text']
@@ -367,7 +479,7 @@ class FitnessTrackerApp(ctk.CTk):
         title.pack(pady=20)
         
         # Quick stats
-        stats_frame = ctk.CTkFrame(self.main_frame, fg_color=self.colors['bg'])
+        stats_frame = ctk.CTkFrame(parent, fg_color=self.colors['bg'])
         stats_frame.pack(fill="x", pady=20)
         
         # Current weight
@@ -379,12 +491,13 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['subheading'],
             text_color=self.colors['text']
         ).pack(pady=5)
-        ctk.CTkLabel(
+        current_weight_label = ctk.CTkLabel(
             weight_frame,
-            text=f"{current_weight_lbs:.1f} lbs",
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5)
+        )
+        current_weight_label.pack(pady=5)
         
         # Target weight
         target_frame = ctk.CTkFrame(stats_frame, fg_color=self.colors['pink'])
@@ -395,12 +508,13 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['subheading'],
             text_color=self.colors['text']
         ).pack(pady=5)
-        ctk.CTkLabel(
+        target_weight_label = ctk.CTkLabel(
             target_frame,
-            text=f"{target_weight_lbs:.1f} lbs",
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5)
+        )
+        target_weight_label.pack(pady=5)
         
         # Height display
         height_frame = ctk.CTkFrame(stats_frame, fg_color=self.colors['pink'])
@@ -411,15 +525,16 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['subheading'],
             text_color=self.colors['text']
         ).pack(pady=5)
-        ctk.CTkLabel(
+        height_label = ctk.CTkLabel(
             height_frame,
-            text=f"{height_inches:.1f} in",
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5)
+        )
+        height_label.pack(pady=5)
         
         # Macro targets
-        macro_frame = ctk.CTkFrame(self.main_frame, fg_color=self.colors['bg'])
+        macro_frame = ctk.CTkFrame(parent, fg_color=self.colors['bg'])
         macro_frame.pack(fill="x", pady=20)
         
         ctk.CTkLabel(
@@ -441,12 +556,13 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['body'],
             text_color=self.colors['text']
         ).pack(pady=5)
-        ctk.CTkLabel(
-            protein_box, 
-            text=f"{self.user.target_protein_g}g", 
+        protein_label = ctk.CTkLabel(
+            protein_box,
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5)
+        )
+        protein_label.pack(pady=5)
         
         # Carbs
         carbs_box = ctk.CTkFrame(macros_grid, fg_color=self.colors['pink_dark'])
@@ -457,12 +573,13 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['body'],
             text_color=self.colors['text']
         ).pack(pady=5)
-        ctk.CTkLabel(
-            carbs_box, 
-            text=f"{self.user.target_carbs_g}g", 
+        carbs_label = ctk.CTkLabel(
+            carbs_box,
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5)
+        )
+        carbs_label.pack(pady=5)
         
         # Fats
         fats_box = ctk.CTkFrame(macros_grid, fg_color=self.colors['pink_dark'])
@@ -473,12 +590,13 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['body'],
             text_color=self.colors['text']
         ).pack(pady=5)
-        ctk.CTkLabel(
-            fats_box, 
-            text=f"{self.user.target_fats_g}g", 
+        fats_label = ctk.CTkLabel(
+            fats_box,
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5)
+        )
+        fats_label.pack(pady=5)
         
         # Calories
         cal_box = ctk.CTkFrame(macros_grid, fg_color=self.colors['pink_dark'])
@@ -489,23 +607,130 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['body'],
             text_color=self.colors['text']
         ).pack(pady=5)
+        calories_label = ctk.CTkLabel(
+            cal_box,
+            text="",
+            font=self.fonts['heading'],
+            text_color=self.colors['text']
+        )
+        calories_label.pack(pady=5)
+        
+        # This week's totals, read from the weekly rollup
+        week_frame = ctk.CTkFrame(parent, fg_color=self.colors['bg'])
+        week_frame.pack(fill="x", pady=20)
+        
         ctk.CTkLabel(
-            cal_box, 
-            text=f"{int(self.user.target_calories)}", 
+            week_frame,
+            text="This Week",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5)
-    
-    def show_workout_log(self):
-        """Show workout logging view"""
-        self.clear_main_frame()
+        ).pack(pady=10)
         
-        from api.exercisedb import ExerciseDBAPI
+        week_grid = ctk.CTkFrame(week_frame, fg_color=self.colors['bg'])
+        week_grid.pack(pady=10)
+        
+        week_labels = {}
+        for column, (key, heading) in enumerate([
+            ('workouts', "Workouts"),
+            ('minutes', "Minutes"),
+            ('volume', "Volume (lbs)"),
+            ('calories', "Avg Calories"),
+            ('protein', "Avg Protein"),
+        ]):
+            box = ctk.CTkFrame(week_grid, fg_color=self.colors['pink'])
+            box.grid(row=0, column=column, padx=10, pady=10)
+            ctk.CTkLabel(
+                box,
+                text=heading,
+                font=self.fonts['body'],
+                text_color=self.colors['text']
+            ).pack(pady=5, padx=15)
+            week_labels[key] = ctk.CTkLabel(
+                box,
+                text="",
+                font=self.fonts['heading'],
+                text_color=self.colors['text']
+            )
+            week_labels[key].pack(pady=5, padx=15)
+        
+        # Maintenance calories estimated from logged intake and weight trend
+        tdee_frame = ctk.CTkFrame(parent, fg_color=self.colors['pink'])
+        tdee_frame.pack(fill="x", pady=10, padx=10)
+        
+        tdee_label = ctk.CTkLabel(
+            tdee_frame,
+            text="",
+            font=self.fonts['body'],
+            text_color=self.colors['text']
+        )
+        tdee_label.pack(side="left", padx=20, pady=10)
+        
+        tdee_estimate = {'value': None}
+        
+        def use_tdee():
+            """Set the calorie and macro targets from the TDEE estimate"""
+            if tdee_estimate['value'] is None:
+                return
+            with session_scope(self.Session) as session:
+                session.add(self.user)
+                apply_target(self.user, tdee_estimate['value'])
+            refresh()
+        
+        tdee_btn = ctk.CTkButton(
+            tdee_frame,
+            text="",
+            command=use_tdee,
+            font=self.fonts['small'],
+            fg_color=self.colors['pink_dark'],
+            hover_color=self.colors['accent']
+        )
+        
+        def refresh():
+            """Update the stats from the user's profile"""
+            # Convert stored metric units to imperial for display
+            current_weight_label.configure(text=f"{self.user.current_weight_kg / 0.453592:.1f} lbs")
+            target_weight_label.configure(text=f"{self.user.target_weight_kg / 0.453592:.1f} lbs")
+            height_label.configure(text=f"{self.user.height_cm / 2.54:.1f} in")
+            
+            protein_label.configure(text=f"{self.user.target_protein_g}g")
+            carbs_label.configure(text=f"{self.user.target_carbs_g}g")
+            fats_label.configure(text=f"{self.user.target_fats_g}g")
+            calories_label.configure(text=f"{int(self.user.target_calories)}")
+            
+            with session_scope(self.Session) as session:
+                week = week_summary(session, self.user.id, date.today())
+                tdee, days_used = get_tdee().estimate(session, self.user.id)
+            
+            week_labels['workouts'].configure(text=f"{week['workout_count']}")
+            week_labels['minutes'].configure(text=f"{week['workout_minutes']}")
+            week_labels['volume'].configure(text=f"{week['volume_kg'] / 0.453592:,.0f}")
+            week_labels['calories'].configure(text=f"{week['avg_calories']:.0f}")
+            week_labels['protein'].configure(text=f"{week['avg_protein_g']:.0f}g")
+            
+            tdee_estimate['value'] = tdee
+            if tdee is None:
+                tdee_label.configure(
+                    text=f"Log food and weight for {MIN_DAYS} days to estimate your maintenance calories "
+                         f"({days_used} so far)"
+                )
+                tdee_btn.pack_forget()
+            else:
+                tdee_label.configure(text=f"Estimated maintenance: {tdee:,.0f} calories/day ({days_used} days of logs)")
+                tdee_btn.configure(text=f"Set target to {recomp_target(tdee):,.0f}")
+                tdee_btn.pack(side="right", padx=20, pady=10)
+        
+        refresh()
+        return refresh
+    
+    def build_workout_log(self, parent):
+        """Build the workout logging view"""
+        from api.exercisedb import get_exercise_api
         from database.models import Workout, Exercise
+        from database.records import check_records
         from datetime import date
         
         title = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Log Workout",
             font=self.fonts['title'],
             text_color=self.colors['text']
@@ -513,7 +738,7 @@ class FitnessTrackerApp(ctk.CTk):
         title.pack(pady=20)
         
         # Create scrollable frame for the whole workout log
-        scroll_frame = ctk.CTkScrollableFrame(self.main_frame, fg_color=self.colors['bg'])
+        scroll_frame = ctk.CTkScrollableFrame(parent, fg_color=self.colors['bg'])
         scroll_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Workout info section
@@ -677,6 +902,89 @@ class FitnessTrackerApp(ctk.CTk):
                     )
                     remove_btn.pack(side="right", padx=5)
         
+        def fetch_exercises(query, search_type):
+            """Run an exercise search (called on a worker thread)"""
+            api = get_exercise_api()
+            
+            if search_type == "Name":
+                return api.search_exercises_by_name(query)
+            elif search_type == "Body Part":
+                return api.get_exercises_by_body_part(query.lower())
+            elif search_type == "Equipment":
+                return api.get_exercises_by_equipment(query.lower())
+            return []
+        
+        def fetch_exercises_coalesced(query, search_type):
+            """Run an exercise search, sharing the call with an identical one in flight"""
+            key = ('exercises', search_type, normalize_query(query))
+            return coalescer.call(key, fetch_exercises, query, search_type)
+        
+        def show_exercise_results(query, results):
+            """Render exercise search results (called on the UI thread)"""
+            for widget in results_frame.winfo_children():
+                widget.destroy()
+            
+            if not results:
+                ctk.CTkLabel(
+                    results_frame,
+                    text=f"No exercises found for '{query}'",
+                    font=self.fonts['body'],
+                    text_color=self.colors['text']
+                ).pack(pady=10)
+            else:
+                # Show first 10 results
+                for exercise in results[:10]:
+                    result_frame = ctk.CTkFrame(results_frame, fg_color=self.colors['pink'])
+                    result_frame.pack(fill="x", pady=2, padx=5)
+                    
+                    name = exercise.get('name', 'Unknown')
+                    body_part = exercise.get('bodyPart', 'Unknown')
+                    equipment = exercise.get('equipment', 'None')
+                    target = exercise.get('target', 'Unknown')
+                    
+                    info_text = f"{name}\nBody Part: {body_part} | Equipment: {equipment}"
+                    
+                    ctk.CTkLabel(
+                        result_frame,
+                        text=info_text,
+                        font=self.fonts['small'],
+                        text_color=self.colors['text'],
+                        justify="left"
+                    ).pack(side="left", padx=10, pady=5)
+                    
+                    def add_exercise(ex=exercise):
+                        exercises_list.append({
+                            'name': ex.get('name', 'Unknown'),
+                            'exercise_id': ex.get('id', ''),
+                            'body_part': ex.get('bodyPart', 'Unknown'),
+                            'target': ex.get('target', 'Unknown'),
+                            'equipment': ex.get('equipment', 'None')
+                        })
+                        update_exercises_display()
+                    
+                    add_btn = ctk.CTkButton(
+                        result_frame,
+                        text="Add",
+                        command=add_exercise,
+                        width=60,
+                        fg_color=self.colors['pink_dark'],
+                        hover_color=self.colors['pink'],
+                        font=self.fonts['small']
+                    )
+                    add_btn.pack(side="right", padx=5)
+        
+        def show_exercise_error(e):
+            """Show a failed exercise search"""
+            for widget in results_frame.winfo_children():
+                widget.destroy()
+            
+            ctk.CTkLabel(
+                results_frame,
+                text=f"Error: {str(e)}\nMake sure your API key is set up!",
+                font=self.fonts['small'],
+                text_color="red"
+            ).pack(pady=10)
+        
         def search_exercises():
             """Search for exercises using ExerciseDB API"""
             for widget in results_frame.winfo_children():
@@ -701,76 +1009,37 @@ class FitnessTrackerApp(ctk.CTk):
             )
             loading.pack(pady=10)
             
-            try:
-                api = ExerciseDBAPI()
-                search_type = search_type_var.get()
-                
+            typeahead.cancel_pending()
+            search_type = search_type_var.get()
+            
+            def show_results(results):
                 if search_type == "Name":
-                    results = api.search_exercises_by_name(query)
-                elif search_type == "Body Part":
-                    results = api.get_exercises_by_body_part(query.lower())
-                elif search_type == "Equipment":
-                    results = api.get_exercises_by_equipment(query.lower())
-                
-                loading.destroy()
-                
-                if not results:
-                    ctk.CTkLabel(
-                        results_frame,
-                        text=f"No exercises found for '{query}'",
-                        font=self.fonts['body'],
-                        text_color=self.colors['text']
-                    ).pack(pady=10)
-                else:
-                    # Show first 10 results
-                    for exercise in results[:10]:
-                        result_frame = ctk.CTkFrame(results_frame, fg_color=self.colors['pink'])
-                        result_frame.pack(fill="x", pady=2, padx=5)
-                        
-                        name = exercise.get('name', 'Unknown')
-                        body_part = exercise.get('bodyPart', 'Unknown')
-                        equipment = exercise.get('equipment', 'None')
-                        target = exercise.get('target', 'Unknown')
-                        
-                        info_text = f"{name}\nBody Part: {body_part} | Equipment: {equipment}"
-                        
-                        ctk.CTkLabel(
-                            result_frame,
-                            text=info_text,
-                            font=self.fonts['small'],
-                            text_color=self.colors['text'],
-                            justify="left"
-                        ).pack(side="left", padx=10, pady=5)
-                        
-                        def add_exercise(ex=exercise):
-                            exercises_list.append({
-                                'name': ex.get('name', 'Unknown'),
-                                'exercise_id': ex.get('id', ''),
-                                'body_part': ex.get('bodyPart', 'Unknown'),
-                                'target': ex.get('target', 'Unknown'),
-                                'equipment': ex.get('equipment', 'None')
-                            })
-                            update_exercises_display()
-                        
-                        add_btn = ctk.CTkButton(
-                            result_frame,
-                            text="Add",
-                            command=add_exercise,
-                            width=60,
-                            fg_color=self.colors['pink_dark'],
-                            hover_color=self.colors['pink'],
-                            font=self.fonts['small']
-                        )
-                        add_btn.pack(side="right", padx=5)
-                        
-            except Exception as e:
-                loading.destroy()
-                ctk.CTkLabel(
-                    results_frame,
-                    text=f"Error: {str(e)}\nMake sure your API key is set up!",
-                    font=self.fonts['small'],
-                    text_color="red"
-                ).pack(pady=10)
+                    typeahead.remember(query, results)
+                show_exercise_results(query, results)
+            
+            # Run the request on a worker thread so the window stays responsive
+            self.tasks.submit(
+                fetch_exercises_coalesced,
+                query,
+                search_type,
+                key='exercise_search',
+                on_success=show_results,
+                on_error=show_exercise_error
+            )
+        
+        # Live suggestions while typing, for name searches only since body part
+        # and equipment need the full word
+        typeahead = TypeAheadSearch(
+            search_entry,
+            self.tasks,
+            fetch=lambda query: fetch_exercises_coalesced(query, "Name"),
+            on_results=show_exercise_results,
+            on_error=show_exercise_error,
+            key='exercise_search',
+            text_fields=('name',),
+            enabled=lambda: search_type_var.get() == "Name"
+        )
+        search_entry.bind("<Return>", lambda event: search_exercises())
         
         search_btn = ctk.CTkButton(
             search_controls,
@@ -785,59 +1054,82 @@ class FitnessTrackerApp(ctk.CTk):
         # Initialize display
         update_exercises_display()
         
+        # One status line and one PR line below the save button, reused on
+        # every save since this view is kept for the life of the app
+        status_label = ctk.CTkLabel(scroll_frame, text="", font=self.fonts['heading'])
+        pr_label = ctk.CTkLabel(scroll_frame, text="", font=self.fonts['body'], text_color="green")
+        
+        def show_status(text, color, records_text=""):
+            status_label.configure(text=text, text_color=color)
+            if not status_label.winfo_ismapped():
+                status_label.pack(pady=10)
+            if records_text:
+                pr_label.configure(text=records_text)
+                pr_label.pack(pady=5, after=status_label)
+            else:
+                pr_label.pack_forget()
+        
         # Save workout button
         def save_workout():
             try:
                 if not exercises_list:
-                    error = ctk.CTkLabel(
-                        scroll_frame,
-                        text="Please add at least one exercise!",
-                        font=self.fonts['body'],
-                        text_color="red"
-                    )
-                    error.pack(pady=10)
+                    show_status("Please add at least one exercise!", "red")
                     return
                 
-                # Create workout
-                workout = Workout(
-                    user_id=self.user.id,
-                    date=date.today(),
-                    workout_type=workout_type_var.get(),
-                    duration_minutes=int(duration_entry.get()) if duration_entry.get() else None
-                )
-                
-                self.session.add(workout)
-                self.session.flush()  # Get workout ID
-                
-                # Add exercises
+                # Read the form once, converting lbs to kg for storage
+                lifts = []
                 for ex in exercises_list:
-                    # Convert lbs to kg for storage
                     weight_lbs = float(ex['weight_entry'].get()) if ex['weight_entry'].get() else 0
-                    weight_kg = weight_lbs * 0.453592
+                    lifts.append((
+                        ex,
+                        int(ex['sets_entry'].get()) if ex['sets_entry'].get() else None,
+                        int(ex['reps_entry'].get()) if ex['reps_entry'].get() else None,
+                        weight_lbs * 0.453592
+                    ))
+                
+                with session_scope(self.Session) as session:
+                    # Compare with the stored records before saving updates them
+                    new_records = check_records(
+                        session, self.user.id, [(ex['name'], sets, reps, weight_kg) for ex, sets, reps, weight_kg in lifts]
+                    )
                     
-                    exercise = Exercise(
-                        workout_id=workout.id,
-                        exercise_name=ex['name'],
-                        exercise_id=ex.get('exercise_id', ''),
-                        body_part=ex['body_part'],
-                        target_muscle=ex.get('target', ''),
-                        equipment=ex.get('equipment', ''),
-                        sets=int(ex['sets_entry'].get()) if ex['sets_entry'].get() else None,
-                        reps=int(ex['reps_entry'].get()) if ex['reps_entry'].get() else None,
-                        weight_kg=weight_kg
+                    # Create workout
+                    workout = Workout(
+                        user_id=self.user.id,
+                        date=date.today(),
+                        workout_type=workout_type_var.get(),
+                        duration_minutes=int(duration_entry.get()) if duration_entry.get() else None
                     )
-                    self.session.add(exercise)
+                    
+                    session.add(workout)
+                    session.flush()  # Get workout ID
+                    
+                    # Add exercises
+                    for ex, sets, reps, weight_kg in lifts:
+                        exercise = Exercise(
+                            workout_id=workout.id,
+                            exercise_name=ex['name'],
+                            exercise_id=ex.get('exercise_id', ''),
+                            body_part=ex['body_part'],
+                            target_muscle=ex.get('target', ''),
+                            equipment=ex.get('equipment', ''),
+                            sets=sets,
+                            reps=reps,
+                            weight_kg=weight_kg
+                        )
+                        session.add(exercise)
                 
-                self.session.commit()
-                
-                # Success message
-                success = ctk.CTkLabel(
-                    scroll_frame,
-                    text="Workout saved successfully!",
-                    font=self.fonts['heading'],
-                    text_color="green"
-                )
-                success.pack(pady=10)
+                records = []
+                for name, improved in new_records.items():
+                    parts = []
+                    if 'weight_kg' in improved:
+                        parts.append(f"heaviest {improved['weight_kg'] / 0.453592:.1f} lbs")
+                    if 'e1rm_kg' in improved:
+                        parts.append(f"est. 1RM {improved['e1rm_kg'] / 0.453592:.1f} lbs")
+                    if 'volume_kg' in improved:
+                        parts.append(f"volume {improved['volume_kg'] / 0.453592:,.0f} lbs")
+                    records.append(f"New PR! {name.title()}: {', '.join(parts)}")
+                show_status("Workout saved successfully!", "green", "\n".join(records))
                 
                 # Clear the form
                 exercises_list.clear()
@@ -845,14 +1137,7 @@ class FitnessTrackerApp(ctk.CTk):
                 duration_entry.delete(0, 'end')
                 
             except Exception as e:
-                self.session.rollback()
-                error = ctk.CTkLabel(
-                    scroll_frame,
-                    text=f"Error saving workout: {str(e)}",
-                    font=self.fonts['body'],
-                    text_color="red"
-                )
-                error.pack(pady=10)
+                show_status(f"Error saving workout: {str(e)}", "red")
         
         save_btn = ctk.CTkButton(
             scroll_frame,
@@ -864,17 +1149,21 @@ class FitnessTrackerApp(ctk.CTk):
             hover_color=self.colors['pink']
         )
         save_btn.pack(pady=20)
-    
-    def show_nutrition_log(self):
-        """Show nutrition logging view"""
-        self.clear_main_frame()
         
-        from api.usda_food import USDAFoodAPI
+        # Nothing here comes from the database, so a half-entered workout
+        # simply survives switching tabs
+        return None
+    
+    def build_nutrition_log(self, parent):
+        """Build the nutrition logging view and return its refresh function"""
+        from api.usda_food import get_food_api
         from database.models import NutritionLog, Meal
+        from database.queries import meals_page, meal_cursor
+        from database.consistency import recompute_log_totals
         from datetime import date
         
         title = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Log Nutrition",
             font=self.fonts['title'],
             text_color=self.colors['text']
@@ -882,23 +1171,30 @@ class FitnessTrackerApp(ctk.CTk):
         title.pack(pady=20)
         
         # Create scrollable frame
-        scroll_frame = ctk.CTkScrollableFrame(self.main_frame, fg_color=self.colors['bg'])
+        scroll_frame = ctk.CTkScrollableFrame(parent, fg_color=self.colors['bg'])
         scroll_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
-        # Get or create today's nutrition log
-        today = date.today()
-        nutrition_log = self.session.query(NutritionLog).filter_by(
-            user_id=self.user.id,
-            date=today
-        ).first()
+        nutrition_log = None
         
-        if not nutrition_log:
-            nutrition_log = NutritionLog(
-                user_id=self.user.id,
-                date=today
-            )
-            self.session.add(nutrition_log)
-            self.session.commit()
+        def load_today_log():
+            """Get or create today's nutrition log, moving on if the date has changed"""
+            nonlocal nutrition_log
+            today = date.today()
+            if nutrition_log is not None and nutrition_log.date == today:
+                return
+            
+            with session_scope(self.Session) as session:
+                nutrition_log = session.query(NutritionLog).filter_by(
+                    user_id=self.user.id,
+                    date=today
+                ).first()
+                
+                if not nutrition_log:
+                    nutrition_log = NutritionLog(
+                        user_id=self.user.id,
+                        date=today
+                    )
+                    session.add(nutrition_log)
         
         # Macro progress section
         progress_frame = ctk.CTkFrame(scroll_frame, fg_color=self.colors['pink'])
@@ -921,7 +1217,9 @@ class FitnessTrackerApp(ctk.CTk):
                 widget.destroy()
             
             # Refresh nutrition log from database
-            self.session.refresh(nutrition_log)
+            with session_scope(self.Session) as session:
+                session.add(nutrition_log)
+                session.refresh(nutrition_log)
             
             # Protein
             protein_frame = ctk.CTkFrame(macros_grid, fg_color="white")
@@ -1021,6 +1319,163 @@ class FitnessTrackerApp(ctk.CTk):
         results_frame = ctk.CTkScrollableFrame(search_frame, height=200, fg_color=self.colors['bg'])
         results_frame.pack(fill="both", padx=20, pady=10)
         
+        def fetch_foods(query):
+            """Run a food search, sharing the call with an identical one in flight"""
+            key = ('foods', normalize_query(query))
+            return coalescer.call(key, get_food_api().search_foods, query, page_size=10)
+        
+        def show_food_results(query, results):
+            """Render food search results (called on the UI thread)"""
+            for widget in results_frame.winfo_children():
+                widget.destroy()
+            
+            api = get_food_api()
+            
+            if not results:
+                ctk.CTkLabel(
+                    results_frame,
+                    text=f"No foods found for '{query}'",
+                    font=self.fonts['body'],
+                    text_color=self.colors['text']
+                ).pack(pady=10)
+            else:
+                for food in results:
+                    result_frame = ctk.CTkFrame(results_frame, fg_color=self.colors['pink'])
+                    result_frame.pack(fill="x", pady=2, padx=5)
+                    
+                    name = food.get('description', 'Unknown')
+                    brand = food.get('brand', 'Generic')
+                    protein = food.get('protein_g', 0)
+                    carbs = food.get('carbs_g', 0)
+                    fats = food.get('fats_g', 0)
+                    cals = food.get('calories', 0)
+                    
+                    info_text = f"{name} ({brand})\nP: {protein:.1f}g | C: {carbs:.1f}g | F: {fats:.1f}g | Cals: {cals:.0f}"
+                    
+                    info_label = ctk.CTkLabel(
+                        result_frame,
+                        text=info_text,
+                        font=self.fonts['small'],
+                        text_color=self.colors['text'],
+                        justify="left"
+                    )
+                    info_label.pack(side="left", padx=10, pady=5)
+                    
+                    def add_food(f=food):
+                        # Create popup for serving size
+                        popup = ctk.CTkToplevel(self)
+                        popup.title("Add Food")
+                        popup.geometry("400x300")
+                        popup.configure(fg_color=self.colors['bg'])
+                        
+                        ctk.CTkLabel(
+                            popup,
+                            text=f"Add: {f.get('description', 'Unknown')}",
+                            font=self.fonts['heading'],
+                            text_color=self.colors['text']
+                        ).pack(pady=20)
+                        
+                        # Meal type
+                        ctk.CTkLabel(
+                            popup,
+                            text="Meal Type:",
+                            font=self.fonts['body'],
+                            text_color=self.colors['text']
+                        ).pack(pady=5)
+                        
+                        meal_var = ctk.StringVar(value="Breakfast")
+                        meal_menu = ctk.CTkOptionMenu(
+                            popup,
+                            values=["Breakfast", "Lunch", "Dinner", "Snack"],
+                            variable=meal_var,
+                            fg_color=self.colors['pink'],
+                            button_color=self.colors['pink_dark']
+                        )
+                        meal_menu.pack(pady=5)
+                        
+                        # Serving size
+                        ctk.CTkLabel(
+                            popup,
+                            text="Serving Size (g):",
+                            font=self.fonts['body'],
+                            text_color=self.colors['text']
+                        ).pack(pady=5)
+                        
+                        serving_entry = ctk.CTkEntry(popup, fg_color="white")
+                        serving_entry.insert(0, str(f.get('serving_size', 100)))
+                        serving_entry.pack(pady=5)
+                        
+                        def save_food():
+                            try:
+                                serving = float(serving_entry.get())
+                                
+                                # Calculate macros for this serving
+                                calculated = api.calculate_macros_for_serving(f, serving)
+                                
+                                # Create meal
+                                meal = Meal(
+                                    nutrition_log_id=nutrition_log.id,
+                                    meal_type=meal_var.get(),
+                                    food_name=f.get('description', 'Unknown'),
+                                    serving_size=f"{serving}g",
+                                    protein_g=calculated['protein_g'],
+                                    carbs_g=calculated['carbs_g'],
+                                    fats_g=calculated['fats_g'],
+                                    calories=calculated['calories']
+                                )
+                                with session_scope(self.Session) as session:
+                                    session.add(nutrition_log)
+                                    session.add(meal)
+                                    
+                                    # Recompute totals from the meals so they can't drift
+                                    recompute_log_totals(session, nutrition_log)
+                                
+                                # Update display
+                                update_macro_display()
+                                update_meals_display()
+                                
+                                popup.destroy()
+                                
+                            except ValueError:
+                                error = ctk.CTkLabel(
+                                    popup,
+                                    text="Please enter a valid number!",
+                                    text_color="red"
+                                )
+                                error.pack(pady=5)
+                        
+                        ctk.CTkButton(
+                            popup,
+                            text="Add to Log",
+                            command=save_food,
+                            fg_color=self.colors['pink_dark'],
+                            hover_color=self.colors['pink'],
+                            font=self.fonts['body']
+                        ).pack(pady=20)
+                    
+                    add_btn = ctk.CTkButton(
+                        result_frame,
+                        text="Add",
+                        command=add_food,
+                        width=60,
+                        fg_color=self.colors['pink_dark'],
+                        hover_color=self.colors['pink'],
+                        font=self.fonts['small']
+                    )
+                    add_btn.pack(side="right", padx=5)
+        
+        def show_food_error(e):
+            """Show a failed food search"""
+            for widget in results_frame.winfo_children():
+                widget.destroy()
+            
+            ctk.CTkLabel(
+                results_frame,
+                text=f"Error: {str(e)}",
+                font=self.fonts['small'],
+                text_color="red"
+            ).pack(pady=10)
+        
         def search_foods():
             """Search for foods using USDA API"""
             for widget in results_frame.winfo_children():
@@ -1045,156 +1500,32 @@ class FitnessTrackerApp(ctk.CTk):
             )
             loading.pack(pady=10)
             
-            try:
-                api = USDAFoodAPI()
-                results = api.search_foods(query, page_size=10)
-                
-                loading.destroy()
-                
-                if not results:
-                    ctk.CTkLabel(
-                        results_frame,
-                        text=f"No foods found for '{query}'",
-                        font=self.fonts['body'],
-                        text_color=self.colors['text']
-                    ).pack(pady=10)
-                else:
-                    for food in results:
-                        result_frame = ctk.CTkFrame(results_frame, fg_color=self.colors['pink'])
-                        result_frame.pack(fill="x", pady=2, padx=5)
-                        
-                        name = food.get('description', 'Unknown')
-                        brand = food.get('brand', 'Generic')
-                        protein = food.get('protein_g', 0)
-                        carbs = food.get('carbs_g', 0)
-                        fats = food.get('fats_g', 0)
-                        cals = food.get('calories', 0)
-                        
-                        info_text = f"{name} ({brand})\nP: {protein:.1f}g | C: {carbs:.1f}g | F: {fats:.1f}g | Cals: {cals:.0f}"
-                        
-                        info_label = ctk.CTkLabel(
-                            result_frame,
-                            text=info_text,
-                            font=self.fonts['small'],
-                            text_color=self.colors['text'],
-                            justify="left"
-                        )
-                        info_label.pack(side="left", padx=10, pady=5)
-                        
-                        def add_food(f=food):
-                            # Create popup for serving size
-                            popup = ctk.CTkToplevel(self)
-                            popup.title("Add Food")
-                            popup.geometry("400x300")
-                            popup.configure(fg_color=self.colors['bg'])
-                            
-                            ctk.CTkLabel(
-                                popup,
-                                text=f"Add: {f.get('description', 'Unknown')}",
-                                font=self.fonts['heading'],
-                                text_color=self.colors['text']
-                            ).pack(pady=20)
-                            
-                            # Meal type
-                            ctk.CTkLabel(
-                                popup,
-                                text="Meal Type:",
-                                font=self.fonts['body'],
-                                text_color=self.colors['text']
-                            ).pack(pady=5)
-                            
-                            meal_var = ctk.StringVar(value="Breakfast")
-                            meal_menu = ctk.CTkOptionMenu(
-                                popup,
-                                values=["Breakfast", "Lunch", "Dinner", "Snack"],
-                                variable=meal_var,
-                                fg_color=self.colors['pink'],
-                                button_color=self.colors['pink_dark']
-                            )
-                            meal_menu.pack(pady=5)
-                            
-                            # Serving size
-                            ctk.CTkLabel(
-                                popup,
-                                text="Serving Size (g):",
-                                font=self.fonts['body'],
-                                text_color=self.colors['text']
-                            ).pack(pady=5)
-                            
-                            serving_entry = ctk.CTkEntry(popup, fg_color="white")
-                            serving_entry.insert(0, str(f.get('serving_size', 100)))
-                            serving_entry.pack(pady=5)
-                            
-                            def save_food():
-                                try:
-                                    serving = float(serving_entry.get())
-                                    
-                                    # Calculate macros for this serving
-                                    calculated = api.calculate_macros_for_serving(f, serving)
-                                    
-                                    # Create meal
-                                    meal = Meal(
-                                        nutrition_log_id=nutrition_log.id,
-                                        meal_type=meal_var.get(),
-                                        food_name=f.get('description', 'Unknown'),
-                                        serving_size=f"{serving}g",
-                                        protein_g=calculated['protein_g'],
-                                        carbs_g=calculated['carbs_g'],
-                                        fats_g=calculated['fats_g'],
-                                        calories=calculated['calories']
-                                    )
-                                    self.session.add(meal)
-                                    
-                                    # Update nutrition log totals
-                                    nutrition_log.total_protein_g += calculated['protein_g']
-                                    nutrition_log.total_carbs_g += calculated['carbs_g']
-                                    nutrition_log.total_fats_g += calculated['fats_g']
-                                    nutrition_log.total_calories += calculated['calories']
-                                    
-                                    self.session.commit()
-                                    
-                                    # Update display
-                                    update_macro_display()
-                                    update_meals_display()
-                                    
-                                    popup.destroy()
-                                    
-                                except ValueError:
-                                    error = ctk.CTkLabel(
-                                        popup,
-                                        text="Please enter a valid number!",
-                                        text_color="red"
-                                    )
-                                    error.pack(pady=5)
-                            
-                            ctk.CTkButton(
-                                popup,
-                                text="Add to Log",
-                                command=save_food,
-                                fg_color=self.colors['pink_dark'],
-                                hover_color=self.colors['pink'],
-                                font=self.fonts['body']
-                            ).pack(pady=20)
-                        
-                        add_btn = ctk.CTkButton(
-                            result_frame,
-                            text="Add",
-                            command=add_food,
-                            width=60,
-                            fg_color=self.colors['pink_dark'],
-                            hover_color=self.colors['pink'],
-                            font=self.fonts['small']
-                        )
-                        add_btn.pack(side="right", padx=5)
-                        
-            except Exception as e:
-                loading.destroy()
-                ctk.CTkLabel(
-                    results_frame,
-                    text=f"Error: {str(e)}",
-                    font=self.fonts['small'],
-                    text_color="red"
-                ).pack(pady=10)
+            typeahead.cancel_pending()
+            
+            def show_results(results):
+                typeahead.remember(query, results)
+                show_food_results(query, results)
+            
+            # Run the request on a worker thread so the window stays responsive
+            self.tasks.submit(
+                fetch_foods,
+                query,
+                key='food_search',
+                on_success=show_results,
+                on_error=show_food_error
+            )
+        
+        # Live suggestions while typing
+        typeahead = TypeAheadSearch(
+            search_entry,
+            self.tasks,
+            fetch=fetch_foods,
+            on_results=show_food_results,
+            on_error=show_food_error,
+            key='food_search',
+            text_fields=('description', 'brand')
+        )
+        search_entry.bind("<Return>", lambda event: search_foods())
         
         search_btn = ctk.CTkButton(
             search_controls,
@@ -1217,79 +1548,93 @@ class FitnessTrackerApp(ctk.CTk):
             text_color=self.colors['text']
         ).pack(pady=10)
         
-        meals_display = ctk.CTkScrollableFrame(meals_frame, fg_color="white", height=200)
-        meals_display.pack(fill="both", expand=True, padx=20, pady=10)
+        def delete_meal(meal):
+            with session_scope(self.Session) as session:
+                session.add(nutrition_log)
+                session.delete(meal)
+                recompute_log_totals(session, nutrition_log)
+            
+            update_macro_display()
+            meals_list.reload(keep_position=True)
+        
+        def create_meal_row(parent):
+            """Create one reusable meal row"""
+            row = ctk.CTkFrame(parent, fg_color=self.colors['pink'])
+            row.info_label = ctk.CTkLabel(
+                row,
+                text="",
+                font=self.fonts['small'],
+                text_color=self.colors['text'],
+                justify="left"
+            )
+            row.info_label.pack(side="left", padx=10, pady=5)
+            
+            row.delete_btn = ctk.CTkButton(
+                row,
+                text="Remove",
+                width=70,
+                fg_color="red",
+                hover_color="#CC0000",
+                font=self.fonts['small']
+            )
+            row.delete_btn.pack(side="right", padx=5)
+            return row
+        
+        def bind_meal_row(row, meal):
+            """Point a meal row at a different meal"""
+            meal_info = f"{meal.meal_type}: {meal.food_name} ({meal.serving_size})\n"
+            meal_info += f"P: {meal.protein_g:.1f}g | C: {meal.carbs_g:.1f}g | F: {meal.fats_g:.1f}g | Cals: {meal.calories:.0f}"
+            row.info_label.configure(text=meal_info)
+            row.delete_btn.configure(command=lambda: delete_meal(meal))
+        
+        def fetch_meals(cursor, limit):
+            """Load one page of today's meals in its own session"""
+            with session_scope(self.Session) as session:
+                return meals_page(session, nutrition_log.id, after=cursor, limit=limit)
+        
+        # Only the visible rows exist; they are reused as the list scrolls
+        meals_list = VirtualList(
+            meals_frame,
+            fetch_page=fetch_meals,
+            create_row=create_meal_row,
+            bind_row=bind_meal_row,
+            cursor_for=meal_cursor,
+            visible_rows=4,
+            row_height=50,
+            empty_text="No meals logged yet. Search and add foods above!",
+            font=self.fonts['body'],
+            text_color=self.colors['text'],
+            fg_color="white"
+        )
+        meals_list.pack(fill="both", expand=True, padx=20, pady=10)
         
         def update_meals_display():
             """Update the display of today's meals"""
-            for widget in meals_display.winfo_children():
-                widget.destroy()
-            
-            # Get all meals for today
-            meals = self.session.query(Meal).filter_by(nutrition_log_id=nutrition_log.id).all()
-            
-            if not meals:
-                ctk.CTkLabel(
-                    meals_display,
-                    text="No meals logged yet. Search and add foods above!",
-                    font=self.fonts['body'],
-                    text_color=self.colors['text']
-                ).pack(pady=20)
-            else:
-                for meal in meals:
-                    meal_frame = ctk.CTkFrame(meals_display, fg_color=self.colors['pink'])
-                    meal_frame.pack(fill="x", pady=5, padx=5)
-                    
-                    meal_info = f"{meal.meal_type}: {meal.food_name} ({meal.serving_size})\n"
-                    meal_info += f"P: {meal.protein_g:.1f}g | C: {meal.carbs_g:.1f}g | F: {meal.fats_g:.1f}g | Cals: {meal.calories:.0f}"
-                    
-                    ctk.CTkLabel(
-                        meal_frame,
-                        text=meal_info,
-                        font=self.fonts['small'],
-                        text_color=self.colors['text'],
-                        justify="left"
-                    ).pack(side="left", padx=10, pady=5)
-                    
-                    def delete_meal(m=meal):
-                        # Update totals
-                        nutrition_log.total_protein_g -= m.protein_g
-                        nutrition_log.total_carbs_g -= m.carbs_g
-                        nutrition_log.total_fats_g -= m.fats_g
-                        nutrition_log.total_calories -= m.calories
-                        
-                        self.session.delete(m)
-                        self.session.commit()
-                        
-                        update_macro_display()
-                        update_meals_display()
-                    
-                    delete_btn = ctk.CTkButton(
-                        meal_frame,
-                        text="Remove",
-                        command=delete_meal,
-                        width=70,
-                        fg_color="red",
-                        hover_color="#CC0000",
-                        font=self.fonts['small']
-                    )
-                    delete_btn.pack(side="right", padx=5)
+            meals_list.reload()
+        
+        def refresh():
+            """Reload today's totals and meals"""
+            load_today_log()
+            update_macro_display()
+            update_meals_display()
         
         # Initialize displays
-        update_macro_display()
-        update_meals_display()
+        refresh()
+        return refresh
     
-    def show_progress(self):
-        """Show progress tracking view"""
-        self.clear_main_frame()
-        
+    def build_progress(self, parent):
+        """Build the progress tracking view and return its refresh function"""
         from database.models import ProgressEntry
+        from database.queries import progress_page, progress_cursor, progress_summary
+        from utils.analytics import get_analytics
+        from utils.photos import THUMBNAIL_SIZES, get_thumbnail_cache, store_photo
+        from utils.visualizations import data_version, get_chart_cache, render_weight_chart, weight_chart_series
         from datetime import date, timedelta
-        import plotly.graph_objects as go
-        from plotly.subplots import make_subplots
+        from tkinter import filedialog
+        from PIL import Image
         
         title = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Progress Tracker",
             font=self.fonts['title'],
             text_color=self.colors['text']
@@ -1297,7 +1642,7 @@ class FitnessTrackerApp(ctk.CTk):
         title.pack(pady=20)
         
         # Create scrollable frame
-        scroll_frame = ctk.CTkScrollableFrame(self.main_frame, fg_color=self.colors['bg'])
+        scroll_frame = ctk.CTkScrollableFrame(parent, fg_color=self.colors['bg'])
         scroll_frame.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Current stats section
@@ -1311,18 +1656,10 @@ class FitnessTrackerApp(ctk.CTk):
             text_color=self.colors['text']
         ).pack(pady=10)
         
-        # Get latest progress entry
-        latest_entry = self.session.query(ProgressEntry).filter_by(
-            user_id=self.user.id
-        ).order_by(ProgressEntry.date.desc()).first()
-        
         # Display current weight
         stats_grid = ctk.CTkFrame(stats_frame, fg_color=self.colors['pink'])
         stats_grid.pack(pady=10, padx=20)
         
-        current_weight_lbs = self.user.current_weight_kg / 0.453592 if self.user.current_weight_kg else 0
-        target_weight_lbs = self.user.target_weight_kg / 0.453592 if self.user.target_weight_kg else 0
-        
         # Current weight box
         current_box = ctk.CTkFrame(stats_grid, fg_color="white")
         current_box.grid(row=0, column=0, padx=10, pady=10)
@@ -1332,12 +1669,13 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['body'],
             text_color=self.colors['text']
         ).pack(pady=5, padx=20)
-        ctk.CTkLabel(
+        current_label = ctk.CTkLabel(
             current_box,
-            text=f"{current_weight_lbs:.1f} lbs",
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5, padx=20)
+        )
+        current_label.pack(pady=5, padx=20)
         
         # Target weight box
         target_box = ctk.CTkFrame(stats_grid, fg_color="white")
@@ -1348,15 +1686,15 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['body'],
             text_color=self.colors['text']
         ).pack(pady=5, padx=20)
-        ctk.CTkLabel(
+        target_label = ctk.CTkLabel(
             target_box,
-            text=f"{target_weight_lbs:.1f} lbs",
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5, padx=20)
+        )
+        target_label.pack(pady=5, padx=20)
         
         # Progress box
-        remaining = current_weight_lbs - target_weight_lbs
         progress_box = ctk.CTkFrame(stats_grid, fg_color="white")
         progress_box.grid(row=0, column=2, padx=10, pady=10)
         ctk.CTkLabel(
@@ -1365,12 +1703,23 @@ class FitnessTrackerApp(ctk.CTk):
             font=self.fonts['body'],
             text_color=self.colors['text']
         ).pack(pady=5, padx=20)
-        ctk.CTkLabel(
+        remaining_label = ctk.CTkLabel(
             progress_box,
-            text=f"{remaining:.1f} lbs",
+            text="",
             font=self.fonts['heading'],
             text_color=self.colors['text']
-        ).pack(pady=5, padx=20)
+        )
+        remaining_label.pack(pady=5, padx=20)
+        
+        def update_stats():
+            """Update the current stats from the user's profile"""
+            current_weight_lbs = self.user.current_weight_kg / 0.453592 if self.user.current_weight_kg else 0
+            target_weight_lbs = self.user.target_weight_kg / 0.453592 if self.user.target_weight_kg else 0
+            remaining = current_weight_lbs - target_weight_lbs
+            
+            current_label.configure(text=f"{current_weight_lbs:.1f} lbs")
+            target_label.configure(text=f"{target_weight_lbs:.1f} lbs")
+            remaining_label.configure(text=f"{remaining:.1f} lbs")
         
         # Log new entry section
         log_frame = ctk.CTkFrame(scroll_frame, fg_color="white")
@@ -1427,6 +1776,45 @@ class FitnessTrackerApp(ctk.CTk):
         notes_entry = ctk.CTkTextbox(inputs_frame, width=200, height=60, fg_color=self.colors['bg'])
         notes_entry.grid(row=3, column=1, padx=10, pady=5)
         
+        # Progress photo (optional); copied into the app's folder on save
+        chosen_photo = {'path': None}
+        photo_name_label = ctk.CTkLabel(
+            inputs_frame,
+            text="",
+            font=self.fonts['small'],
+            text_color=self.colors['text']
+        )
+        photo_name_label.grid(row=4, column=1, padx=10, pady=5, sticky="w")
+        
+        def choose_photo():
+            path = filedialog.askopenfilename(
+                title="Choose a progress photo",
+                filetypes=[("Photos", "*.jpg *.jpeg *.png *.heic *.webp"), ("All files", "*.*")]
+            )
+            if path:
+                chosen_photo['path'] = path
+                photo_name_label.configure(text=os.path.basename(path))
+        
+        ctk.CTkButton(
+            inputs_frame,
+            text="Add Photo",
+            command=choose_photo,
+            width=100,
+            fg_color=self.colors['pink'],
+            hover_color=self.colors['pink_dark'],
+            text_color=self.colors['text'],
+            font=self.fonts['small']
+        ).grid(row=4, column=0, padx=10, pady=5, sticky="e")
+        
+        # One status line below the save button, reused on every save since
+        # this view is kept for the life of the app
+        status_label = ctk.CTkLabel(log_frame, text="", font=self.fonts['body'])
+        
+        def show_status(text, color):
+            status_label.configure(text=text, text_color=color)
+            if not status_label.winfo_ismapped():
+                status_label.pack(pady=10)
+        
         def save_progress():
             try:
                 weight_lbs = float(weight_entry.get())
@@ -1438,6 +1826,14 @@ class FitnessTrackerApp(ctk.CTk):
                 
                 bf = float(bf_entry.get()) if bf_entry.get() else None
                 
+                photo_path = None
+                if chosen_photo['path']:
+                    try:
+                        photo_path = store_photo(chosen_photo['path'])
+                    except OSError as e:
+                        show_status(f"Couldn't add the photo: {e}", "red")
+                        return
+                
                 # Create progress entry
                 entry = ProgressEntry(
                     user_id=self.user.id,
@@ -1445,42 +1841,36 @@ class FitnessTrackerApp(ctk.CTk):
                     weight_kg=weight_kg,
                     body_fat_percentage=bf,
                     waist_cm=waist_cm,
+                    photo_path=photo_path,
                     notes=notes_entry.get("1.0", "end-1c") if notes_entry.get("1.0", "end-1c") else None
                 )
                 
-                self.session.add(entry)
-                
-                # Update user's current weight
-                self.user.current_weight_kg = weight_kg
-                
-                self.session.commit()
+                with session_scope(self.Session) as session:
+                    session.add(entry)
+                    
+                    # Update user's current weight
+                    session.add(self.user)
+                    self.user.current_weight_kg = weight_kg
                 
-                # Success message
-                success = ctk.CTkLabel(
-                    log_frame,
-                    text="Progress logged successfully!",
-                    font=self.fonts['body'],
-                    text_color="green"
-                )
-                success.pack(pady=10)
+                show_status("Progress logged successfully!", "green")
                 
                 # Clear entries
                 weight_entry.delete(0, 'end')
                 bf_entry.delete(0, 'end')
                 waist_entry.delete(0, 'end')
                 notes_entry.delete("1.0", "end")
+                chosen_photo['path'] = None
+                photo_name_label.configure(text="")
+                
+                # Make the thumbnails now, in the background, so the history shows them straight away
+                if photo_path:
+                    self.tasks.submit(get_thumbnail_cache().generate, photo_path)
                 
                 # Refresh the view
-                self.show_progress()
+                refresh()
                 
             except ValueError:
-                error = ctk.CTkLabel(
-                    log_frame,
-                    text="Please enter a valid weight!",
-                    font=self.fonts['body'],
-                    text_color="red"
-                )
-                error.pack(pady=10)
+                show_status("Please enter a valid weight!", "red")
         
         save_btn = ctk.CTkButton(
             log_frame,
@@ -1503,31 +1893,230 @@ class FitnessTrackerApp(ctk.CTk):
             text_color=self.colors['text']
         ).pack(pady=10)
         
-        # Get all progress entries
-        entries = self.session.query(ProgressEntry).filter_by(
-            user_id=self.user.id
-        ).order_by(ProgressEntry.date.desc()).all()
+        # Weight trend summary
+        chart_info = ctk.CTkFrame(history_frame, fg_color="white")
+        
+        count_label = ctk.CTkLabel(
+            chart_info,
+            text="",
+            font=self.fonts['body'],
+            text_color=self.colors['text']
+        )
+        count_label.pack(pady=10)
+        
+        trend_label = ctk.CTkLabel(
+            chart_info,
+            text="",
+            font=self.fonts['body'],
+            text_color=self.colors['text']
+        )
+        
+        analytics_label = ctk.CTkLabel(
+            chart_info,
+            text="",
+            font=self.fonts['small'],
+            text_color=self.colors['text'],
+            justify="left"
+        )
+        
+        # Weight chart, drawn on a worker thread and cached by data version
+        chart_width, chart_height = 800, 300
+        chart_label = ctk.CTkLabel(chart_info, text="")
+        
+        def load_chart(user_id):
+            """Load the weight series and render it; runs on a worker thread"""
+            with session_scope(self.Session) as session:
+                series = weight_chart_series(get_analytics().get(session, user_id))
+            if series is None or len(series[1]) < 2:
+                return None
+            key = data_version(*series, size=(chart_width, chart_height))
+            return get_chart_cache().render(key, render_weight_chart, series, chart_width, chart_height)
+        
+        def show_chart(image):
+            if image is None:
+                chart_label.pack_forget()
+                return
+            chart_label.chart_image = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+            chart_label.configure(image=chart_label.chart_image, text="")
+            chart_label.pack(pady=(0, 10), padx=10)
+        
+        def update_chart():
+            """Show the weight chart; it is only redrawn if the data changed"""
+            if getattr(chart_label, 'chart_image', None) is None:
+                chart_label.configure(text="Drawing chart...")
+                chart_label.pack(pady=(0, 10), padx=10)
+            self.tasks.submit(
+                load_chart,
+                self.user.id,
+                key='progress_chart',
+                on_success=show_chart,
+                on_error=lambda e: chart_label.configure(text=f"Couldn't draw chart: {e}")
+            )
         
-        if entries:
-            # Create weight trend chart
-            dates = [entry.date for entry in reversed(entries)]
-            weights_lbs = [entry.weight_kg / 0.453592 for entry in reversed(entries)]
+        def delete_entry(entry):
+            with session_scope(self.Session) as session:
+                session.delete(entry)
+            update_summary()
+            history_list.reload(keep_position=True)
+        
+        # Rows show a blank image until their photo's thumbnail has loaded
+        thumb_size = THUMBNAIL_SIZES['row']
+        blank_thumb = ctk.CTkImage(light_image=Image.new('RGBA', thumb_size, (0, 0, 0, 0)), size=thumb_size)
+        
+        def show_thumbnail(row, entry_id, image):
+            # The row may have scrolled to another entry while this loaded
+            if row.entry is None or row.entry.id != entry_id:
+                return
+            row.thumb = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+            row.photo_label.configure(image=row.thumb)
+        
+        def load_comparison(entry):
+            """The earliest photo and this one at full thumbnail size; runs on a worker thread"""
+            with session_scope(self.Session) as session:
+                first = session.query(ProgressEntry).filter(
+                    ProgressEntry.user_id == entry.user_id,
+                    ProgressEntry.photo_path.isnot(None)
+                ).order_by(ProgressEntry.date, ProgressEntry.id).first()
+            cache = get_thumbnail_cache()
+            pairs = [(first, cache.get(first.photo_path, 'large'))] if first and first.id != entry.id else []
+            pairs.append((entry, cache.get(entry.photo_path, 'large')))
+            return pairs
+        
+        # Shown above the history when a clicked photo can't be opened
+        photo_error_label = ctk.CTkLabel(history_frame, text="", font=self.fonts['body'], text_color="red")
+        
+        def show_photo_error(error):
+            if isinstance(error, FileNotFoundError):
+                text = f"Photo file is missing: {error.filename}"
+            else:
+                text = f"Couldn't open progress photo: {error}"
+            photo_error_label.configure(text=text)
+            photo_error_label.pack(pady=(0, 5), before=history_list)
+        
+        def show_comparison(pairs):
+            popup = ctk.CTkToplevel(self)
+            popup.title("Progress Photos")
+            popup.configure(fg_color=self.colors['bg'])
             
-            # Chart frame
-            chart_info = ctk.CTkFrame(history_frame, fg_color="white")
-            chart_info.pack(fill="x", pady=10, padx=20)
+            for column, (shown, image) in enumerate(pairs):
+                photo = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+                label = ctk.CTkLabel(popup, image=photo, text="")
+                label.photo = photo
+                label.grid(row=0, column=column, padx=10, pady=(20, 5))
+                ctk.CTkLabel(
+                    popup,
+                    text=f"{shown.date.strftime('%m/%d/%Y')} - {shown.weight_kg / 0.453592:.1f} lbs",
+                    font=self.fonts['body'],
+                    text_color=self.colors['text']
+                ).grid(row=1, column=column, padx=10, pady=(0, 20))
+        
+        def open_photo(row):
+            if row.entry is not None and row.entry.photo_path:
+                photo_error_label.pack_forget()
+                self.tasks.submit(
+                    load_comparison,
+                    row.entry,
+                    key='progress_photos',
+                    on_success=show_comparison,
+                    on_error=show_photo_error
+                )
+        
+        def create_entry_row(parent):
+            """Create one reusable history row"""
+            row = ctk.CTkFrame(parent, fg_color=self.colors['pink'])
+            row.entry = None
+            row.photo_label = ctk.CTkLabel(row, image=blank_thumb, text="", width=thumb_size[0])
+            row.photo_label.pack(side="left", padx=(5, 0), pady=4)
+            row.photo_label.bind("<Button-1>", lambda event: open_photo(row))
             
-            ctk.CTkLabel(
-                chart_info,
-                text=f"Weight Trend - {len(entries)} entries logged",
-                font=self.fonts['body'],
-                text_color=self.colors['text']
-            ).pack(pady=10)
+            row.info_label = ctk.CTkLabel(
+                row,
+                text="",
+                font=self.fonts['small'],
+                text_color=self.colors['text'],
+                justify="left"
+            )
+            row.info_label.pack(side="left", padx=10, pady=5)
+            
+            row.delete_btn = ctk.CTkButton(
+                row,
+                text="Delete",
+                width=60,
+                fg_color="red",
+                hover_color="#CC0000",
+                font=self.fonts['small']
+            )
+            row.delete_btn.pack(side="right", padx=5)
+            return row
+        
+        def bind_entry_row(row, entry):
+            """Point a history row at a different entry"""
+            weight_lbs = entry.weight_kg / 0.453592
+            entry_text = f"{entry.date.strftime('%m/%d/%Y')} - Weight: {weight_lbs:.1f} lbs"
+            
+            if entry.body_fat_percentage:
+                entry_text += f" | BF: {entry.body_fat_percentage:.1f}%"
+            if entry.waist_cm:
+                waist_in = entry.waist_cm / 2.54
+                entry_text += f" | Waist: {waist_in:.1f} in"
+            if entry.notes:
+                # Rows have a fixed height, so only the first line of notes fits
+                entry_text += f"\n{entry.notes.splitlines()[0][:80]}"
+            
+            row.info_label.configure(text=entry_text)
+            row.delete_btn.configure(command=lambda: delete_entry(entry))
+            
+            # Only rows on screen load a thumbnail; a newer request for the same row replaces this one
+            row.entry = entry
+            row.photo_label.configure(image=blank_thumb, cursor="hand2" if entry.photo_path else "")
+            if entry.photo_path:
+                self.tasks.submit(
+                    get_thumbnail_cache().get,
+                    entry.photo_path,
+                    'row',
+                    key=f'progress_thumb_{id(row)}',
+                    on_success=lambda image: show_thumbnail(row, entry.id, image),
+                    on_error=lambda e: None
+                )
+        
+        def fetch_entries(cursor, limit):
+            """Load one page of history in its own session"""
+            with session_scope(self.Session) as session:
+                return progress_page(session, self.user.id, before=cursor, limit=limit)
+        
+        # Pages through the whole history without loading it all
+        history_list = VirtualList(
+            history_frame,
+            fetch_page=fetch_entries,
+            create_row=create_entry_row,
+            bind_row=bind_entry_row,
+            cursor_for=progress_cursor,
+            visible_rows=5,
+            row_height=56,
+            empty_text="No progress entries yet. Log your first one above!",
+            font=self.fonts['body'],
+            text_color=self.colors['text'],
+            fg_color="white"
+        )
+        history_list.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        def update_summary():
+            """Update the entry count and total change"""
+            with session_scope(self.Session) as session:
+                summary = progress_summary(session, self.user.id)
+                # Smoothed trend and rates, cached until entries change
+                trends = get_analytics().summary(session, self.user.id)
+            if not summary['count']:
+                chart_info.pack_forget()
+                return
+            
+            chart_info.pack(fill="x", pady=10, padx=20, before=history_list)
+            count_label.configure(text=f"Weight Trend - {summary['count']} entries logged")
             
             # Show simple trend info
-            if len(entries) >= 2:
-                first_weight = entries[-1].weight_kg / 0.453592
-                latest_weight = entries[0].weight_kg / 0.453592
+            if summary['count'] >= 2:
+                first_weight = summary['first_weight_kg'] / 0.453592
+                latest_weight = summary['latest_weight_kg'] / 0.453592
                 change = latest_weight - first_weight
                 
                 trend_text = f"Total change: {change:+.1f} lbs"
@@ -1536,70 +2125,321 @@ class FitnessTrackerApp(ctk.CTk):
                 elif change > 0:
                     trend_text += " (Gained weight)"
                 
-                ctk.CTkLabel(
-                    chart_info,
-                    text=trend_text,
-                    font=self.fonts['body'],
-                    text_color=self.colors['text']
-                ).pack(pady=5)
+                trend_label.configure(text=trend_text)
+                trend_label.pack(pady=5)
+            else:
+                trend_label.pack_forget()
             
-            # Show recent entries
-            history_display = ctk.CTkScrollableFrame(history_frame, fg_color="white", height=200)
-            history_display.pack(fill="both", expand=True, padx=20, pady=10)
+            if trends:
+                parts = [f"Trend weight: {trends['trend_kg'] / 0.453592:.1f} lbs"]
+                if trends['mean_7d_kg'] is not None:
+                    parts.append(f"7-day average: {trends['mean_7d_kg'] / 0.453592:.1f} lbs")
+                if trends['weekly_rate_kg'] is not None:
+                    parts.append(f"Rate: {trends['weekly_rate_kg'] / 0.453592:+.2f} lbs/week")
+                if trends['lean_mass_kg'] is not None:
+                    parts.append(f"Lean mass: {trends['lean_mass_kg'] / 0.453592:.1f} lbs")
+                analytics_label.configure(text=" | ".join(parts))
+                analytics_label.pack(pady=(0, 10))
+            else:
+                analytics_label.pack_forget()
             
-            for entry in entries[:10]:  # Show last 10 entries
-                entry_frame = ctk.CTkFrame(history_display, fg_color=self.colors['pink'])
-                entry_frame.pack(fill="x", pady=5, padx=5)
-                
-                weight_lbs = entry.weight_kg / 0.453592
-                entry_text = f"{entry.date.strftime('%m/%d/%Y')} - Weight: {weight_lbs:.1f} lbs"
-                
-                if entry.body_fat_percentage:
-                    entry_text += f" | BF: {entry.body_fat_percentage:.1f}%"
-                if entry.waist_cm:
-                    waist_in = entry.waist_cm / 2.54
-                    entry_text += f" | Waist: {waist_in:.1f} in"
-                if entry.notes:
-                    entry_text += f"\n{entry.notes}"
-                
-                ctk.CTkLabel(
-                    entry_frame,
-                    text=entry_text,
-                    font=self.fonts['small'],
-                    text_color=self.colors['text'],
-                    justify="left"
-                ).pack(side="left", padx=10, pady=5)
-                
-                def delete_entry(e=entry):
-                    self.session.delete(e)
-                    self.session.commit()
-                    self.show_progress()
-                
-                delete_btn = ctk.CTkButton(
-                    entry_frame,
-                    text="Delete",
-                    command=delete_entry,
-                    width=60,
-                    fg_color="red",
-                    hover_color="#CC0000",
-                    font=self.fonts['small']
-                )
-                delete_btn.pack(side="right", padx=5)
-        else:
-            ctk.CTkLabel(
-                history_frame,
-                text="No progress entries yet. Log your first one above!",
-                font=self.fonts['body'],
-                text_color=self.colors['text']
-            ).pack(pady=20)
+            update_chart()
+        
+        def update_history():
+            """Update the weight trend and recent entries"""
+            update_summary()
+            history_list.reload()
+        
+        def refresh():
+            """Reload the stats and history"""
+            update_stats()
+            update_history()
+        
+        refresh()
+        return refresh
+    
+    def show_export(self):
+        """Popup to export this user's data to CSV or Parquet files"""
+        from tkinter import filedialog
+        from utils.export import export_data, parquet_available
+        import threading
+        
+        if self.export_cancel is not None:
+            # An export is already running; its popup is still open
+            return
+        
+        popup = ctk.CTkToplevel(self)
+        popup.title("Export Data")
+        popup.geometry("420x320")
+        popup.configure(fg_color=self.colors['bg'])
+        
+        ctk.CTkLabel(
+            popup,
+            text="Export Your Data",
+            font=self.fonts['heading'],
+            text_color=self.colors['text']
+        ).pack(pady=20)
+        
+        # Parquet is only offered when pyarrow is installed
+        formats = ["CSV", "Parquet"] if parquet_available() else ["CSV"]
+        format_var = ctk.StringVar(value="CSV")
+        ctk.CTkOptionMenu(
+            popup,
+            values=formats,
+            variable=format_var,
+            fg_color=self.colors['pink'],
+            button_color=self.colors['pink_dark'],
+            text_color=self.colors['text']
+        ).pack(pady=5)
+        
+        progress_bar = ctk.CTkProgressBar(popup, progress_color=self.colors['pink_dark'])
+        progress_bar.set(0)
+        progress_bar.pack(pady=15, padx=30, fill="x")
+        
+        status_label = ctk.CTkLabel(
+            popup,
+            text="One file per table is written to the folder you choose.",
+            font=self.fonts['small'],
+            text_color=self.colors['text'],
+            wraplength=360
+        )
+        status_label.pack(pady=5)
+        
+        # The export reports progress from its worker thread; the UI reads
+        # the latest values from here on its own schedule
+        state = {'table': None, 'done': 0, 'total': 0, 'running': False}
+        
+        def report(table, done, total):
+            state.update(table=table, done=done, total=total)
+        
+        def poll():
+            if not state['running'] or not popup.winfo_exists():
+                return
+            if state['table']:
+                progress_bar.set(state['done'] / state['total'] if state['total'] else 1)
+                status_label.configure(text=f"{state['table'].replace('_', ' ')}: {state['done']:,} / {state['total']:,} rows")
+            popup.after(200, poll)
+        
+        def finished(written):
+            state['running'] = False
+            cancelled = self.export_cancel.is_set()
+            self.export_cancel = None
+            if not popup.winfo_exists():
+                return
+            progress_bar.set(0 if cancelled else 1)
+            if cancelled:
+                status_label.configure(text="Export cancelled.")
+            else:
+                rows = sum(written.values())
+                status_label.configure(text=f"Exported {rows:,} rows to {len(written)} files.")
+            export_btn.configure(state="normal")
+            cancel_btn.configure(state="disabled")
+        
+        def failed(error):
+            state['running'] = False
+            self.export_cancel = None
+            if not popup.winfo_exists():
+                return
+            status_label.configure(text=f"Export failed: {error}", text_color="red")
+            export_btn.configure(state="normal")
+            cancel_btn.configure(state="disabled")
+        
+        def start_export():
+            folder = filedialog.askdirectory(parent=popup, title="Choose a folder for the export")
+            if not folder:
+                return
+            
+            self.export_cancel = threading.Event()
+            state.update(table=None, done=0, total=0, running=True)
+            status_label.configure(text="Starting export...", text_color=self.colors['text'])
+            export_btn.configure(state="disabled")
+            cancel_btn.configure(state="normal")
+            
+            self.tasks.submit(
+                export_data,
+                self.engine,
+                folder,
+                fmt=format_var.get().lower(),
+                user_id=self.user.id,
+                progress=report,
+                cancel=self.export_cancel,
+                key='export',
+                on_success=finished,
+                on_error=failed
+            )
+            poll()
+        
+        def cancel_export():
+            if self.export_cancel is not None:
+                self.export_cancel.set()
+                status_label.configure(text="Cancelling...")
+        
+        def close():
+            cancel_export()
+            popup.destroy()
+        
+        buttons = ctk.CTkFrame(popup, fg_color="transparent")
+        buttons.pack(pady=20)
+        
+        export_btn = ctk.CTkButton(
+            buttons,
+            text="Choose Folder & Export",
+            command=start_export,
+            fg_color=self.colors['pink_dark'],
+            hover_color=self.colors['pink'],
+            font=self.fonts['body']
+        )
+        export_btn.pack(side="left", padx=5)
+        
+        cancel_btn = ctk.CTkButton(
+            buttons,
+            text="Cancel",
+            command=cancel_export,
+            state="disabled",
+            fg_color="white",
+            text_color=self.colors['text'],
+            hover_color=self.colors['pink'],
+            font=self.fonts['body']
+        )
+        cancel_btn.pack(side="left", padx=5)
+        
+        popup.protocol("WM_DELETE_WINDOW", close)
+    
+    def show_import(self):
+        """Popup to import history from Strong, MyFitnessPal or a CSV file"""
+        from tkinter import filedialog
+        from utils.analytics import get_analytics
+        from utils.importers import import_file
+        from utils.tdee import get_tdee
+        
+        popup = ctk.CTkToplevel(self)
+        popup.title("Import Data")
+        popup.geometry("440x340")
+        popup.configure(fg_color=self.colors['bg'])
+        
+        ctk.CTkLabel(
+            popup,
+            text="Import Your History",
+            font=self.fonts['heading'],
+            text_color=self.colors['text']
+        ).pack(pady=20)
+        
+        ctk.CTkLabel(
+            popup,
+            text="Strong and MyFitnessPal exports are recognised automatically. "
+                 "Other CSVs need a date column and exercise, food or weight columns.",
+            font=self.fonts['small'],
+            text_color=self.colors['text'],
+            wraplength=380
+        ).pack(pady=5)
+        
+        ctk.CTkLabel(
+            popup,
+            text="Weights in the file are in:",
+            font=self.fonts['body'],
+            text_color=self.colors['text']
+        ).pack(pady=5)
+        
+        unit_var = ctk.StringVar(value="kg")
+        ctk.CTkOptionMenu(
+            popup,
+            values=["kg", "lb"],
+            variable=unit_var,
+            fg_color=self.colors['pink'],
+            button_color=self.colors['pink_dark'],
+            text_color=self.colors['text']
+        ).pack(pady=5)
+        
+        status_label = ctk.CTkLabel(
+            popup,
+            text="",
+            font=self.fonts['small'],
+            text_color=self.colors['text'],
+            wraplength=380
+        )
+        status_label.pack(pady=5)
+        
+        def finished(summary):
+            # Cached trends and estimates were computed without the new history
+            get_analytics().invalidate(self.user.id)
+            get_tdee().invalidate(self.user.id)
+            self.views.refresh()
+            
+            if not popup.winfo_exists():
+                return
+            added = sum(summary['added'].values())
+            text = f"Imported {added:,} entries from {summary['rows']:,} rows."
+            if summary['duplicates']:
+                text += f" {summary['duplicates']:,} were already logged."
+            if summary['skipped']:
+                line, reason = summary['errors'][0]
+                text += f" {summary['skipped']:,} rows skipped (line {line}: {reason})."
+            status_label.configure(text=text, text_color=self.colors['text'])
+            import_btn.configure(state="normal")
+        
+        def failed(error):
+            if not popup.winfo_exists():
+                return
+            status_label.configure(text=f"Import failed: {error}", text_color="red")
+            import_btn.configure(state="normal")
+        
+        def start_import():
+            path = filedialog.askopenfilename(
+                parent=popup,
+                title="Choose an export to import",
+                filetypes=[("CSV files", "*.csv *.txt"), ("All files", "*.*")]
+            )
+            if not path:
+                return
+            
+            status_label.configure(text="Importing...", text_color=self.colors['text'])
+            import_btn.configure(state="disabled")
+            self.tasks.submit(
+                import_file,
+                self.engine,
+                path,
+                self.user.id,
+                weight_unit=unit_var.get(),
+                key='import',
+                on_success=finished,
+                on_error=failed
+            )
+        
+        import_btn = ctk.CTkButton(
+            popup,
+            text="Choose File & Import",
+            command=start_import,
+            fg_color=self.colors['pink_dark'],
+            hover_color=self.colors['pink'],
+            font=self.fonts['body']
+        )
+        import_btn.pack(pady=20)
     
     def on_closing(self):
         """Handle window closing"""
-        self.session.close()
+        if self.export_cancel is not None:
+            self.export_cancel.set()
+        self.tasks.shutdown()
+        if is_loaded('utils.photos'):
+            from utils.photos import get_thumbnail_cache
+            get_thumbnail_cache().shutdown()
+        self.engine.dispose()
         self.destroy()
 
 
 if __name__ == "__main__":
+    if startup_profiler:
+        startup_profiler.mark("imports")
     app = FitnessTrackerApp()
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
-    app.mainloop()
+    
+    if startup_profiler:
+        # Time to first frame: build the window, draw it once, report and exit
+        startup_profiler.mark("app built")
+        app.update()
+        startup_profiler.mark("first frame")
+        startup_profiler.stop()
+        startup_profiler.report()
+        app.on_closing()
+    else:
+        app.mainloop()
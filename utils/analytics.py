@@ -0,0 +1,162 @@
+import threading
+
+from sqlalchemy import func, select
+
+from database.models import ProgressEntry
+from utils.lazy import lazy_import
+
+# Loaded on first use; the dashboard only needs IncrementalTrend at startup
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Smoothing for the trend weight: each day moves the trend 10% of the way
+# towards that day's weight, which filters out water-weight noise
+TREND_ALPHA = 0.1
+
+ROLLING_WINDOWS = (7, 14, 28)
+
+
+def load_weights(session, user_id):
+    """Load a user's weigh-ins as a daily series in one columnar query.
+    
+    Returns a DataFrame indexed by every calendar day from the first entry
+    to the last; days without a weigh-in are NaN, and several entries on
+    one day are averaged.
+    """
+    rows = session.execute(
+        select(ProgressEntry.date, ProgressEntry.weight_kg, ProgressEntry.body_fat_percentage)
+        .where(ProgressEntry.user_id == user_id, ProgressEntry.weight_kg.isnot(None))
+        .order_by(ProgressEntry.date)
+    ).all()
+    if not rows:
+        return pd.DataFrame(columns=['weight_kg', 'body_fat_pct'], index=pd.DatetimeIndex([], name='date'))
+    
+    dates, weights, body_fat = zip(*rows)
+    frame = pd.DataFrame(
+        {
+            'weight_kg': np.asarray(weights, dtype=float),
+            'body_fat_pct': np.asarray([np.nan if bf is None else bf for bf in body_fat], dtype=float),
+        },
+        index=pd.DatetimeIndex(dates, name='date')
+    )
+    return frame.groupby(level=0).mean().resample('D').mean()
+
+
+def compute_trends(daily, alpha=TREND_ALPHA):
+    """Add trend, rolling means, weekly rate and lean mass columns to a daily series"""
+    result = daily.copy()
+    weight = result['weight_kg']
+    
+    # ignore_na=False lets the trend decay across missed days by calendar time
+    result['trend_kg'] = weight.ewm(alpha=alpha, ignore_na=False).mean()
+    for window in ROLLING_WINDOWS:
+        result[f'mean_{window}d'] = weight.rolling(window, min_periods=1).mean()
+    
+    # Change in trend weight over the last 7 days, in kg per week
+    result['weekly_rate_kg'] = result['trend_kg'].diff(7)
+    
+    result['lean_mass_kg'] = weight * (1 - result['body_fat_pct'] / 100)
+    result['lean_trend_kg'] = result['lean_mass_kg'].ewm(alpha=alpha, ignore_na=False).mean()
+    return result
+
+
+class IncrementalTrend:
+    """Day-by-day version of the trend_kg column from compute_trends.
+    
+    Keeps the weighted sum and total weight of pandas' adjusted EWMA, so
+    stepping one calendar day is O(1) and gives the same value as
+    recomputing the whole series.
+    """
+    
+    def __init__(self, alpha=TREND_ALPHA):
+        self.alpha = alpha
+        self.numerator = 0.0
+        self.denominator = 0.0
+    
+    def advance(self, weight=None):
+        """Step one calendar day, with that day's weight if there was a weigh-in"""
+        decay = 1 - self.alpha
+        self.numerator *= decay
+        self.denominator *= decay
+        if weight is not None:
+            self.numerator += weight
+            self.denominator += 1
+        return self.value
+    
+    @property
+    def value(self):
+        """Current trend weight, or None before the first weigh-in"""
+        return self.numerator / self.denominator if self.denominator else None
+
+
+class TrendAnalytics:
+    """Computes weight trends and caches them until the entries change"""
+    
+    def __init__(self, alpha=TREND_ALPHA):
+        self.alpha = alpha
+        self._cache = {}  # user_id -> (watermark, frame)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def watermark(session, user_id):
+        """Return a cheap fingerprint that changes whenever the user's entries do"""
+        return tuple(session.execute(
+            select(
+                func.count(ProgressEntry.id),
+                func.max(ProgressEntry.id),
+                func.total(ProgressEntry.weight_kg),
+                func.total(ProgressEntry.body_fat_percentage)
+            ).where(ProgressEntry.user_id == user_id)
+        ).one())
+    
+    def get(self, session, user_id):
+        """Return the daily trend frame, recomputing only if entries changed"""
+        mark = self.watermark(session, user_id)
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached and cached[0] == mark:
+                return cached[1]
+        
+        frame = compute_trends(load_weights(session, user_id), self.alpha)
+        with self._lock:
+            self._cache[user_id] = (mark, frame)
+        return frame
+    
+    def summary(self, session, user_id):
+        """Return the latest trend figures, or None if nothing has been logged"""
+        frame = self.get(session, user_id)
+        if frame.empty:
+            return None
+        
+        latest = frame.iloc[-1]
+        lean = frame['lean_trend_kg'].dropna()
+        rate = frame['weekly_rate_kg'].dropna()
+        return {
+            'date': frame.index[-1].date(),
+            'trend_kg': float(latest['trend_kg']),
+            'mean_7d_kg': float(latest['mean_7d']) if not np.isnan(latest['mean_7d']) else None,
+            'weekly_rate_kg': float(rate.iloc[-1]) if not rate.empty else None,
+            'lean_mass_kg': float(lean.iloc[-1]) if not lean.empty else None,
+            'days': len(frame),
+        }
+    
+    def invalidate(self, user_id=None):
+        """Forget cached results for one user, or everyone"""
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(user_id, None)
+
+
+_default_analytics = None
+_default_lock = threading.Lock()
+
+
+def get_analytics():
+    """Return the analytics cache shared across the app"""
+    global _default_analytics
+    with _default_lock:
+        if _default_analytics is None:
+            _default_analytics = TrendAnalytics()
+        return _default_analytics
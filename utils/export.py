@@ -0,0 +1,197 @@
+import csv
+import importlib.util
+import os
+import sys
+
+from sqlalchemy import Date, DateTime, Float, Integer, func, select
+
+# Allow running this file directly from the utils/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import Exercise, Meal, NutritionLog, ProgressEntry, Workout
+
+# Rows fetched and written per chunk; memory use depends on this, not on the database size
+CHUNK_SIZE = 10000
+
+FORMATS = ('csv', 'parquet')
+
+
+def _export_queries(user_id=None):
+    """Return {file name: (select, count select)} for every exported table.
+    
+    Exercises and meals carry their workout's or log's user and date, so
+    each file can be analysed on its own.
+    """
+    queries = {
+        'workouts': (
+            select(Workout.id, Workout.user_id, Workout.date, Workout.workout_type,
+                   Workout.duration_minutes, Workout.notes, Workout.created_at),
+            Workout.user_id
+        ),
+        'exercises': (
+            select(Exercise.id, Exercise.workout_id, Workout.user_id, Workout.date, Exercise.exercise_name,
+                   Exercise.exercise_id, Exercise.body_part, Exercise.target_muscle, Exercise.equipment,
+                   Exercise.sets, Exercise.reps, Exercise.weight_kg).join(Workout, Exercise.workout_id == Workout.id),
+            Workout.user_id
+        ),
+        'nutrition_logs': (
+            select(NutritionLog.id, NutritionLog.user_id, NutritionLog.date, NutritionLog.total_protein_g,
+                   NutritionLog.total_carbs_g, NutritionLog.total_fats_g, NutritionLog.total_calories,
+                   NutritionLog.notes, NutritionLog.created_at),
+            NutritionLog.user_id
+        ),
+        'meals': (
+            select(Meal.id, Meal.nutrition_log_id, NutritionLog.user_id, NutritionLog.date, Meal.meal_type,
+                   Meal.food_name, Meal.serving_size, Meal.protein_g, Meal.carbs_g, Meal.fats_g,
+                   Meal.calories).join(NutritionLog, Meal.nutrition_log_id == NutritionLog.id),
+            NutritionLog.user_id
+        ),
+        'progress_entries': (
+            select(ProgressEntry.id, ProgressEntry.user_id, ProgressEntry.date, ProgressEntry.weight_kg,
+                   ProgressEntry.body_fat_percentage, ProgressEntry.waist_cm, ProgressEntry.chest_cm,
+                   ProgressEntry.arms_cm, ProgressEntry.thighs_cm, ProgressEntry.photo_path,
+                   ProgressEntry.notes, ProgressEntry.created_at),
+            ProgressEntry.user_id
+        ),
+    }
+    
+    result = {}
+    for name, (query, owner) in queries.items():
+        if user_id is not None:
+            query = query.where(owner == user_id)
+        # The first selected column is always the table's id; ordering by it keeps exports repeatable
+        query = query.order_by(query.selected_columns[0])
+        count = select(func.count()).select_from(query.order_by(None).subquery())
+        result[name] = (query, count)
+    return result
+
+
+def parquet_available():
+    """Return True if pyarrow is installed"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class _CSVWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+    
+    def write(self, rows):
+        self.writer.writerows(rows)
+    
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    """Writes each chunk as a row group, with a schema from the column types"""
+    
+    def __init__(self, path, columns, column_types):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        self.pa = pa
+        self.schema = pa.schema([(name, self._arrow_type(kind)) for name, kind in zip(columns, column_types)])
+        self.writer = pq.ParquetWriter(path, self.schema)
+    
+    def _arrow_type(self, kind):
+        pa = self.pa
+        if isinstance(kind, Integer):
+            return pa.int64()
+        if isinstance(kind, Float):
+            return pa.float64()
+        if isinstance(kind, DateTime):
+            return pa.timestamp('us')
+        if isinstance(kind, Date):
+            return pa.date32()
+        return pa.string()
+    
+    def write(self, rows):
+        data = list(zip(*rows))
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(data, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+
+def export_data(engine, folder, fmt='csv', user_id=None, chunk_size=CHUNK_SIZE, progress=None, cancel=None):
+    """Write workouts, exercises, nutrition logs, meals and progress entries to folder.
+    
+    Rows are streamed with yield_per and written a chunk at a time, so
+    exporting millions of rows uses the same memory as exporting a few.
+    Each file is written under a temporary name and renamed when complete.
+    
+    progress(table, rows_done, rows_total) is called after every chunk,
+    from whichever thread runs the export. Setting the cancel event stops
+    the export after the current chunk. Returns {file path: rows written}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+    if fmt == 'parquet' and not parquet_available():
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+    
+    os.makedirs(folder, exist_ok=True)
+    written = {}
+    with engine.connect() as connection:
+        for name, (query, count_query) in _export_queries(user_id).items():
+            if cancel is not None and cancel.is_set():
+                break
+            
+            total = connection.execute(count_query).scalar()
+            path = os.path.join(folder, f"{name}.{fmt}")
+            partial = path + ".part"
+            
+            result = connection.execute(query.execution_options(yield_per=chunk_size))
+            columns = list(result.keys())
+            if fmt == 'csv':
+                writer = _CSVWriter(partial, columns)
+            else:
+                writer = _ParquetWriter(partial, columns, [column.type for column in query.selected_columns])
+            
+            done = 0
+            try:
+                for rows in result.partitions():
+                    if cancel is not None and cancel.is_set():
+                        break
+                    writer.write(rows)
+                    done += len(rows)
+                    if progress:
+                        progress(name, done, total)
+            finally:
+                result.close()
+                writer.close()
+            
+            if cancel is not None and cancel.is_set():
+                os.remove(partial)
+                break
+            if progress and not total:
+                progress(name, 0, 0)
+            os.replace(partial, path)
+            written[path] = done
+    return written
+
+
+if __name__ == "__main__":
+    from database.models import init_db
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args:
+        print("Usage: python utils/export.py <folder> [--parquet] [--db fitness_tracker.db] [--user ID]")
+        sys.exit(1)
+    
+    db_path = sys.argv[sys.argv.index('--db') + 1] if '--db' in sys.argv else 'fitness_tracker.db'
+    user_id = int(sys.argv[sys.argv.index('--user') + 1]) if '--user' in sys.argv else None
+    args = [arg for arg in args if arg not in (db_path, str(user_id))]
+    
+    def report(table, done, total):
+        print(f"\r  {table}: {done}/{total}", end="" if done < total else "\n", flush=True)
+    
+    engine = init_db(db_path)
+    written = export_data(
+        engine, args[0], fmt='parquet' if '--parquet' in sys.argv else 'csv', user_id=user_id,
+        progress=report
+    )
+    for path, rows in written.items():
+        print(f"{path}: {rows} rows")
@@ -0,0 +1,565 @@
+import csv
+import os
+import re
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+
+# Allow running this file directly from the utils/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.consistency import find_total_mismatches, repair_totals
+from database.models import Exercise, Meal, NutritionLog, ProgressEntry, Workout
+from database.records import rebuild_records
+from database.rollups import rebuild_rollups
+
+# Rows per executemany batch; memory use depends on this, not on the file size
+CHUNK_SIZE = 5000
+
+FORMATS = ('strong', 'mfp_nutrition', 'mfp_measurements', 'generic')
+
+LB_TO_KG = 0.45359237
+
+# Skipped rows kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 50
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%d.%m.%Y', '%d/%m/%Y')
+
+# Generic CSV: accepted header names (lower case) for each field, first match wins
+GENERIC_COLUMNS = {
+    'date': ('date', 'day'),
+    'workout_type': ('workout_type', 'workout', 'workout name'),
+    'duration_minutes': ('duration_minutes', 'duration', 'minutes'),
+    'exercise_name': ('exercise_name', 'exercise', 'exercise name'),
+    'body_part': ('body_part', 'body part'),
+    'target_muscle': ('target_muscle', 'target', 'muscle'),
+    'equipment': ('equipment',),
+    'sets': ('sets',),
+    'reps': ('reps',),
+    'weight_kg': ('weight_kg', 'weight (kg)', 'weight', 'kg'),
+    'meal_type': ('meal_type', 'meal'),
+    'food_name': ('food_name', 'food', 'food name', 'name'),
+    'serving_size': ('serving_size', 'serving', 'serving size', 'amount'),
+    'protein_g': ('protein_g', 'protein (g)', 'protein'),
+    'carbs_g': ('carbs_g', 'carbohydrates (g)', 'carbs (g)', 'carbs', 'carbohydrates'),
+    'fats_g': ('fats_g', 'fat (g)', 'fats (g)', 'fat', 'fats'),
+    'calories': ('calories', 'kcal', 'energy'),
+    'body_fat_percentage': ('body_fat_percentage', 'body fat', 'body fat %', 'bodyfat'),
+    'waist_cm': ('waist_cm', 'waist'),
+    'chest_cm': ('chest_cm', 'chest'),
+    'arms_cm': ('arms_cm', 'arms'),
+    'thighs_cm': ('thighs_cm', 'thighs'),
+    'notes': ('notes', 'note'),
+}
+
+
+class ImportFormatError(ValueError):
+    """The file isn't in a format the importer recognises"""
+
+
+# Parsing helpers
+
+def _text(value):
+    value = (value or '').strip()
+    return value or None
+
+
+# Numbers with thousands separators, for each decimal point
+_GROUPED = {
+    '.': re.compile(r'-?\d{1,3}(,\d{3})+(\.\d+)?'),
+    ',': re.compile(r'-?\d{1,3}(\.\d{3})+(,\d+)?'),
+}
+
+
+def _number(value, decimal='.'):
+    """Parse a number written with the file's decimal point ('.' or ',').
+    
+    Thousands separators are only accepted in groups of three, so a
+    decimal comma in a comma-decimal file is never read as one.
+    """
+    value = _text(value)
+    if value is None:
+        return None
+    if decimal == ',':
+        if _GROUPED[','].fullmatch(value):
+            value = value.replace('.', '')
+        value = value.replace(',', '.')
+    elif ',' in value:
+        if not _GROUPED['.'].fullmatch(value):
+            raise ValueError(f"unrecognised number {value!r}")
+        value = value.replace(',', '')
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"unrecognised number {value!r}") from None
+
+
+def _integer(value, decimal='.'):
+    value = _number(value, decimal)
+    return None if value is None else int(round(value))
+
+
+def _date(value):
+    value = _text(value)
+    if value is None:
+        raise ValueError("missing date")
+    try:
+        # ISO dates and date-times (Strong writes "2023-01-05 18:03:40")
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.split(' ')[0], fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r}")
+
+
+def _duration_minutes(value, decimal='.'):
+    """Strong durations look like "1h 5m" or "45m"; plain numbers are minutes"""
+    value = _text(value)
+    if value is None:
+        return None
+    parts = dict((unit, float(amount)) for amount, unit in re.findall(r'([\d.]+)\s*([hms])', value))
+    if not parts:
+        return _integer(value, decimal)
+    return int(round(parts.get('h', 0) * 60 + parts.get('m', 0) + parts.get('s', 0) / 60))
+
+
+def _weight(value, weight_unit, decimal='.'):
+    weight = _number(value, decimal)
+    if weight is not None and weight_unit == 'lb':
+        weight *= LB_TO_KG
+    return weight
+
+
+# Row parsers: each turns one CSV row into (kind, record) or raises ValueError.
+# decimal is the file's decimal point, from its delimiter.
+
+def _strong_row(row, weight_unit, decimal):
+    """One set from a Strong export; Strong writes one row per set"""
+    name = _text(row.get('Exercise Name'))
+    if name is None:
+        raise ValueError("missing exercise name")
+    
+    # Newer exports put the unit in the header and the duration in seconds
+    if 'Weight (kg)' in row:
+        weight = _weight(row['Weight (kg)'], 'kg', decimal)
+    elif 'Weight (lbs)' in row:
+        weight = _weight(row['Weight (lbs)'], 'lb', decimal)
+    else:
+        weight = _weight(row.get('Weight'), weight_unit, decimal)
+    if 'Duration (sec)' in row:
+        seconds = _number(row['Duration (sec)'], decimal)
+        duration = None if seconds is None else int(round(seconds / 60))
+    else:
+        duration = _duration_minutes(row.get('Duration'), decimal)
+    
+    return 'exercise', {
+        'date': _date(row.get('Date')),
+        # Rows of one workout share its start time and name
+        'workout': (_text(row.get('Date')), _text(row.get('Workout Name'))),
+        'workout_type': "Strength",
+        'duration_minutes': duration,
+        'workout_notes': _text(row.get('Workout Name')),
+        'exercise_name': name,
+        'sets': 1,
+        'reps': _integer(row.get('Reps'), decimal),
+        'weight_kg': weight,
+    }
+
+
+def _mfp_nutrition_row(row, weight_unit, decimal):
+    """One meal's totals from a MyFitnessPal Nutrition Summary export"""
+    meal = _text(row.get('Meal')) or "Snack"
+    return 'meal', {
+        'date': _date(row.get('Date')),
+        'meal_type': meal,
+        'food_name': f"MyFitnessPal {meal}",
+        'serving_size': None,
+        'protein_g': _number(row.get('Protein (g)'), decimal) or 0,
+        'carbs_g': _number(row.get('Carbohydrates (g)'), decimal) or 0,
+        'fats_g': _number(row.get('Fat (g)'), decimal) or 0,
+        'calories': _number(row.get('Calories'), decimal) or 0,
+    }
+
+
+def _mfp_measurements_row(row, weight_unit, decimal):
+    """One weigh-in from a MyFitnessPal Measurement Summary export"""
+    weight = _weight(row.get('Weight'), weight_unit, decimal)
+    if weight is None:
+        raise ValueError("missing weight")
+    return 'progress', {
+        'date': _date(row.get('Date')),
+        'weight_kg': weight,
+        'body_fat_percentage': _number(row.get('Body Fat %'), decimal),
+    }
+
+
+def _generic_columns(header):
+    """Map each known field to the header column that holds it"""
+    lowered = {column.strip().lower(): column for column in header if column}
+    found = {}
+    for field, names in GENERIC_COLUMNS.items():
+        for name in names:
+            if name in lowered:
+                found[field] = lowered[name]
+                break
+    return found
+
+
+def _generic_kind(columns):
+    if 'date' not in columns:
+        return None
+    if 'exercise_name' in columns:
+        return 'exercise'
+    if 'food_name' in columns or 'calories' in columns:
+        return 'meal'
+    if 'weight_kg' in columns:
+        return 'progress'
+    return None
+
+
+def _generic_parser(header):
+    """Build a row parser for a CSV whose headers name the app's own fields"""
+    columns = _generic_columns(header)
+    kind = _generic_kind(columns)
+    if kind is None:
+        raise ImportFormatError(
+            "Couldn't tell what this CSV holds; it needs a date column and "
+            "an exercise, food/calories or weight column"
+        )
+    
+    def value(row, field):
+        return row.get(columns[field]) if field in columns else None
+    
+    def parse(row, weight_unit, decimal):
+        record = {'date': _date(value(row, 'date'))}
+        if kind == 'exercise':
+            name = _text(value(row, 'exercise_name'))
+            if name is None:
+                raise ValueError("missing exercise name")
+            workout_type = _text(value(row, 'workout_type')) or "Strength"
+            record.update({
+                'workout': (record['date'], workout_type),
+                'workout_type': workout_type,
+                'duration_minutes': _duration_minutes(value(row, 'duration_minutes'), decimal),
+                'workout_notes': None,
+                'exercise_name': name,
+                'body_part': _text(value(row, 'body_part')),
+                'target_muscle': _text(value(row, 'target_muscle')),
+                'equipment': _text(value(row, 'equipment')),
+                'sets': _integer(value(row, 'sets'), decimal) or 1,
+                'reps': _integer(value(row, 'reps'), decimal),
+                'weight_kg': _weight(value(row, 'weight_kg'), weight_unit, decimal),
+            })
+        elif kind == 'meal':
+            record.update({
+                'meal_type': _text(value(row, 'meal_type')) or "Snack",
+                'food_name': _text(value(row, 'food_name')) or "Imported food",
+                'serving_size': _text(value(row, 'serving_size')),
+                'protein_g': _number(value(row, 'protein_g'), decimal) or 0,
+                'carbs_g': _number(value(row, 'carbs_g'), decimal) or 0,
+                'fats_g': _number(value(row, 'fats_g'), decimal) or 0,
+                'calories': _number(value(row, 'calories'), decimal) or 0,
+            })
+        else:
+            weight = _weight(value(row, 'weight_kg'), weight_unit, decimal)
+            if weight is None:
+                raise ValueError("missing weight")
+            record['weight_kg'] = weight
+            for field in ('body_fat_percentage', 'waist_cm', 'chest_cm', 'arms_cm', 'thighs_cm'):
+                record[field] = _number(value(row, field), decimal)
+            record['notes'] = _text(value(row, 'notes'))
+        return kind, record
+    
+    return parse
+
+
+def detect_format(header):
+    """Return the format name for a CSV header, or None if it isn't recognised"""
+    names = {column.strip() for column in header if column}
+    if {'Exercise Name', 'Set Order', 'Workout Name'} <= names:
+        return 'strong'
+    if {'Date', 'Meal', 'Calories', 'Protein (g)'} <= names:
+        return 'mfp_nutrition'
+    if {'Date', 'Weight'} <= names and 'Exercise Name' not in names:
+        return 'mfp_measurements'
+    if _generic_kind(_generic_columns(header)):
+        return 'generic'
+    return None
+
+
+def _open_reader(file):
+    """csv.DictReader that works out whether the file uses , ; or tabs.
+    
+    Returns the reader and the file's decimal point: exports from
+    European locales separate columns with ; and write 72,5 for 72.5.
+    """
+    sample = file.read(4096)
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample.splitlines()[0] if sample else '', delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    decimal = ',' if dialect.delimiter == ';' else '.'
+    return csv.DictReader(file, dialect=dialect), decimal
+
+
+class _Inserter:
+    """Buffers new rows per table and inserts them in chunks, parents first.
+    
+    Ids are assigned up front, so meals and exercises can point at a log
+    or workout that is still in the buffer; the connection must already
+    hold the write lock so nothing else can claim them. Rows that already exist for
+    the user (same date and name) are skipped, so importing a file twice
+    doesn't double the history.
+    """
+    
+    def __init__(self, connection, user_id, chunk_size=CHUNK_SIZE):
+        self.connection = connection
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.tables = [model.__table__ for model in (Workout, Exercise, NutritionLog, Meal, ProgressEntry)]
+        self.rows = {table.name: [] for table in self.tables}
+        self.added = {table.name: 0 for table in self.tables}
+        self.duplicates = 0
+        self.next_id = {
+            table.name: (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+            for table in self.tables
+        }
+        self.now = datetime.now()
+        
+        # One log per user per day, so new meals join an existing log
+        self.logs = dict(connection.execute(
+            select(NutritionLog.date, NutritionLog.id).where(NutritionLog.user_id == user_id)
+        ).all())
+        self.existing_meals = {
+            (day, name.lower()) for day, name in connection.execute(
+                select(NutritionLog.date, Meal.food_name)
+                .join(NutritionLog, Meal.nutrition_log_id == NutritionLog.id)
+                .where(NutritionLog.user_id == user_id)
+            )
+        }
+        self.existing_exercises = {
+            (day, name.lower()) for day, name in connection.execute(
+                select(Workout.date, Exercise.exercise_name)
+                .join(Workout, Exercise.workout_id == Workout.id)
+                .where(Workout.user_id == user_id)
+            )
+        }
+        self.existing_progress = set(connection.execute(
+            select(ProgressEntry.date).where(ProgressEntry.user_id == user_id)
+        ).scalars())
+        
+        self.workouts = {}  # source workout key -> new workout id
+        self.pending_set = None  # last exercise row, to merge identical sets into
+    
+    def _queue(self, table_name, row):
+        row['id'] = self.next_id[table_name]
+        self.next_id[table_name] += 1
+        self.rows[table_name].append(row)
+        if len(self.rows[table_name]) >= self.chunk_size:
+            self.flush()
+        return row['id']
+    
+    def add(self, kind, record):
+        getattr(self, f"_add_{kind}")(record)
+    
+    def _add_meal(self, record):
+        day = record.pop('date')
+        if (day, record['food_name'].lower()) in self.existing_meals:
+            self.duplicates += 1
+            return
+        
+        log_id = self.logs.get(day)
+        if log_id is None:
+            # Totals are filled in from the meals once everything is inserted
+            log_id = self.logs[day] = self._queue('nutrition_logs', {
+                'user_id': self.user_id,
+                'date': day,
+                'total_protein_g': 0,
+                'total_carbs_g': 0,
+                'total_fats_g': 0,
+                'total_calories': 0,
+                'notes': None,
+                'created_at': self.now,
+            })
+        record['nutrition_log_id'] = log_id
+        self._queue('meals', record)
+    
+    def _add_exercise(self, record):
+        day = record['date']
+        if (day, record['exercise_name'].lower()) in self.existing_exercises:
+            self.duplicates += 1
+            return
+        
+        workout_id = self.workouts.get(record['workout'])
+        if workout_id is None:
+            workout_id = self.workouts[record['workout']] = self._queue('workouts', {
+                'user_id': self.user_id,
+                'date': day,
+                'workout_type': record['workout_type'],
+                'duration_minutes': record['duration_minutes'],
+                'notes': record['workout_notes'],
+                'created_at': self.now,
+            })
+        
+        # Consecutive sets of the same exercise, reps and weight become one
+        # row with a higher set count; volume is unchanged
+        pending = self.pending_set
+        if (pending is not None and pending['workout_id'] == workout_id
+                and pending['exercise_name'] == record['exercise_name']
+                and pending['reps'] == record['reps'] and pending['weight_kg'] == record['weight_kg']):
+            pending['sets'] += record['sets']
+            return
+        
+        self.pending_set = {
+            'workout_id': workout_id,
+            'exercise_name': record['exercise_name'],
+            'exercise_id': None,
+            'body_part': record.get('body_part'),
+            'target_muscle': record.get('target_muscle'),
+            'equipment': record.get('equipment'),
+            'sets': record['sets'],
+            'reps': record['reps'],
+            'weight_kg': record['weight_kg'],
+        }
+        self._queue('exercises', self.pending_set)
+    
+    def _add_progress(self, record):
+        if record['date'] in self.existing_progress:
+            self.duplicates += 1
+            return
+        record.setdefault('notes', None)
+        record['user_id'] = self.user_id
+        record['created_at'] = self.now
+        self._queue('progress_entries', record)
+    
+    def flush(self):
+        for table in self.tables:
+            rows = self.rows[table.name]
+            if rows:
+                # Rows in one executemany need the same keys
+                keys = set().union(*rows)
+                self.connection.execute(table.insert(), [{key: row.get(key) for key in keys} for row in rows])
+                self.added[table.name] += len(rows)
+                rows.clear()
+        # Sets can only be merged into a row that hasn't been inserted yet
+        self.pending_set = None
+
+
+def import_file(engine, path, user_id, fmt=None, weight_unit='kg', chunk_size=CHUNK_SIZE, progress=None):
+    """Import a Strong, MyFitnessPal or generic CSV export for a user.
+    
+    The file is read a row at a time and inserted with chunked
+    executemany calls in a single transaction, so an import either lands
+    completely or not at all. Entries the user already has for the same
+    date and name are skipped. Nutrition log totals, rollups and personal
+    records are rebuilt once at the end instead of per row.
+    
+    fmt is detected from the header when not given; weight_unit is the
+    unit the file's weights are in ('kg' or 'lb'). Files separated by ;
+    are read with decimal commas; in other files a comma is only accepted
+    as a thousands separator, and any other number is reported as an
+    error rather than scaled. progress(rows_read) is called after every
+    chunk. Returns a summary dict.
+    """
+    if weight_unit not in ('kg', 'lb'):
+        raise ValueError(f"Unknown weight unit {weight_unit!r}; use 'kg' or 'lb'")
+    if fmt is not None and fmt not in FORMATS:
+        raise ValueError(f"Unknown import format {fmt!r}; use one of {', '.join(FORMATS)}")
+    
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        reader, decimal = _open_reader(file)
+        header = reader.fieldnames or []
+        fmt = fmt or detect_format(header)
+        if fmt is None:
+            raise ImportFormatError(f"{os.path.basename(path)} isn't a Strong, MyFitnessPal or recognised CSV export")
+        parse = {
+            'strong': _strong_row,
+            'mfp_nutrition': _mfp_nutrition_row,
+            'mfp_measurements': _mfp_measurements_row,
+        }.get(fmt) or _generic_parser(header)
+        
+        errors = []
+        skipped = 0
+        read = 0
+        with engine.begin() as connection:
+            # pysqlite only locks at the first insert; lock now, before the
+            # inserter reads the next free ids, so a save from the app
+            # during the import can't take the same ids
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            inserter = _Inserter(connection, user_id, chunk_size)
+            for row in reader:
+                read += 1
+                try:
+                    kind, record = parse(row, weight_unit, decimal)
+                except ValueError as e:
+                    skipped += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append((reader.line_num, str(e)))
+                    continue
+                inserter.add(kind, record)
+                if progress and read % chunk_size == 0:
+                    progress(read)
+            inserter.flush()
+            
+            # Core inserts skip the ORM listeners, so fix up totals, rollups and records in one pass each
+            repair_totals(connection, find_total_mismatches(connection))
+            rebuild_rollups(connection, user_id)
+            rebuild_records(connection, user_id)
+    
+    if progress:
+        progress(read)
+    return {
+        'format': fmt,
+        'rows': read,
+        'added': inserter.added,
+        'duplicates': inserter.duplicates,
+        'skipped': skipped,
+        'errors': errors,
+    }
+
+
+if __name__ == "__main__":
+    import time
+    
+    from database.models import init_db, User
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args:
+        print("Usage: python utils/importers.py <file.csv> [--lb] [--db fitness_tracker.db] [--user ID] [--format NAME]")
+        sys.exit(1)
+    
+    db_path = sys.argv[sys.argv.index('--db') + 1] if '--db' in sys.argv else 'fitness_tracker.db'
+    fmt = sys.argv[sys.argv.index('--format') + 1] if '--format' in sys.argv else None
+    engine = init_db(db_path)
+    if '--user' in sys.argv:
+        user_id = int(sys.argv[sys.argv.index('--user') + 1])
+    else:
+        with engine.connect() as connection:
+            user_id = connection.execute(select(func.min(User.id))).scalar()
+    if user_id is None:
+        print("No user yet; run the app once to create your profile")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    try:
+        summary = import_file(engine, args[0], user_id, fmt=fmt, weight_unit='lb' if '--lb' in sys.argv else 'kg')
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    
+    print(f"✓ Imported {summary['rows']} rows ({summary['format']}) in {time.perf_counter() - start:.1f}s")
+    for table, count in summary['added'].items():
+        if count:
+            print(f"  {table}: +{count}")
+    if summary['duplicates']:
+        print(f"  {summary['duplicates']} already logged, skipped")
+    for line, reason in summary['errors']:
+        print(f"  line {line}: {reason}")
+    if summary['skipped'] > len(summary['errors']):
+        print(f"  ...and {summary['skipped'] - len(summary['errors'])} more rows skipped")
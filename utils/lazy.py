@@ -0,0 +1,45 @@
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+    
+    Lets a module name a heavy dependency (pandas, matplotlib, requests)
+    at the top of the file without paying for it until it is used, so
+    startup only loads what the first screen needs.
+    """
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+    
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+    
+    def __dir__(self):
+        return dir(self._load())
+    
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if it is already imported, otherwise a LazyModule"""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+def is_loaded(name):
+    """Return True if a module has actually been imported"""
+    return name in sys.modules
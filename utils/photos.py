@@ -0,0 +1,227 @@
+import hashlib
+import os
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Allow running this file directly from the utils/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lazy import lazy_import
+
+# Pillow is only needed once a photo is shown
+Image = lazy_import('PIL.Image')
+ImageOps = lazy_import('PIL.ImageOps')
+
+# Originals are copied here under their content hash, next to the database
+PHOTO_DIR = 'progress_photos'
+THUMB_DIR = os.path.join(PHOTO_DIR, 'thumbs')
+
+# Name -> bounding box; every size is made in one decode of the original
+THUMBNAIL_SIZES = {
+    'row': (48, 48),
+    'large': (360, 480),
+}
+
+JPEG_QUALITY = 85
+HASH_CHUNK = 1 << 20
+
+# Decoded thumbnails kept in memory; row thumbnails are a few KB each
+MEMORY_ITEMS = 64
+
+
+def _digest(path):
+    """Content hash of a file, read a chunk at a time"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_digest(name):
+    return len(name) == 32 and all(c in '0123456789abcdef' for c in name)
+
+
+_keys = {}  # (path, size, mtime) -> digest, for photos outside PHOTO_DIR
+_keys_lock = threading.Lock()
+
+
+def content_key(path):
+    """Return the content hash that names a photo's thumbnails.
+    
+    Photos saved with store_photo() are already named by their hash;
+    other paths are hashed once per process and remembered.
+    """
+    stem, _ = os.path.splitext(os.path.basename(path))
+    if _is_digest(stem):
+        return stem
+    
+    stat = os.stat(path)
+    marker = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _keys_lock:
+        key = _keys.get(marker)
+    if key is None:
+        key = _digest(path)
+        with _keys_lock:
+            _keys[marker] = key
+    return key
+
+
+def store_photo(source, folder=PHOTO_DIR):
+    """Copy a photo into the app's folder under its content hash; returns the new path.
+    
+    Adding the same picture twice keeps a single copy.
+    """
+    key = _digest(source)
+    ext = os.path.splitext(source)[1].lower() or '.jpg'
+    path = os.path.join(folder, key + ext)
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        partial = path + '.part'
+        shutil.copyfile(source, partial)
+        os.replace(partial, path)
+    return path
+
+
+def thumbnail_path(key, size_name, folder=THUMB_DIR):
+    return os.path.join(folder, key[:2], f"{key}_{size_name}.jpg")
+
+
+def make_thumbnails(source, key, folder=THUMB_DIR, sizes=None):
+    """Decode a photo once and write a JPEG thumbnail for every size.
+    
+    draft() lets the JPEG decoder scale down by 1/2, 1/4 or 1/8 while
+    decoding, so a 12 MP phone photo is never expanded to full size in
+    memory. Runs in a worker process; returns {size name: path}.
+    """
+    sizes = sizes or THUMBNAIL_SIZES
+    largest = max(sizes.values(), key=lambda box: box[0] * box[1])
+    
+    with Image.open(source) as image:
+        # The decoder keeps at least this size, so the largest thumbnail stays sharp
+        image.draft('RGB', (largest[0] * 2, largest[1] * 2))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+    
+    paths = {}
+    # Largest first, each later one scaled from the previous
+    for name, box in sorted(sizes.items(), key=lambda item: -item[1][0] * item[1][1]):
+        image.thumbnail(box, Image.Resampling.LANCZOS)
+        path = thumbnail_path(key, name, folder)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = path + '.part'
+        image.save(partial, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        os.replace(partial, path)
+        paths[name] = path
+    return paths
+
+
+class ThumbnailCache:
+    """Thumbnails on disk by content hash, with a small in-memory LRU.
+    
+    Missing thumbnails are made in a process pool so decoding large photos
+    uses neither the UI thread nor the main process's memory. Only the
+    thumbnails asked for are ever decoded, so paging through hundreds of
+    photos keeps at most MEMORY_ITEMS small images in memory.
+    """
+    
+    def __init__(self, folder=THUMB_DIR, max_items=MEMORY_ITEMS, workers=None):
+        self.folder = folder
+        self.max_items = max_items
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._memory = OrderedDict()  # (key, size name) -> PIL image
+        self._pending = {}  # key -> future making its thumbnails
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    def _executor(self):
+        if self._pool is None:
+            import multiprocessing
+            # Spawned workers don't inherit the UI's threads or Tk state
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+    
+    def generate(self, source, key=None):
+        """Start making a photo's thumbnails if they aren't on disk; returns a future or None"""
+        key = key or content_key(source)
+        if all(os.path.exists(thumbnail_path(key, name, self.folder)) for name in THUMBNAIL_SIZES):
+            return None
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._executor().submit(make_thumbnails, source, key, self.folder)
+                future.add_done_callback(lambda f: self._forget(key))
+            return future
+    
+    def _forget(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+    
+    def get(self, source, size_name='row'):
+        """Return a loaded thumbnail, making it first if needed; blocks, so call from a worker thread"""
+        key = content_key(source)
+        with self._lock:
+            image = self._memory.get((key, size_name))
+            if image is not None:
+                self._memory.move_to_end((key, size_name))
+                return image
+        
+        path = thumbnail_path(key, size_name, self.folder)
+        if not os.path.exists(path):
+            future = self.generate(source, key)
+            if future is not None:
+                future.result()
+        
+        with Image.open(path) as thumbnail:
+            image = thumbnail.copy()
+        with self._lock:
+            self._memory[(key, size_name)] = image
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return image
+    
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+    
+    def shutdown(self):
+        """Stop the worker processes; thumbnails already on disk are kept"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pending.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """Return the thumbnail cache shared across the app"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ThumbnailCache()
+        return _default_cache
+
+
+if __name__ == "__main__":
+    # Make any missing thumbnails for photos already in the database
+    from sqlalchemy import select
+    from database.models import init_db, ProgressEntry
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    engine = init_db(args[0] if args else 'fitness_tracker.db')
+    with engine.connect() as connection:
+        paths = connection.execute(
+            select(ProgressEntry.photo_path).where(ProgressEntry.photo_path.isnot(None)).distinct()
+        ).scalars().all()
+    
+    cache = ThumbnailCache()
+    futures = [cache.generate(path) for path in paths if os.path.exists(path)]
+    made = [future.result() for future in futures if future is not None]
+    cache.shutdown()
+    print(f"✓ {len(paths)} photos, {len(made)} needed new thumbnails")
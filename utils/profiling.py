@@ -0,0 +1,106 @@
+import builtins
+import cProfile
+import importlib.util
+import io
+import pstats
+import sys
+import threading
+import time
+
+
+class ImportTimer:
+    """Times every new import on the main thread, like python -X importtime.
+    
+    Wraps builtins.__import__, so it sees import statements but not
+    importlib.import_module calls; time spent in those is counted in the
+    module that made them.
+    """
+    
+    def __init__(self):
+        self.records = []  # (name, self_seconds, cumulative_seconds, depth)
+        self._stack = []
+        self._original = None
+    
+    def start(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+    
+    def stop(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+    
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.current_thread() is not threading.main_thread():
+            return self._original(name, globals, locals, fromlist, level)
+        
+        full_name = name
+        if level:
+            try:
+                full_name = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                pass
+        if full_name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.records.append((full_name, elapsed - children, elapsed, len(self._stack)))
+    
+    def report(self, limit=25, file=None):
+        """Print the slowest imports by cumulative time"""
+        file = file or sys.stdout
+        print("import time: self [us] | cumulative | imported package", file=file)
+        for name, own, cumulative, depth in sorted(self.records, key=lambda r: r[2], reverse=True)[:limit]:
+            print(f"import time: {own * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}", file=file)
+
+
+class StartupProfiler:
+    """Import timings, a cProfile run and named milestones for app startup"""
+    
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.imports = ImportTimer()
+        self.profile = cProfile.Profile()
+        self.marks = []  # (label, seconds since start)
+    
+    def start(self):
+        self.imports.start()
+        self.profile.enable()
+    
+    def mark(self, label):
+        """Record how long it took to reach a point in startup"""
+        self.marks.append((label, time.perf_counter() - self.started_at))
+    
+    def stop(self):
+        self.profile.disable()
+        self.imports.stop()
+    
+    def elapsed(self, label):
+        """Return the seconds recorded for a milestone, or None"""
+        for name, seconds in self.marks:
+            if name == label:
+                return seconds
+        return None
+    
+    def report(self, limit=25, file=None):
+        """Print the milestones, slowest imports and top cProfile entries"""
+        file = file or sys.stdout
+        print("Startup milestones:", file=file)
+        for label, seconds in self.marks:
+            print(f"  {label}: {seconds * 1000:.1f} ms", file=file)
+        
+        print("", file=file)
+        self.imports.report(limit=limit, file=file)
+        
+        print("", file=file)
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(limit)
+        print(stream.getvalue().strip(), file=file)
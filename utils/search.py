@@ -0,0 +1,150 @@
+import threading
+from concurrent.futures import Future
+
+
+def normalize_query(query):
+    """Lowercase a query and collapse whitespace"""
+    return ' '.join(query.lower().split())
+
+
+class RequestCoalescer:
+    """Shares one in-flight call between identical concurrent requests"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+    
+    def call(self, key, fn, *args, **kwargs):
+        """Run fn once per key at a time; concurrent callers wait for the same result"""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+# Shared so the Search button and type-ahead never issue the same request twice
+coalescer = RequestCoalescer()
+
+
+class PrefixCache:
+    """Answers a longer query by filtering the results of an earlier prefix"""
+    
+    def __init__(self, text_fields, min_results=3):
+        self.text_fields = text_fields
+        self.min_results = min_results
+        self.query = None
+        self.results = []
+        self.complete = False
+    
+    def store(self, query, results, complete):
+        """Remember the results for a query; complete means nothing was cut off"""
+        self.query = normalize_query(query)
+        self.results = results
+        self.complete = complete
+    
+    def lookup(self, query):
+        """Return filtered results for query, or None if a new request is needed"""
+        query = normalize_query(query)
+        if self.query is None or not query.startswith(self.query):
+            return None
+        
+        words = query.split()
+        matches = []
+        for item in self.results:
+            text = ' '.join(str(item.get(field, '')) for field in self.text_fields).lower()
+            if all(word in text for word in words):
+                matches.append(item)
+        
+        # A truncated result set can only be trusted if enough of it still matches
+        if self.complete or len(matches) >= self.min_results:
+            return matches
+        return None
+
+
+class TypeAheadSearch:
+    """Debounced as-you-type search for a CTkEntry.
+    
+    Keystrokes only schedule a search; it fires once typing pauses. Longer
+    queries are answered by filtering the previous results where possible.
+    fetch runs on a worker thread and should go through the coalescer so it
+    shares calls with the Search button.
+    """
+    
+    def __init__(self, entry, tasks, fetch, on_results, key, text_fields,
+                 on_error=None, enabled=None, delay_ms=350, min_chars=3, limit=10):
+        self.entry = entry
+        self.tasks = tasks
+        self.fetch = fetch
+        self.on_results = on_results
+        self.on_error = on_error
+        self.key = key
+        self.enabled = enabled
+        self.delay_ms = delay_ms
+        self.min_chars = min_chars
+        self.limit = limit
+        self.prefix = PrefixCache(text_fields)
+        
+        self._after_id = None
+        self._shown_query = None
+        entry.bind('<KeyRelease>', self._on_key, add='+')
+    
+    def _on_key(self, event=None):
+        self.cancel_pending()
+        self._after_id = self.entry.after(self.delay_ms, self._fire)
+    
+    def cancel_pending(self):
+        """Drop a scheduled search that hasn't fired yet"""
+        if self._after_id is not None:
+            self.entry.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def _fire(self):
+        self._after_id = None
+        if self.enabled and not self.enabled():
+            return
+        
+        query = normalize_query(self.entry.get())
+        if len(query) < self.min_chars or query == self._shown_query:
+            return
+        
+        local = self.prefix.lookup(query)
+        if local is not None:
+            self._show(query, local)
+            return
+        
+        self.tasks.submit(
+            self.fetch,
+            query,
+            key=self.key,
+            on_success=lambda results: self._deliver(query, results),
+            on_error=self.on_error
+        )
+    
+    def _deliver(self, query, results):
+        self.prefix.store(query, results, complete=len(results) < self.limit)
+        self._show(query, results)
+    
+    def _show(self, query, results):
+        self._shown_query = query
+        self.on_results(query, results)
+    
+    def remember(self, query, results):
+        """Record results from an explicit search so typing can build on them"""
+        self.prefix.store(query, results, complete=len(results) < self.limit)
+        self._shown_query = normalize_query(query)
@@ -0,0 +1,133 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundTasks:
+    """Runs blocking work on a thread pool and hands results back to the Tk loop.
+
+    Worker threads never touch widgets. Finished futures are put on a queue
+    that the UI thread drains with widget.after(), and callbacks run there.
+    Tasks submitted with a key replace any earlier task with the same key, so
+    a stale search can never overwrite the results of a newer one.
+    """
+
+    def __init__(self, widget, max_workers=4, poll_ms=30, after_results=None):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        # Called on the UI thread after each batch of finished tasks is handled
+        self.after_results = after_results
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self.results = queue.Queue()
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._latest = {}  # key -> (generation, future)
+        self._pending = 0
+        self._poll_id = None
+        self._closed = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None, key=None, **kwargs):
+        """Run fn(*args, **kwargs) on a worker thread.
+
+        on_success(result) or on_error(exception) is called on the UI thread
+        when the task finishes, unless it was cancelled or superseded.
+        """
+        if self._closed:
+            return None
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if key is not None and key in self._latest:
+                self._latest[key][1].cancel()
+
+            future = self.executor.submit(fn, *args, **kwargs)
+            if key is not None:
+                self._latest[key] = (generation, future)
+            self._pending += 1
+
+        future.add_done_callback(
+            lambda f: self.results.put((key, generation, f, on_success, on_error))
+        )
+        self._schedule_poll()
+        return future
+
+    def cancel(self, key):
+        """Cancel the task with this key; its callbacks will not run"""
+        with self._lock:
+            entry = self._latest.pop(key, None)
+        if entry:
+            entry[1].cancel()
+
+    def cancel_all(self):
+        """Cancel every keyed task, e.g. when the view owning them goes away"""
+        with self._lock:
+            entries = list(self._latest.values())
+            self._latest.clear()
+        for _, future in entries:
+            future.cancel()
+
+    def is_current(self, key, generation):
+        """Return True if generation is still the latest task for key"""
+        with self._lock:
+            entry = self._latest.get(key)
+        return entry is not None and entry[0] == generation
+
+    def _schedule_poll(self):
+        if self._poll_id is None and not self._closed:
+            self._poll_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Drain finished tasks and run their callbacks on the UI thread"""
+        self._poll_id = None
+        handled = False
+        while True:
+            try:
+                key, generation, future, on_success, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            handled = True
+
+            with self._lock:
+                self._pending -= 1
+
+            if future.cancelled():
+                continue
+            if key is not None:
+                if not self.is_current(key, generation):
+                    continue
+                with self._lock:
+                    self._latest.pop(key, None)
+
+            try:
+                error = future.exception()
+                if error is not None:
+                    if on_error:
+                        on_error(error)
+                    else:
+                        print(f"Background task failed: {error}")
+                elif on_success:
+                    on_success(future.result())
+            except Exception as e:
+                print(f"Error handling background task result: {e}")
+
+        if handled and self.after_results and not self._closed:
+            try:
+                self.after_results()
+            except Exception as e:
+                print(f"Error after background task results: {e}")
+
+        if self._pending > 0:
+            self._schedule_poll()
+
+    def shutdown(self):
+        """Stop polling and drop any work that has not started yet"""
+        self._closed = True
+        if self._poll_id is not None:
+            try:
+                self.widget.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,271 @@
+import math
+import threading
+from collections import deque
+from datetime import date, timedelta
+
+from sqlalchemy import Date, bindparam, func, select, text
+
+from database.models import NutritionLog, ProgressEntry
+from utils.analytics import IncrementalTrend
+from utils.lazy import lazy_import
+
+# Only estimate_history needs these, so the dashboard doesn't load them
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Energy in one kg of body weight change
+KCAL_PER_KG = 7700
+
+# Same small deficit the profile setup uses for a recomp
+RECOMP_DEFICIT = 150
+
+WINDOW_DAYS = 28
+MIN_DAYS = 14
+
+# Fingerprint of a user's weigh-ins and intake up to a day, checked on
+# every update; one statement built as text so it is compiled once
+_SIGNATURE_SQL = text(
+    "SELECT w.n, w.total, i.n, i.total FROM "
+    "(SELECT COUNT(id) AS n, TOTAL(weight_kg) AS total FROM progress_entries "
+    "WHERE user_id = :user_id AND date <= :through AND weight_kg IS NOT NULL) AS w, "
+    "(SELECT COUNT(id) AS n, TOTAL(total_calories) AS total FROM nutrition_logs "
+    "WHERE user_id = :user_id AND date <= :through AND total_calories > 0) AS i"
+).bindparams(bindparam('through', type_=Date))
+
+
+class RollingTDEE:
+    """Energy-balance regression over a sliding window, updated one day at a time.
+    
+    Maintenance calories are the average intake minus the energy stored or
+    lost, taken from the slope of the trend weight:
+        TDEE = mean(intake) - KCAL_PER_KG * d(weight)/d(day)
+    The slope comes from running sums, so adding a day and dropping the one
+    that left the window is O(1) instead of a refit.
+    """
+    
+    def __init__(self, window_days=WINDOW_DAYS, min_days=MIN_DAYS, kcal_per_kg=KCAL_PER_KG):
+        self.window_days = window_days
+        self.min_days = min_days
+        self.kcal_per_kg = kcal_per_kg
+        self.reset()
+    
+    def reset(self):
+        """Forget every day added so far"""
+        self.days = deque()  # (x, intake, weight)
+        self.origin = None
+        self.last_day = None
+        self.n = 0
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = self.sum_intake = 0.0
+    
+    def _add(self, x, intake, weight):
+        self.days.append((x, intake, weight))
+        self.n += 1
+        self.sum_x += x
+        self.sum_y += weight
+        self.sum_xx += x * x
+        self.sum_xy += x * weight
+        self.sum_intake += intake
+    
+    def _remove_oldest(self):
+        x, intake, weight = self.days.popleft()
+        self.n -= 1
+        self.sum_x -= x
+        self.sum_y -= weight
+        self.sum_xx -= x * x
+        self.sum_xy -= x * weight
+        self.sum_intake -= intake
+    
+    def update(self, day, intake_kcal, trend_kg):
+        """Add one day's intake and trend weight; returns the new estimate"""
+        if self.last_day is not None and day <= self.last_day:
+            raise ValueError(f"Days must be added in order ({day} after {self.last_day})")
+        if self.origin is None:
+            self.origin = day.toordinal()
+        
+        x = day.toordinal() - self.origin
+        self._add(x, float(intake_kcal), float(trend_kg))
+        self.last_day = day
+        while self.days and self.days[0][0] <= x - self.window_days:
+            self._remove_oldest()
+        return self.estimate()
+    
+    def slope(self):
+        """Return the trend weight change in kg per day, or None with too few days"""
+        denominator = self.n * self.sum_xx - self.sum_x * self.sum_x
+        if self.n < 2 or denominator <= 0:
+            return None
+        return (self.n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+    
+    def estimate(self):
+        """Return estimated maintenance calories, or None until enough days are logged"""
+        slope = self.slope()
+        if self.n < self.min_days or slope is None:
+            return None
+        return self.sum_intake / self.n - self.kcal_per_kg * slope
+
+
+def estimate_history(days, intake, trend, window_days=WINDOW_DAYS, min_days=MIN_DAYS,
+                     kcal_per_kg=KCAL_PER_KG):
+    """Vectorized TDEE estimate for every day of a history at once.
+    
+    Gives the same numbers as feeding each day through RollingTDEE, which
+    makes it handy for charts and for checking the incremental version.
+    """
+    index = pd.DatetimeIndex(days)
+    x = np.asarray([day.toordinal() for day in days], dtype=float)
+    x -= x[0] if len(x) else 0
+    y = np.asarray(trend, dtype=float)
+    frame = pd.DataFrame({
+        'n': 1.0, 'x': x, 'y': y, 'xx': x * x, 'xy': x * y, 'intake': np.asarray(intake, dtype=float)
+    }, index=index)
+    sums = frame.rolling(f'{window_days}D').sum()
+    
+    denominator = sums['n'] * sums['xx'] - sums['x'] ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (sums['n'] * sums['xy'] - sums['x'] * sums['y']) / denominator
+    estimates = sums['intake'] / sums['n'] - kcal_per_kg * slope
+    return estimates.where((sums['n'] >= min_days) & (denominator > 0))
+
+
+def recomp_target(tdee, deficit=RECOMP_DEFICIT):
+    """Return the daily calorie target for a recomp at this maintenance level"""
+    return tdee - deficit
+
+
+def apply_target(user, tdee, deficit=RECOMP_DEFICIT):
+    """Set a user's calorie target from a TDEE estimate, keeping protein fixed.
+    
+    Fats stay at 25% of calories and carbs take the rest, the same split the
+    profile setup uses.
+    """
+    target_calories = recomp_target(tdee, deficit)
+    fat_g = target_calories * 0.25 / 9
+    carb_g = max(target_calories - user.target_protein_g * 4 - fat_g * 9, 0) / 4
+    
+    user.target_calories = target_calories
+    user.target_fats_g = round(fat_g)
+    user.target_carbs_g = round(carb_g)
+    return target_calories
+
+
+class _UserState:
+    """Everything AdaptiveTDEE has processed for one user"""
+    
+    def __init__(self, window_days, min_days):
+        self.estimator = RollingTDEE(window_days, min_days)
+        self.trend = IncrementalTrend()
+        self.processed_through = None
+        self.signature = None
+
+
+class AdaptiveTDEE:
+    """Feeds each newly completed day into a per-user RollingTDEE.
+    
+    Only days after the last one processed are read from the database. If
+    anything already processed changes (a back-dated or deleted entry), the
+    user's state is rebuilt from scratch.
+    """
+    
+    def __init__(self, window_days=WINDOW_DAYS, min_days=MIN_DAYS):
+        self.window_days = window_days
+        self.min_days = min_days
+        self._states = {}  # user_id -> _UserState
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _signature(session, user_id, through):
+        """Fingerprint of the weigh-ins and intake up to and including a day"""
+        return tuple(session.execute(_SIGNATURE_SQL, {'user_id': user_id, 'through': through}).one())
+    
+    def _process(self, session, user_id, state, through):
+        """Step the trend and estimator through every day up to `through`"""
+        after = state.processed_through
+        # A full load reads from date.min, so it compiles the same statements
+        # the one-day updates reuse
+        since = after if after is not None else date.min
+        
+        weight_query = select(ProgressEntry.date, ProgressEntry.weight_kg).where(
+            ProgressEntry.user_id == user_id,
+            ProgressEntry.date > since,
+            ProgressEntry.date <= through,
+            ProgressEntry.weight_kg.isnot(None)
+        )
+        intake_query = select(NutritionLog.date, NutritionLog.total_calories).where(
+            NutritionLog.user_id == user_id,
+            NutritionLog.date > since,
+            NutritionLog.date <= through,
+            NutritionLog.total_calories > 0
+        )
+        
+        weights = {}
+        for day, weight in session.execute(weight_query):
+            weights.setdefault(day, []).append(weight)
+        intake = dict(session.execute(intake_query).all())
+        
+        # Extend the fingerprint with the rows just read instead of querying again
+        all_weights = [weight for logged in weights.values() for weight in logged]
+        count, total, intake_count, intake_total = state.signature or (0, 0.0, 0, 0.0)
+        state.signature = (
+            count + len(all_weights),
+            total + sum(all_weights),
+            intake_count + len(intake),
+            intake_total + sum(intake.values())
+        )
+        
+        day = after + timedelta(days=1) if after is not None else min(weights, default=through)
+        while day <= through:
+            logged = weights.get(day)
+            trend = state.trend.advance(sum(logged) / len(logged) if logged else None)
+            if trend is not None and day in intake:
+                state.estimator.update(day, intake[day], trend)
+            day += timedelta(days=1)
+        state.processed_through = through
+    
+    def estimate(self, session, user_id, today=None):
+        """Return (tdee, days_used) from every completed day logged so far"""
+        today = today or date.today()
+        # Process up to the last weigh-in before today; later days wait for
+        # a weight so a stale trend doesn't flatten the slope
+        through = session.execute(
+            select(func.max(ProgressEntry.date)).where(
+                ProgressEntry.user_id == user_id,
+                ProgressEntry.date < today,
+                ProgressEntry.weight_kg.isnot(None)
+            )
+        ).scalar()
+        
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is not None and state.processed_through is not None:
+                current = self._signature(session, user_id, state.processed_through)
+                if not all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6) for a, b in zip(current, state.signature)):
+                    state = None
+            if state is None:
+                state = _UserState(self.window_days, self.min_days)
+            
+            if through is not None and (state.processed_through is None or through > state.processed_through):
+                self._process(session, user_id, state, through)
+            
+            self._states[user_id] = state
+            return state.estimator.estimate(), state.estimator.n
+    
+    def invalidate(self, user_id=None):
+        """Forget processed days for one user, or everyone"""
+        with self._lock:
+            if user_id is None:
+                self._states.clear()
+            else:
+                self._states.pop(user_id, None)
+
+
+_default_tdee = None
+_default_lock = threading.Lock()
+
+
+def get_tdee():
+    """Return the TDEE estimator shared across the app"""
+    global _default_tdee
+    with _default_lock:
+        if _default_tdee is None:
+            _default_tdee = AdaptiveTDEE()
+        return _default_tdee
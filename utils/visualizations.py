@@ -0,0 +1,181 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# Agg renders to an in-memory buffer and is safe to use off the Tk thread.
+# matplotlib is loaded by the first render, on the worker thread.
+backend_agg = lazy_import('matplotlib.backends.backend_agg')
+figure_module = lazy_import('matplotlib.figure')
+
+KG_TO_LBS = 1 / 0.453592
+
+# More points than the chart is pixels wide can't be seen, only waited for
+MAX_POINTS = 500
+
+CHART_COLORS = {
+    'bg': '#FFFFFF',
+    'weight': '#FFB6C1',
+    'trend': '#D6336C',
+    'text': '#4A4A4A',
+    'grid': '#F0E0E4',
+}
+
+
+def lttb(x, y, threshold):
+    """Downsample a series with Largest-Triangle-Three-Buckets.
+    
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with its neighbours, so peaks and
+    dips survive. Returns the indexes of the points to keep.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0] = 0
+    keep[-1] = n - 1
+    
+    # Bucket edges for the n - 2 points between the first and last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # The next bucket's average stands in for the point not chosen yet
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        previous = start + int(np.argmax(areas))
+        keep[i + 1] = previous
+    return keep
+
+
+def downsample(x, y, threshold=MAX_POINTS):
+    """Return x and y reduced to at most threshold points with LTTB"""
+    keep = lttb(x, y, threshold)
+    return x[keep], y[keep]
+
+
+def weight_chart_series(frame):
+    """Pull the weigh-ins and trend line out of a TrendAnalytics frame.
+    
+    Returns (days, weights, trend_days, trend) as numpy arrays, with days
+    counted from the Unix epoch, or None if there is nothing to plot.
+    """
+    if frame.empty:
+        return None
+    
+    days = frame.index.values.astype('datetime64[D]').astype(np.int64).astype(float)
+    weight = frame['weight_kg'].to_numpy(dtype=float) * KG_TO_LBS
+    trend = frame['trend_kg'].to_numpy(dtype=float) * KG_TO_LBS
+    
+    logged = ~np.isnan(weight)
+    return days[logged], weight[logged], days, trend
+
+
+def data_version(*arrays, **options):
+    """Hash chart data and drawing options into a cache key"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    digest.update(repr(sorted(options.items())).encode())
+    return digest.hexdigest()
+
+
+def render_weight_chart(series, width, height, dpi=100, colors=CHART_COLORS):
+    """Draw weigh-ins and the trend line to PNG bytes"""
+    days, weights, trend_days, trend = series
+    days, weights = downsample(days, weights)
+    trend_days, trend = downsample(trend_days, trend)
+    
+    figure = figure_module.Figure(figsize=(width / dpi, height / dpi), dpi=dpi, facecolor=colors['bg'])
+    backend_agg.FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.set_facecolor(colors['bg'])
+    
+    axes.scatter(days.astype('datetime64[D]'), weights, s=10, color=colors['weight'], label="Weigh-ins", zorder=2)
+    axes.plot(trend_days.astype('datetime64[D]'), trend, color=colors['trend'], linewidth=2, label="Trend", zorder=3)
+    
+    axes.set_ylabel("Weight (lbs)", color=colors['text'])
+    axes.tick_params(colors=colors['text'], labelsize=8)
+    axes.grid(True, color=colors['grid'], linewidth=0.8)
+    for spine in axes.spines.values():
+        spine.set_color(colors['grid'])
+    axes.legend(loc='upper right', fontsize=8, frameon=False, labelcolor=colors['text'])
+    figure.autofmt_xdate()
+    figure.tight_layout()
+    
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', facecolor=colors['bg'])
+    return buffer.getvalue()
+
+
+class ChartCache:
+    """Keeps rendered chart bitmaps, keyed on the version of their data.
+    
+    render() is meant to run on a worker thread: it draws with Agg and
+    decodes the PNG there, so the UI thread only has to wrap the image.
+    """
+    
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._images = OrderedDict()  # key -> PIL image
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached image for key, or None"""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+    
+    def render(self, key, draw, *args, **kwargs):
+        """Return the image for key, drawing it with draw(*args) if needed"""
+        image = self.get(key)
+        if image is not None:
+            return image
+        
+        image = Image.open(io.BytesIO(draw(*args, **kwargs)))
+        image.load()
+        with self._lock:
+            self._images[key] = image
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+        return image
+    
+    def clear(self):
+        """Forget every cached image"""
+        with self._lock:
+            self._images.clear()
+
+
+_default_charts = None
+_default_lock = threading.Lock()
+
+
+def get_chart_cache():
+    """Return the chart cache shared across the app"""
+    global _default_charts
+    with _default_lock:
+        if _default_charts is None:
+            _default_charts = ChartCache()
+        return _default_charts